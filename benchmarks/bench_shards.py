@@ -0,0 +1,80 @@
+# benchmarks/bench_shards.py
+#
+# Mesure le débit d'une grande arène de bots selon le nombre de shards (un processus chacune).
+#   python -m benchmarks.bench_shards --output shards.json
+#   python -m benchmarks.bench_shards --size 1024 --bots 5000 --shards 1 2 4 8 --ticks 200
+
+import argparse
+import json
+import os
+import platform
+import time
+
+from engine.shards import ShardedSimulation
+
+
+def run_scenario(size, bots, pellets, shards, ticks, seed):
+    simulation = ShardedSimulation(shards=shards, columns=size, rows=size, num_bots=bots, pellet_count=pellets, seed=seed)
+    try:
+        start = time.perf_counter()
+        for _ in range(ticks):
+            simulation.step()
+        elapsed = time.perf_counter() - start
+    finally:
+        simulation.close()
+
+    return {
+        "world_size": size,
+        "num_bots": bots,
+        "initial_pellet_count": pellets,
+        "shards": shards,
+        "ticks": ticks,
+        "seed": seed,
+        "ticks_per_second": ticks / elapsed,
+        "mean_tick_us": elapsed / ticks * 1e6,
+        "alive_at_end": simulation.alive,
+        "deaths": dict(simulation.deaths),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark de l'arène partagée entre processus (engine/shards.py).")
+    parser.add_argument("--size", type=int, default=1024)
+    parser.add_argument("--bots", type=int, default=2000)
+    parser.add_argument("--pellets", type=int, default=5000)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--ticks", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="fichier JSON des résultats")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = []
+    for shards in args.shards:
+        result = run_scenario(args.size, args.bots, args.pellets, shards, args.ticks, args.seed)
+        results.append(result)
+        print(
+            f"size={args.size:5d} bots={args.bots:5d} shards={shards:2d} | "
+            f"{result['ticks_per_second']:7.1f} ticks/s | {result['mean_tick_us']:9.0f} us/tick | "
+            f"{result['alive_at_end']:5d} vivants"
+        )
+
+    if args.output:
+        report = {
+            "meta": {
+                "timestamp": time.time(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "args": vars(args),
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
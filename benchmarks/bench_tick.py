@@ -0,0 +1,231 @@
+# benchmarks/bench_tick.py
+#
+# Mesure le coût d'un tick de simulation, sans rendu.
+#   python -m benchmarks.bench_tick --output bench.json
+#   python -m benchmarks.bench_tick --sizes 200 1024 --bots 5 50 --pellets 200 --lengths 1 500
+#   python -m benchmarks.bench_tick --snapshot partie.mws   (part de l'état sauvegardé, cf. engine/snapshot.py)
+#   python -m benchmarks.bench_tick --policy lookahead       (politique des bots, cf. player/policy.py)
+
+import argparse
+import itertools
+import json
+import platform
+import time
+import tracemalloc
+from collections import defaultdict
+
+from config import NUM_BOTS, INITIAL_PELLET_COUNT, SMALL_WORLD_COLUMNS, WORLD_COLUMNS
+from engine import simulation as simulation_module
+from engine.simulation import Simulation
+from engine.snapshot import read_snapshot, restore_snapshot
+from player.body import WormBody
+from player.policy import GREEDY_POLICY, DistanceFieldPolicy
+from world.map import World
+
+# Sous-systèmes chronométrés : (nom, classe ou module, attribut).
+# decide_directions couvre les observations et les décisions par lots de tous les bots d'un tick.
+# eat_pellets_at inclut le spawn_pellet de la boulette qui remplace celle mangée.
+SUBSYSTEMS = [
+    ("decide_directions", simulation_module, "decide_directions"),
+    ("resolve_moves", simulation_module, "resolve_moves"),
+    ("eat_pellets_at", World, "eat_pellets_at"),
+    ("spawn_pellet", World, "spawn_pellet"),
+]
+
+BOT_POLICIES = {
+    "greedy": GREEDY_POLICY,
+    "field": DistanceFieldPolicy(),
+    "lookahead": DistanceFieldPolicy(lookahead=True),
+}
+
+
+class SubsystemTimers:
+    """Remplace temporairement les méthodes de SUBSYSTEMS par des versions chronométrées."""
+
+    def __init__(self):
+        self.calls = defaultdict(int)
+        self.seconds = defaultdict(float)
+        self._originals = []
+
+    def __enter__(self):
+        for name, cls, attr in SUBSYSTEMS:
+            original = getattr(cls, attr)
+            self._originals.append((cls, attr, original))
+            setattr(cls, attr, self._wrap(name, original))
+        return self
+
+    def __exit__(self, *exc):
+        for cls, attr, original in self._originals:
+            setattr(cls, attr, original)
+        self._originals.clear()
+
+    def _wrap(self, name, method):
+        calls, seconds, clock = self.calls, self.seconds, time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                seconds[name] += clock() - start
+                calls[name] += 1
+
+        return timed
+
+    def report(self):
+        return {
+            name: {
+                "calls": self.calls[name],
+                "total_s": self.seconds[name],
+                "mean_us": self.seconds[name] / self.calls[name] * 1e6 if self.calls[name] else 0.0,
+            }
+            for name, _, _ in SUBSYSTEMS
+        }
+
+
+def lay_out_worms(simulation, length):
+    """
+    Donne à chaque ver un corps de `length` cases, en serpentin dans sa propre bande
+    verticale de la carte, tête en haut : on démarre directement avec de longs vers.
+    """
+    world = simulation.world
+    worms = simulation.worms
+    band = world.columns // len(worms)
+
+    world.clear_bodies()
+    for i, worm in enumerate(worms):
+        x0 = i * band
+        cells = []
+        for y in range(world.rows):
+            xs = range(x0, x0 + band) if y % 2 == 0 else range(x0 + band - 1, x0 - 1, -1)
+            cells.extend((x, y) for x in xs)
+            if len(cells) >= length:
+                break
+        cells = cells[:length]
+        worm.cells = WormBody(reversed(cells))
+        worm.direction = (0, 1)
+        for cell in worm.cells:
+            world.occupy(cell, worm)
+    world.reset()
+
+
+def scenario_fits(size, bots, pellets, length):
+    if pellets + (bots + 1) * length > size * size // 2:
+        return False
+    band = size // (bots + 1)
+    return length == 1 or (band >= 2 and length <= band * (size - 2))
+
+
+def start_episode(simulation, length, snapshot=None):
+    if snapshot is not None:
+        # Chaque partie repart de l'état sauvegardé (vers longs compris)
+        restore_snapshot(simulation, snapshot)
+        return
+    simulation.reset()
+    if length > 1:
+        lay_out_worms(simulation, length)
+
+
+def run_ticks(size, bots, pellets, length, ticks, seed, snapshot=None, policy="greedy"):
+    world = World(columns=size, rows=size, initial_pellet_count=pellets)
+    simulation = Simulation("AI", seed=seed, num_bots=bots, world=world, bot_policy=BOT_POLICIES[policy])
+    start_episode(simulation, length, snapshot)
+
+    resets = 0
+    total_length = 0
+    for _ in range(ticks):
+        if simulation.is_over:
+            start_episode(simulation, length, snapshot)
+            resets += 1
+        simulation.step()
+        total_length += sum(len(worm.cells) for worm in simulation.worms if worm.alive)
+    return resets, total_length / ticks
+
+
+def run_scenario(size, bots, pellets, length, ticks, seed, snapshot=None, policy="greedy"):
+    # 1. Débit brut, sans instrumentation
+    start = time.perf_counter()
+    resets, mean_cells = run_ticks(size, bots, pellets, length, ticks, seed, snapshot, policy)
+    elapsed = time.perf_counter() - start
+
+    # 2. Même charge, sous-systèmes chronométrés
+    with SubsystemTimers() as timers:
+        run_ticks(size, bots, pellets, length, ticks, seed, snapshot, policy)
+
+    # 3. Même charge, pic mémoire (tracemalloc ralentit beaucoup, d'où une passe à part)
+    tracemalloc.start()
+    run_ticks(size, bots, pellets, length, ticks, seed, snapshot, policy)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "world_size": size,
+        "num_bots": bots,
+        "initial_pellet_count": pellets,
+        "worm_length": length,
+        "ticks": ticks,
+        "seed": seed,
+        "bot_policy": policy,
+        "ticks_per_second": ticks / elapsed,
+        "mean_tick_us": elapsed / ticks * 1e6,
+        "episode_resets": resets,
+        "mean_alive_cells": mean_cells,
+        "subsystems": timers.report(),
+        "peak_memory_bytes": peak,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark du tick de simulation (sans rendu).")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[SMALL_WORLD_COLUMNS, WORLD_COLUMNS, 1024])
+    parser.add_argument("--bots", type=int, nargs="+", default=[NUM_BOTS, 25, 100])
+    parser.add_argument("--pellets", type=int, nargs="+", default=[20, INITIAL_PELLET_COUNT])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[1, 200])
+    parser.add_argument("--ticks", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--policy", default="greedy", choices=sorted(BOT_POLICIES), help="politique des bots")
+    parser.add_argument("--snapshot", help="scénario unique partant de ce snapshot (remplace --sizes, --bots...)")
+    parser.add_argument("--output", help="fichier JSON des résultats")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = []
+    snapshot = None
+    scenarios = itertools.product(args.sizes, args.bots, args.pellets, args.lengths)
+    if args.snapshot:
+        with open(args.snapshot, "rb") as f:
+            snapshot = f.read()
+        saved = read_snapshot(snapshot)
+        lengths = saved.worms["length"]
+        scenarios = [(saved.columns, len(lengths) - 1, saved.initial_pellet_count, int(lengths.max()))]
+
+    for size, bots, pellets, length in scenarios:
+        if snapshot is None and not scenario_fits(size, bots, pellets, length):
+            print(f"skip  size={size} bots={bots} pellets={pellets} length={length} (ne tient pas sur la carte)")
+            continue
+        result = run_scenario(size, bots, pellets, length, args.ticks, args.seed, snapshot, args.policy)
+        results.append(result)
+        print(
+            f"size={size:5d} bots={bots:3d} pellets={pellets:5d} length={length:5d} | "
+            f"{result['ticks_per_second']:9.0f} ticks/s | {result['mean_tick_us']:8.1f} us/tick | "
+            f"peak {result['peak_memory_bytes'] / 1e6:7.1f} MB"
+        )
+
+    if args.output:
+        report = {
+            "meta": {
+                "timestamp": time.time(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "args": vars(args),
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# benchmarks/compare.py
+#
+# Compare deux fichiers produits par bench_tick, scénario par scénario.
+#   python -m benchmarks.compare avant.json apres.json
+
+import argparse
+import json
+
+SCENARIO_KEYS = ("world_size", "num_bots", "initial_pellet_count", "worm_length")
+
+
+def load_results(path):
+    with open(path) as f:
+        return {tuple(r[k] for k in SCENARIO_KEYS): r for r in json.load(f)["results"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare deux résultats de benchmarks/bench_tick.py.")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=0.9, help="signale un débit < threshold x l'ancien")
+    args = parser.parse_args()
+
+    before = load_results(args.before)
+    after = load_results(args.after)
+
+    regressions = 0
+    for scenario in sorted(before.keys() & after.keys()):
+        old, new = before[scenario], after[scenario]
+        ratio = new["ticks_per_second"] / old["ticks_per_second"]
+        flag = "REGRESSION" if ratio < args.threshold else ""
+        regressions += bool(flag)
+        size, bots, pellets, length = scenario
+        print(
+            f"size={size:5d} bots={bots:3d} pellets={pellets:5d} length={length:5d} | "
+            f"{old['ticks_per_second']:9.0f} -> {new['ticks_per_second']:9.0f} ticks/s (x{ratio:.2f}) | "
+            f"mem {old['peak_memory_bytes'] / 1e6:.1f} -> {new['peak_memory_bytes'] / 1e6:.1f} MB {flag}"
+        )
+
+    if regressions:
+        print(f"{regressions} scénario(s) en régression")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# benchmarks/load_test.py
+#
+# Test de charge du serveur de jeu : N connexions simultanées qui changent de direction
+# au hasard, puis latence des ticks et débit reçus.
+#   python -m engine.server --bots 50 &
+#   python -m benchmarks.load_test --clients 200 --duration 30
+#   python -m benchmarks.load_test --serve --clients 300 --output load.json
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from config import SERVER_HOST, SERVER_PORT
+from engine.protocol import DELTA, DELTA_HEADER, FRAME_HEADER, ClientState
+from player.q_table import ACTIONS
+
+
+class ClientStats:
+    def __init__(self):
+        self.bytes = 0
+        self.frames = 0
+        self.missed_ticks = 0
+        self.latencies = []  # secondes entre l'envoi d'un delta et sa réception
+
+
+async def run_client(host, port, index, stop_at, stats: ClientStats, decode, turn_probability):
+    rng = random.Random(index)
+    reader, writer = await asyncio.open_connection(host, port)
+    state = ClientState() if decode else None
+    last_tick = None
+    try:
+        while time.time() < stop_at:
+            header = await reader.readexactly(FRAME_HEADER.size)
+            length, kind = FRAME_HEADER.unpack(header)
+            body = await reader.readexactly(length)
+            stats.bytes += FRAME_HEADER.size + length
+            stats.frames += 1
+            if state is not None:
+                state.apply(kind, body)
+
+            if kind == DELTA:
+                tick, sent_at = DELTA_HEADER.unpack_from(body)
+                stats.latencies.append(time.time() - sent_at)
+                if last_tick is not None and tick > last_tick + 1:
+                    stats.missed_ticks += tick - last_tick - 1
+                last_tick = tick
+                if rng.random() < turn_probability:
+                    writer.write(bytes([rng.randrange(len(ACTIONS))]))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run_load(args):
+    stop_at = time.time() + args.duration
+    stats = [ClientStats() for _ in range(args.clients)]
+    tasks = []
+    for index, client_stats in enumerate(stats):
+        tasks.append(asyncio.create_task(
+            run_client(args.host, args.port, index, stop_at, client_stats, args.decode, args.turn_probability)
+        ))
+        if args.ramp:
+            await asyncio.sleep(args.ramp / args.clients)
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return stats
+
+
+def summarize(stats, duration):
+    latencies = np.array([latency for s in stats for latency in s.latencies]) * 1e3
+    total_bytes = sum(s.bytes for s in stats)
+    return {
+        "clients": len(stats),
+        "connected_clients": sum(1 for s in stats if s.frames),
+        "duration_s": duration,
+        "bytes_per_second": total_bytes / duration,
+        "bytes_per_second_per_client": total_bytes / duration / max(1, len(stats)),
+        "frames": sum(s.frames for s in stats),
+        "missed_ticks": sum(s.missed_ticks for s in stats),
+        "latency_ms": {
+            "mean": float(latencies.mean()) if latencies.size else None,
+            "p50": float(np.percentile(latencies, 50)) if latencies.size else None,
+            "p95": float(np.percentile(latencies, 95)) if latencies.size else None,
+            "p99": float(np.percentile(latencies, 99)) if latencies.size else None,
+            "max": float(latencies.max()) if latencies.size else None,
+        },
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Test de charge du serveur de jeu (engine/server.py).")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=20.0, help="durée du test, en secondes")
+    parser.add_argument("--ramp", type=float, default=2.0, help="durée d'arrivée de tous les clients, en secondes")
+    parser.add_argument("--turn-probability", type=float, default=0.2, help="chance de changer de direction à chaque tick")
+    parser.add_argument("--decode", action="store_true", help="reconstruit l'état du monde dans chaque client")
+    parser.add_argument("--serve", action="store_true", help="lance aussi le serveur, dans un sous-processus")
+    parser.add_argument("--bots", type=int, default=50, help="bots du serveur lancé par --serve")
+    parser.add_argument("--output", help="fichier JSON des résultats")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    server = None
+    if args.serve:
+        server = subprocess.Popen([
+            sys.executable, "-m", "engine.server", "--host", args.host, "--port", str(args.port),
+            "--bots", str(args.bots), "--log-every", "0",
+        ])
+        time.sleep(2.0)
+
+    try:
+        start = time.time()
+        stats = asyncio.run(run_load(args))
+        result = summarize(stats, time.time() - start)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    latency = result["latency_ms"]
+    print(
+        f"{result['connected_clients']}/{result['clients']} clients | "
+        f"{result['bytes_per_second'] / 1e3:.0f} kB/s reçus ({result['bytes_per_second_per_client'] / 1e3:.1f} kB/s par client) | "
+        f"{result['missed_ticks']} ticks manqués"
+    )
+    if latency["mean"] is not None:
+        print(
+            f"latence des ticks : moyenne {latency['mean']:.1f} ms | p50 {latency['p50']:.1f} | "
+            f"p95 {latency['p95']:.1f} | p99 {latency['p99']:.1f} | max {latency['max']:.1f}"
+        )
+
+    if args.output:
+        report = {
+            "meta": {
+                "timestamp": time.time(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "args": vars(args),
+            },
+            "result": result,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
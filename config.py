@@ -13,6 +13,35 @@ WORLD_HEIGHT = WORLD_ROWS * GRID_SIZE
 
 MOVE_INTERVAL = 0.05
 
+# Boucle à pas fixe : au plus MAX_CATCH_UP_SECONDS de retard rattrapé par frame
+# (multiplié par la vitesse) ; au-delà, le retard est abandonné plutôt que de bloquer l'affichage
+MAX_CATCH_UP_SECONDS = 0.25
+# Multiplicateurs de vitesse proposés en Q-learning (touche S) ; None = aussi vite que possible, sans rendu
+SPEED_MULTIPLIERS = [1, 10, 100, None]
+# En vitesse illimitée, temps de calcul accordé à la simulation par frame
+UNLIMITED_FRAME_BUDGET = 1 / 30
+# Délai avant de relancer automatiquement une partie en mode solo (temps simulé)
+RESTART_DELAY = 1.0
+
+# Côté (en cases) des chunks de rendu : seuls ceux visibles par la caméra sont dessinés
+RENDER_CHUNK_CELLS = 32
+
+# Politique DistanceFieldPolicy (player/policy.py) : portée du champ de distances aux boulettes,
+# en pas, et rayon de la fenêtre du lookahead autour de la tête
+PELLET_FIELD_MAX_DISTANCE = 64
+LOOKAHEAD_RADIUS = 6
+
+# Monde partagé entre processus (engine/shards.py) : colonnes fantômes copiées de chaque voisine
+SHARD_HALO = 4
+
+# Serveur de jeu (engine/server.py)
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+# Ticks passés mort avant de réapparaître dans l'arène
+SERVER_RESPAWN_TICKS = 20
+# Un client qui laisse s'accumuler plus que ça d'octets non lus est déconnecté
+SERVER_MAX_BACKLOG_BYTES = 1 << 20
+
 INITIAL_PELLET_COUNT = 200
 NUM_BOTS = 5
 
@@ -39,3 +68,30 @@ PELLET_TYPES = [
         "texture": ":resources:images/items/coinGold.png",
     },
 ]
+
+# Table Q (player/q_table.py) : dense jusqu'à ce nombre d'états, au-delà une table bornée
+# d'au plus Q_TABLE_MAX_STATES états (~150 octets chacun), qui oublie les moins récemment utilisés
+Q_TABLE_DENSE_MAX_STATES = 1 << 20
+Q_TABLE_MAX_STATES = 1 << 18
+# Table projetée en mémoire (MappedQTable) : dense, sans passer par la RAM, d'où une limite plus haute
+# (16 octets par état sur le disque, fichier creux tant que les états ne sont pas visités)
+Q_TABLE_MEMMAP_MAX_STATES = 1 << 24
+
+# Tampon de rejeu (training/replay_buffer.py) : transitions gardées, taille des minibatchs,
+# nombre moyen de fois où chaque transition est rejouée, et tirage prioritaire (alpha, beta)
+REPLAY_CAPACITY = 100_000
+REPLAY_BATCH_SIZE = 256
+REPLAY_RATIO = 4
+REPLAY_PRIORITY_ALPHA = 0.6
+REPLAY_PRIORITY_BETA = 0.4
+
+# Sauvegarde de la table Q en arrière-plan, en fin de partie, dès que N parties
+# ou T secondes se sont écoulées depuis la précédente
+CHECKPOINT_EVERY_EPISODES = 10
+CHECKPOINT_EVERY_SECONDS = 30.0
+
+# Télémétrie des parties (engine/telemetry.py) : taille des moyennes glissantes, délai
+# maximal avant d'écrire les lignes en attente, et fréquence du comptage de la table Q
+SCORE_WINDOW = 100
+TELEMETRY_FLUSH_SECONDS = 5.0
+TELEMETRY_Q_TABLE_EVERY_SECONDS = 1.0
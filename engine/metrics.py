@@ -0,0 +1,144 @@
+# engine/metrics.py
+
+import bisect
+import csv
+import json
+import time
+from collections import Counter
+
+from world.moves import BODY_DEATH, HEAD_ON_DEATH, WALL_DEATH
+
+# Phases chronométrées d'un tick :
+#   decide        : choix des directions (politiques par lots et choose_direction)
+#   move          : jugement des collisions et déplacement des vers (world/moves.py)
+#   eat           : boulettes mangées et boulettes de remplacement (eat_pellets_at)
+#   death_pellets : morts et boulettes laissées par les corps (PlayerWorm.die)
+#   q_update      : after_move, où le Q-learning calcule sa récompense et met sa table à jour
+# plus le dessin du monde (GameView.on_draw), compté par frame et non par tick.
+TICK_PHASES = ("decide", "move", "eat", "death_pellets", "q_update")
+DEATH_CAUSES = (WALL_DEATH, BODY_DEATH, HEAD_ON_DEATH)
+# Bornes supérieures (µs) des classes de l'histogramme de durée des ticks ; la dernière classe est ouverte
+TICK_BUCKETS_US = (10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000, 100000)
+
+
+class Metrics:
+    """
+    Instrumentation de la boucle de tick : temps par phase, compteurs et histogramme
+    de durée des ticks.
+    S'attache à Simulation.metrics (None par défaut) : désactivée, elle ne coûte qu'un
+    test `is not None` par phase.
+    """
+
+    def __init__(self):
+        self.clock = time.perf_counter
+        self.phase_seconds = dict.fromkeys(TICK_PHASES, 0.0)
+        self.ticks = 0
+        self.frames = 0
+        self.render_seconds = 0.0
+        self.tick_seconds = 0.0
+        self.tick_histogram = [0] * (len(TICK_BUCKETS_US) + 1)
+        self.deaths = Counter()
+        self.pellets_eaten = 0
+        self.q_table = None  # table Q du ver principal, comptée à l'export seulement
+        self.started_at = time.time()
+
+    def add_phase(self, phase: str, seconds: float):
+        self.phase_seconds[phase] += seconds
+
+    def tick_finished(self, seconds: float):
+        self.ticks += 1
+        self.tick_seconds += seconds
+        self.tick_histogram[bisect.bisect_left(TICK_BUCKETS_US, seconds * 1e6)] += 1
+
+    def frame_rendered(self, seconds: float):
+        self.frames += 1
+        self.render_seconds += seconds
+
+    @property
+    def q_table_states(self) -> int:
+        return self.q_table.size if self.q_table is not None else 0
+
+    def tick_percentile(self, q: float) -> float:
+        """Estimation (borne supérieure de la classe, en µs) du q-ième centile de durée des ticks."""
+        if not self.ticks:
+            return 0.0
+        rank = q / 100 * self.ticks
+        seen = 0
+        for bound, count in zip(TICK_BUCKETS_US, self.tick_histogram):
+            seen += count
+            if seen >= rank:
+                return float(bound)
+        return float("inf")
+
+    def as_dict(self) -> dict:
+        """Valeurs cumulées depuis la création, à plat (une colonne CSV par clé)."""
+        ticks = max(1, self.ticks)
+        values = {
+            "time": time.time(),
+            "elapsed_s": time.time() - self.started_at,
+            "ticks": self.ticks,
+            "tick_mean_us": self.tick_seconds / ticks * 1e6,
+            "tick_p50_us": self.tick_percentile(50),
+            "tick_p99_us": self.tick_percentile(99),
+        }
+        for phase in TICK_PHASES:
+            values[f"{phase}_mean_us"] = self.phase_seconds[phase] / ticks * 1e6
+        values["frames"] = self.frames
+        values["render_mean_us"] = self.render_seconds / max(1, self.frames) * 1e6
+        for cause in DEATH_CAUSES:
+            values[f"deaths_{cause.replace('-', '_')}"] = self.deaths[cause]
+        values["pellets_eaten"] = self.pellets_eaten
+        values["q_table_states"] = self.q_table_states
+        for bound, count in zip(TICK_BUCKETS_US, self.tick_histogram):
+            values[f"ticks_le_{bound}us"] = count
+        values[f"ticks_gt_{TICK_BUCKETS_US[-1]}us"] = self.tick_histogram[-1]
+        return values
+
+    def overlay_lines(self):
+        """Lignes affichées par GameView à côté des statistiques de la partie."""
+        ticks = max(1, self.ticks)
+        lines = [
+            f"Ticks: {self.ticks} | mean {self.tick_seconds / ticks * 1e6:.0f} us | "
+            f"p50 <= {self.tick_percentile(50):.0f} us | p99 <= {self.tick_percentile(99):.0f} us"
+        ]
+        lines += [f"{phase}: {self.phase_seconds[phase] / ticks * 1e6:.0f} us/tick" for phase in TICK_PHASES]
+        lines.append(f"render: {self.render_seconds / max(1, self.frames) * 1e6:.0f} us/frame")
+        lines.append("Deaths: " + ", ".join(f"{cause} {self.deaths[cause]}" for cause in DEATH_CAUSES))
+        lines.append(f"Pellets eaten: {self.pellets_eaten}")
+        return lines
+
+
+class MetricsExporter:
+    """
+    Écrit périodiquement Metrics.as_dict() pour les exécutions sans fenêtre :
+    une ligne JSON par export (fichier .jsonl / .json) ou une ligne CSV (.csv).
+    """
+
+    def __init__(self, path: str, every_seconds: float = 10.0):
+        self.path = path
+        self.every_seconds = every_seconds
+        self.csv = path.endswith(".csv")
+        self.last_export = time.perf_counter()
+        self.file = open(path, "w", newline="")
+        self.writer = None
+
+    def maybe_export(self, metrics: Metrics):
+        if time.perf_counter() - self.last_export >= self.every_seconds:
+            self.export(metrics)
+
+    def export(self, metrics: Metrics):
+        values = metrics.as_dict()
+        if self.csv:
+            if self.writer is None:
+                self.writer = csv.DictWriter(self.file, fieldnames=list(values))
+                self.writer.writeheader()
+            self.writer.writerow(values)
+        else:
+            self.file.write(json.dumps(values) + "\n")
+        self.file.flush()
+        self.last_export = time.perf_counter()
+
+    def close(self, metrics: Metrics = None):
+        if metrics is not None:
+            self.export(metrics)
+        self.file.close()
@@ -0,0 +1,219 @@
+# engine/protocol.py
+
+import struct
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+# Protocole du serveur de jeu (engine/server.py), little-endian, sur TCP.
+#
+# Client -> serveur : un octet par commande, l'indice de la direction voulue dans ACTIONS.
+#
+# Serveur -> client : des trames [longueur du contenu u32][genre u8][contenu] :
+#   WELCOME  : identifiant de son ver u32, colonnes u16, lignes u16
+#   SNAPSHOT : état complet, envoyé une fois à l'arrivée :
+#              tick u32, boulettes [nombre u32, (x u16, y u16, type u8)...],
+#              vers [nombre u32, (identifiant u32, SPAWN, ...)...]
+#   DELTA    : changements d'un tick, la même trame pour tous les clients :
+#              tick u32, heure d'envoi (time.time()) f64,
+#              boulettes [nombre u32, (x u16, y u16, type u8)...] dans l'ordre où elles ont changé,
+#                avec type REMOVED_PELLET pour une boulette retirée,
+#              vers [nombre u32, (identifiant u32, genre u8, ...)...] :
+#                SPAWN : couleur 3 x u8, score u32, longueur u32, cases (x u16, y u16) de la tête à la queue
+#                MOVE  : têtes ajoutées u8, leurs cases (de la plus ancienne à la plus récente),
+#                        queues retirées u8, score u32
+#                GONE  : rien (ver mort ou parti)
+# Tous les changements sont idempotents : une trame DELTA s'applique sans risque à un
+# état qui contient déjà certains de ses changements (client arrivé entre deux ticks).
+
+WELCOME, SNAPSHOT, DELTA = 1, 2, 3
+SPAWN, MOVE, GONE = 0, 1, 2
+REMOVED_PELLET = 255
+
+FRAME_HEADER = struct.Struct("<IB")
+WELCOME_BODY = struct.Struct("<IHH")
+SNAPSHOT_HEADER = struct.Struct("<I")
+DELTA_HEADER = struct.Struct("<Id")
+COUNT = struct.Struct("<I")
+PELLET = struct.Struct("<HHB")
+CELL = struct.Struct("<HH")
+WORM_HEADER = struct.Struct("<IB")
+SPAWN_BODY = struct.Struct("<BBBII")
+MOVE_HEADS = struct.Struct("<B")
+MOVE_TAIL = struct.Struct("<BI")
+
+
+def frame(kind: int, body: bytes) -> bytes:
+    return FRAME_HEADER.pack(len(body), kind) + body
+
+
+def encode_welcome(worm_id: int, columns: int, rows: int) -> bytes:
+    return frame(WELCOME, WELCOME_BODY.pack(worm_id, columns, rows))
+
+
+def encode_spawn(out: bytearray, worm_id: int, worm):
+    cells = worm.cells
+    out += WORM_HEADER.pack(worm_id, SPAWN)
+    out += SPAWN_BODY.pack(*worm.color, worm.score, len(cells))
+    for x, y in cells:
+        out += CELL.pack(x, y)
+
+
+class StateTracker:
+    """
+    Suit les changements du monde d'un tick à l'autre pour les encoder en deltas :
+    boulettes ajoutées et retirées (via les pellet_listeners du World), têtes ajoutées
+    et queues retirées de chaque ver (via les compteurs pushed et popped de WormBody).
+    """
+
+    def __init__(self, world):
+        self.world = world
+        world.pellet_listeners.append(self)
+        self.pellet_ops = bytearray()
+        self.pellet_op_count = 0
+        self.next_id = 0
+        # ver -> [identifiant, corps, têtes ajoutées, queues retirées, score] au dernier delta
+        self.states: Dict[object, list] = {}
+
+    def pellet_added(self, pellet):
+        self.pellet_ops += PELLET.pack(pellet.x, pellet.y, pellet.type_index)
+        self.pellet_op_count += 1
+
+    def pellet_removed(self, pellet):
+        self.pellet_ops += PELLET.pack(pellet.x, pellet.y, REMOVED_PELLET)
+        self.pellet_op_count += 1
+
+    def pellets_cleared(self):
+        for cell in self.world.pellet_cells:
+            self.pellet_ops += PELLET.pack(cell[0], cell[1], REMOVED_PELLET)
+            self.pellet_op_count += 1
+
+    def worm_id(self, worm) -> int:
+        state = self.states.get(worm)
+        if state is None:
+            # Pas encore de corps de référence : le prochain delta l'enverra en entier
+            state = self.states[worm] = [self.next_id, None, 0, 0, 0]
+            self.next_id += 1
+        return state[0]
+
+    def snapshot(self, worms, tick: int) -> bytes:
+        """Trame SNAPSHOT de l'état courant, pour un client qui arrive."""
+        out = bytearray(SNAPSHOT_HEADER.pack(tick))
+        pellets = self.world.pellet_cells
+        out += COUNT.pack(len(pellets))
+        for pellet in pellets.values():
+            out += PELLET.pack(pellet.x, pellet.y, pellet.type_index)
+        alive = [worm for worm in worms if worm.alive]
+        out += COUNT.pack(len(alive))
+        for worm in alive:
+            encode_spawn(out, self.worm_id(worm), worm)
+        return frame(SNAPSHOT, bytes(out))
+
+    def delta(self, worms, tick: int, sent_at: float) -> bytes:
+        """Trame DELTA des changements depuis le dernier appel."""
+        out = bytearray(DELTA_HEADER.pack(tick, sent_at))
+        out += COUNT.pack(self.pellet_op_count)
+        out += self.pellet_ops
+        self.pellet_ops = bytearray()
+        self.pellet_op_count = 0
+
+        updates = bytearray()
+        count = 0
+        gone = set(self.states)
+        for worm in worms:
+            gone.discard(worm)
+            worm_id = self.worm_id(worm)
+            state = self.states[worm]
+            body = worm.cells
+            if not worm.alive:
+                if state[1] is not None:
+                    updates += WORM_HEADER.pack(worm_id, GONE)
+                    count += 1
+                    state[1] = None
+                continue
+
+            if state[1] is not body:
+                encode_spawn(updates, worm_id, worm)
+            else:
+                heads = body.pushed - state[2]
+                tails = body.popped - state[3]
+                if not heads and not tails and worm.score == state[4]:
+                    continue
+                updates += WORM_HEADER.pack(worm_id, MOVE)
+                updates += MOVE_HEADS.pack(heads)
+                for i in range(heads - 1, -1, -1):
+                    updates += CELL.pack(*body[i])
+                updates += MOVE_TAIL.pack(tails, worm.score)
+            count += 1
+            state[1:] = body, body.pushed, body.popped, worm.score
+
+        for worm in gone:
+            state = self.states.pop(worm)
+            if state[1] is not None:
+                updates += WORM_HEADER.pack(state[0], GONE)
+                count += 1
+
+        out += COUNT.pack(count)
+        out += updates
+        return frame(DELTA, bytes(out))
+
+
+class ClientState:
+    """Reconstruit l'état du monde côté client à partir des trames du serveur."""
+
+    def __init__(self):
+        self.worm_id: Optional[int] = None
+        self.columns = 0
+        self.rows = 0
+        self.tick = 0
+        self.sent_at = 0.0
+        self.pellets: Dict[Tuple[int, int], int] = {}
+        self.worms: Dict[int, dict] = {}  # identifiant -> {"cells", "color", "score"}
+
+    def apply(self, kind: int, body: bytes):
+        if kind == WELCOME:
+            self.worm_id, self.columns, self.rows = WELCOME_BODY.unpack_from(body)
+            return
+        if kind == SNAPSHOT:
+            (self.tick,) = SNAPSHOT_HEADER.unpack_from(body)
+            offset = SNAPSHOT_HEADER.size
+            self.pellets.clear()
+            self.worms.clear()
+        elif kind == DELTA:
+            self.tick, self.sent_at = DELTA_HEADER.unpack_from(body)
+            offset = DELTA_HEADER.size
+        else:
+            raise ValueError(f"trame de genre inconnu : {kind}")
+
+        (count,) = COUNT.unpack_from(body, offset)
+        offset += COUNT.size
+        for x, y, type_index in PELLET.iter_unpack(body[offset:offset + count * PELLET.size]):
+            if type_index == REMOVED_PELLET:
+                self.pellets.pop((x, y), None)
+            else:
+                self.pellets[(x, y)] = type_index
+        offset += count * PELLET.size
+
+        (count,) = COUNT.unpack_from(body, offset)
+        offset += COUNT.size
+        for _ in range(count):
+            worm_id, update = WORM_HEADER.unpack_from(body, offset)
+            offset += WORM_HEADER.size
+            if update == SPAWN:
+                r, g, b, score, length = SPAWN_BODY.unpack_from(body, offset)
+                offset += SPAWN_BODY.size
+                cells = deque(CELL.iter_unpack(body[offset:offset + length * CELL.size]))
+                offset += length * CELL.size
+                self.worms[worm_id] = {"cells": cells, "color": (r, g, b), "score": score}
+            elif update == MOVE:
+                (heads,) = MOVE_HEADS.unpack_from(body, offset)
+                offset += MOVE_HEADS.size
+                worm = self.worms[worm_id]
+                for cell in CELL.iter_unpack(body[offset:offset + heads * CELL.size]):
+                    worm["cells"].appendleft(cell)
+                offset += heads * CELL.size
+                tails, worm["score"] = MOVE_TAIL.unpack_from(body, offset)
+                offset += MOVE_TAIL.size
+                for _ in range(tails):
+                    worm["cells"].pop()
+            else:
+                self.worms.pop(worm_id, None)
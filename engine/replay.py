@@ -0,0 +1,119 @@
+# engine/replay.py
+
+import argparse
+import struct
+from dataclasses import dataclass, field
+
+from engine.simulation import Simulation
+from player.q_table import ACTIONS, ACTION_INDEX
+
+# Format binaire d'une partie (little-endian) :
+#   en-tête  : magic "MWRP", version u8, longueur du mode u8, graine u64,
+#              colonnes u16, lignes u16, nombre de vers u16, nombre de ticks u32
+#   mode     : texte ASCII (player_mode)
+#   actions  : pour chaque tick, une action par ver sur 2 bits (indice dans ACTIONS),
+#              4 vers par octet
+MAGIC = b"MWRP"
+VERSION = 2  # 2 : pas des vers résolus simultanément (world/moves.py)
+HEADER = struct.Struct("<4sBBQHHHI")
+
+
+@dataclass
+class EpisodeLog:
+    player_mode: str
+    seed: int
+    columns: int
+    rows: int
+    num_worms: int
+    ticks: list = field(default_factory=list)  # une liste d'indices d'action par tick
+
+    @property
+    def bytes_per_tick(self) -> int:
+        return (self.num_worms + 3) // 4
+
+    def to_bytes(self) -> bytes:
+        mode = self.player_mode.encode("ascii")
+        out = bytearray(HEADER.pack(
+            MAGIC, VERSION, len(mode), self.seed, self.columns, self.rows, self.num_worms, len(self.ticks)
+        ))
+        out += mode
+        for actions in self.ticks:
+            packed = bytearray(self.bytes_per_tick)
+            for i, action in enumerate(actions):
+                packed[i >> 2] |= action << ((i & 3) * 2)
+            out += packed
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "EpisodeLog":
+        magic, version, mode_length, seed, columns, rows, num_worms, num_ticks = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("fichier de replay invalide ou de version inconnue")
+
+        offset = HEADER.size
+        log = cls(data[offset:offset + mode_length].decode("ascii"), seed, columns, rows, num_worms)
+        offset += mode_length
+
+        for _ in range(num_ticks):
+            packed = data[offset:offset + log.bytes_per_tick]
+            log.ticks.append([(packed[i >> 2] >> ((i & 3) * 2)) & 3 for i in range(num_worms)])
+            offset += log.bytes_per_tick
+        return log
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "EpisodeLog":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+class EpisodeRecorder:
+    """S'attache à Simulation.recorder : enregistre la graine puis les actions de chaque tick."""
+
+    def __init__(self):
+        self.log = None
+
+    def start(self, simulation):
+        self.log = EpisodeLog(
+            simulation.player_mode,
+            simulation.episode_seed,
+            simulation.world.columns,
+            simulation.world.rows,
+            len(simulation.worms),
+        )
+
+    def record(self, worms):
+        self.log.ticks.append([ACTION_INDEX.get(worm.direction, 0) for worm in worms])
+
+
+def replay(log: EpisodeLog, on_tick=None):
+    """Re-simule la partie à l'identique, sans rendu. on_tick(simulation) est appelé après chaque tick."""
+    simulation = Simulation(log.player_mode, num_bots=log.num_worms - 1, replay=True)
+    simulation.reset(episode_seed=log.seed)
+    if (simulation.world.columns, simulation.world.rows) != (log.columns, log.rows):
+        raise ValueError("la taille du monde ne correspond pas à celle de l'enregistrement")
+
+    for actions in log.ticks:
+        simulation.step([ACTIONS[a] for a in actions])
+        if on_tick is not None:
+            on_tick(simulation)
+    return simulation
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejoue une partie enregistrée et affiche son issue.")
+    parser.add_argument("path")
+    args = parser.parse_args()
+
+    log = EpisodeLog.load(args.path)
+    simulation = replay(log)
+    print(f"Mode: {log.player_mode} | Seed: {log.seed} | Ticks: {len(log.ticks)}")
+    for i, worm in enumerate(simulation.worms):
+        print(f"Worm {i}: score {worm.score}, length {len(worm.cells)}, {'alive' if worm.alive else 'dead'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# engine/server.py
+
+import argparse
+import asyncio
+import time
+
+from config import (
+    MAX_CATCH_UP_SECONDS,
+    MOVE_INTERVAL,
+    NUM_BOTS,
+    SERVER_HOST,
+    SERVER_MAX_BACKLOG_BYTES,
+    SERVER_PORT,
+    SERVER_RESPAWN_TICKS,
+)
+from engine.protocol import StateTracker, encode_welcome
+from engine.simulation import Simulation, derive_rng
+from player.player import PlayerWorm
+from player.q_table import ACTIONS
+from world.map import World
+
+
+class GameServer:
+    """
+    Serveur de jeu faisant autorité, sans rendu : une arène où chaque client connecté
+    pilote son ver parmi les bots. La Simulation avance à pas fixe (MOVE_INTERVAL), comme
+    dans GameView.on_update ; à chaque tick, une seule trame DELTA est encodée puis
+    envoyée à tous les clients (cf. engine/protocol.py).
+    Les vers morts (bots comme clients) réapparaissent après SERVER_RESPAWN_TICKS ticks.
+    """
+
+    def __init__(self, num_bots=NUM_BOTS, seed=None, world=None, tick_interval=MOVE_INTERVAL):
+        self.simulation = Simulation("AI", seed=seed, num_bots=num_bots, world=world)
+        self.world = self.simulation.world
+        self.tracker = StateTracker(self.world)
+        self.tick_interval = tick_interval
+        self.clients = {}  # ver -> StreamWriter
+        self.handlers = set()  # tâches handle_client en cours, annulées à l'arrêt du serveur
+        self.dead_since = {}  # ver -> tick de sa mort
+        self.connections = 0
+
+        # Statistiques depuis le dernier log
+        self.ticks = 0
+        self.tick_seconds = 0.0
+        self.bytes_sent = 0
+        self.dropped_clients = 0
+
+    @property
+    def tick_number(self) -> int:
+        return self.simulation.episode_ticks
+
+    async def handle_client(self, reader, writer):
+        self.handlers.add(asyncio.current_task())
+        worm = PlayerWorm(derive_rng(self.simulation.episode_seed, f"client-{self.connections}"))
+        self.connections += 1
+        worm.reset(self.world)
+        self.simulation.worms.append(worm)
+
+        worm_id = self.tracker.worm_id(worm)
+        writer.write(encode_welcome(worm_id, self.world.columns, self.world.rows))
+        writer.write(self.tracker.snapshot(self.simulation.worms, self.tick_number))
+        self.clients[worm] = writer
+        try:
+            while True:
+                commands = await reader.read(64)
+                if not commands:
+                    break
+                # Seule la dernière direction reçue avant le tick compte
+                action = commands[-1]
+                if action < len(ACTIONS) and worm.alive:
+                    worm.set_direction(ACTIONS[action])
+        except (ConnectionError, asyncio.CancelledError):
+            # Client parti, ou serveur arrêté (tâche annulée) : dans les deux cas, on retire son ver
+            pass
+        finally:
+            # Déjà retiré par tick() s'il a été déconnecté pour lenteur
+            self.clients.pop(worm, None)
+            self.dead_since.pop(worm, None)
+            if worm.alive:
+                worm.die(self.world)
+            self.simulation.worms.remove(worm)
+            writer.close()
+            self.handlers.discard(asyncio.current_task())
+
+    def respawn_dead_worms(self):
+        tick = self.tick_number
+        for worm in self.simulation.worms:
+            if worm.alive:
+                continue
+            died_at = self.dead_since.setdefault(worm, tick)
+            if tick - died_at >= SERVER_RESPAWN_TICKS:
+                del self.dead_since[worm]
+                worm.reset(self.world)
+
+    def tick(self):
+        """Un tick de l'arène, puis l'envoi de son delta à tous les clients."""
+        start = time.perf_counter()
+        self.respawn_dead_worms()
+        self.simulation.step()
+        delta = self.tracker.delta(self.simulation.worms, self.tick_number, time.time())
+
+        for worm, writer in list(self.clients.items()):
+            if writer.transport.get_write_buffer_size() > SERVER_MAX_BACKLOG_BYTES:
+                # Client trop lent : on le déconnecte plutôt que de laisser grossir sa file.
+                # Il ne reçoit plus rien ; son ver est retiré quand handle_client voit la fermeture.
+                del self.clients[worm]
+                writer.close()
+                self.dropped_clients += 1
+                continue
+            writer.write(delta)
+            self.bytes_sent += len(delta)
+
+        self.ticks += 1
+        self.tick_seconds += time.perf_counter() - start
+
+    async def run_ticks(self):
+        """Boucle à pas fixe ; un retard de plus de MAX_CATCH_UP_SECONDS est abandonné."""
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            self.tick()
+            next_tick += self.tick_interval
+            delay = next_tick - loop.time()
+            if delay < -MAX_CATCH_UP_SECONDS:
+                next_tick = loop.time()
+            await asyncio.sleep(max(0.0, delay))
+
+    async def log_stats(self, every):
+        while True:
+            await asyncio.sleep(every)
+            mean_tick_ms = self.tick_seconds / self.ticks * 1e3 if self.ticks else 0.0
+            print(
+                f"tick {self.tick_number} | {len(self.clients)} clients | {self.ticks / every:.1f} ticks/s | "
+                f"{mean_tick_ms:.2f} ms/tick | {self.bytes_sent / every / 1e3:.0f} kB/s envoyés | "
+                f"{self.dropped_clients} clients lents déconnectés"
+            )
+            self.ticks = 0
+            self.tick_seconds = 0.0
+            self.bytes_sent = 0
+            self.dropped_clients = 0
+
+    async def serve(self, host=SERVER_HOST, port=SERVER_PORT, log_every=None):
+        server = await asyncio.start_server(self.handle_client, host, port)
+        tasks = [asyncio.create_task(self.run_ticks())]
+        if log_every:
+            tasks.append(asyncio.create_task(self.log_stats(log_every)))
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            # Plus de ticks, puis plus de clients : chaque handle_client retire son ver en sortant
+            tasks += self.handlers
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serveur de jeu sans rendu (arène TCP).")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--bots", type=int, default=NUM_BOTS)
+    parser.add_argument("--size", type=int, default=None, help="côté de la carte, en cases (WORLD_COLUMNS par défaut)")
+    parser.add_argument("--pellets", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--tick-interval", type=float, default=MOVE_INTERVAL, help="durée d'un tick, en secondes")
+    parser.add_argument("--log-every", type=float, default=5.0, help="affiche les statistiques toutes les N secondes")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    world = World(columns=args.size, rows=args.size, initial_pellet_count=args.pellets)
+    server = GameServer(num_bots=args.bots, seed=args.seed, world=world, tick_interval=args.tick_interval)
+    print(f"Serveur à l'écoute sur {args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.log_every))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
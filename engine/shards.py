@@ -0,0 +1,460 @@
+# engine/shards.py
+
+import multiprocessing as mp
+import random
+from bisect import bisect_right
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from config import INITIAL_PELLET_COUNT, PELLET_TYPES, SHARD_HALO, WORLD_COLUMNS, WORLD_ROWS
+from engine.simulation import derive_rng
+from player.ai_player import AIWorm
+from player.body import WormBody
+from player.policy import GREEDY_POLICY, decide_directions
+from world.map import SPAWN_ATTEMPTS, World
+from world.moves import BODY_DEATH, HEAD_ON_DEATH, WALL_DEATH, keeps_tail
+
+# Monde découpé en bandes verticales, une par processus (shard).
+#
+# - Un ver appartient à la shard dont la bande contient sa tête ; quand sa tête passe
+#   la frontière, le ver (corps, score, générateur...) est transmis à la voisine.
+# - Chaque shard fait autorité sur les cases de sa bande : corps (y compris ceux des vers
+#   d'autres shards qui la traversent) et boulettes.
+# - Les `halo` colonnes de part et d'autre de la bande sont des copies fantômes des
+#   voisines, rafraîchies à chaque tick : les décisions voient au-delà de la frontière.
+# - Un tick suit les règles de world/moves.py, en quatre échanges avec le coordinateur :
+#   1. decide : chaque shard décide pour ses vers et annonce leurs intentions
+#      (tête visée, queue libérée) ;
+#   2. judge  : chaque intention est jugée par la shard de la case visée, qui a reçu toutes
+#      les intentions visant ses cases ou partant d'elles ; elle met à jour ses cases
+#      (queues, têtes, boulettes mangées) ;
+#   3. apply  : chaque shard applique les verdicts à ses vers, annonce les morts et
+#      transmet les vers qui changent de bande ;
+#   4. settle : les cases des morts sont libérées et semées de boulettes, les vers transmis
+#      sont adoptés, et les changements des bandes frontières partent vers les voisines.
+
+
+class StripLayout:
+    """Découpage des colonnes [0, columns) en bandes verticales de largeurs égales (à une colonne près)."""
+
+    def __init__(self, columns: int, shards: int, halo: int):
+        edges = [columns * i // shards for i in range(shards + 1)]
+        self.columns = columns
+        self.bounds: List[Tuple[int, int]] = list(zip(edges, edges[1:]))
+        self._starts = edges[:-1]
+        if min(x1 - x0 for x0, x1 in self.bounds) < max(halo, 1):
+            raise ValueError(f"{shards} bandes trop étroites pour {columns} colonnes et un halo de {halo}")
+
+    def owner(self, x: int) -> int:
+        """Indice de la bande qui contient la colonne x."""
+        return bisect_right(self._starts, x) - 1
+
+
+class GhostWorm:
+    """Ver d'une autre shard : seul son identifiant est connu, comme propriétaire de cases."""
+
+    __slots__ = ("worm_id",)
+
+    def __init__(self, worm_id: int):
+        self.worm_id = worm_id
+
+
+class ShardWorld(World):
+    """
+    World d'une shard : coordonnées globales, mais seules les cases de la bande [x0, x1)
+    et du halo sont connues. Les boulettes naissent dans la bande, et chaque changement
+    d'une case frontière (à moins de `halo` colonnes d'une voisine) est noté dans `dirty`.
+    """
+
+    def __init__(self, columns, rows, x0, x1, halo, initial_pellet_count, rng=None):
+        super().__init__(columns, rows, initial_pellet_count, rng)
+        self.x0 = x0
+        self.x1 = x1
+        self.halo = halo
+        self.dirty = set()
+
+    def owns(self, cell: Tuple[int, int]) -> bool:
+        return self.x0 <= cell[0] < self.x1
+
+    def border_cells(self):
+        for x in (*range(self.x0, self.x0 + self.halo), *range(self.x1 - self.halo, self.x1)):
+            for y in range(self.rows):
+                yield x, y
+
+    def _touch(self, cell: Tuple[int, int]):
+        x = cell[0]
+        if self.x0 <= x < self.x0 + self.halo or self.x1 - self.halo <= x < self.x1:
+            self.dirty.add(cell)
+
+    def occupy(self, cell, worm):
+        super().occupy(cell, worm)
+        self._touch(cell)
+
+    def vacate(self, cell):
+        super().vacate(cell)
+        self._touch(cell)
+
+    def add_pellet(self, gx, gy, type_index):
+        pellet = super().add_pellet(gx, gy, type_index)
+        self._touch((gx, gy))
+        return pellet
+
+    def remove_pellet(self, gx, gy):
+        pellet = super().remove_pellet(gx, gy)
+        self._touch((gx, gy))
+        return pellet
+
+    def spawn_pellet(self):
+        """Comme World.spawn_pellet, limité à la bande ; None si la bande est pleine."""
+        for _ in range(SPAWN_ATTEMPTS):
+            cell = (self.rng.randrange(self.x0, self.x1), self.rng.randrange(self.rows))
+            if cell not in self.bodies and cell not in self.pellet_cells:
+                break
+        else:
+            # Bande encombrée (rare) : on tire parmi ses cases réellement libres
+            free = [
+                (x, y) for x in range(self.x0, self.x1) for y in range(self.rows)
+                if (x, y) not in self.bodies and (x, y) not in self.pellet_cells
+            ]
+            if not free:
+                return None
+            cell = self.rng.choice(free)
+
+        gx, gy = cell
+        return self.add_pellet(gx, gy, self.rng.randrange(len(PELLET_TYPES)))
+
+
+class Shard:
+    """
+    Une bande du monde et les vers dont la tête s'y trouve. Chaque méthode publique est
+    une étape du tick, appelée par le coordinateur avec ce que les autres shards lui envoient.
+    """
+
+    def __init__(self, index, layout: StripLayout, rows, halo, pellet_count, seed, policy=None):
+        x0, x1 = layout.bounds[index]
+        self.index = index
+        self.seed = seed
+        self.policy = policy or GREEDY_POLICY
+        self.world = ShardWorld(layout.columns, rows, x0, x1, halo, pellet_count, derive_rng(seed, f"shard-{index}"))
+        self.worms: Dict[int, AIWorm] = {}
+        self.ghosts: Dict[int, GhostWorm] = {}
+        self.moves: Dict[int, Tuple[Tuple[int, int], bool]] = {}  # tick en cours : ver -> (tête visée, garde sa queue)
+
+    def owner(self, worm_id: int):
+        """Propriétaire à inscrire dans world.bodies : le ver s'il est à nous, sinon son fantôme."""
+        worm = self.worms.get(worm_id)
+        if worm is not None:
+            return worm
+        ghost = self.ghosts.get(worm_id)
+        if ghost is None:
+            ghost = self.ghosts[worm_id] = GhostWorm(worm_id)
+        return ghost
+
+    def border_changes(self):
+        """État actuel des cases frontières modifiées depuis le dernier appel, côté gauche et côté droit."""
+        world = self.world
+        left, right = [], []
+        for cell in world.dirty:
+            owner = world.bodies.get(cell)
+            pellet = world.pellet_cells.get(cell)
+            change = (cell, None if owner is None else owner.worm_id, None if pellet is None else pellet.type_index)
+            (left if cell[0] < world.x0 + world.halo else right).append(change)
+        world.dirty.clear()
+        return left, right
+
+    def start(self, spawns):
+        """Place les vers de départ (identifiant, case) puis les boulettes de la bande."""
+        world = self.world
+        for worm_id, cell in spawns:
+            worm = AIWorm(rng=derive_rng(self.seed, f"worm-{worm_id}"), policy=self.policy)
+            worm.worm_id = worm_id
+            worm.cells = WormBody([cell])
+            self.worms[worm_id] = worm
+            world.occupy(cell, worm)
+        world.reset()
+        world.dirty.update(world.border_cells())
+        return self.border_changes()
+
+    def decide(self, ghost_changes):
+        """Rafraîchit le halo, décide pour tous nos vers et retourne leurs intentions."""
+        world = self.world
+        for cell, worm_id, type_index in ghost_changes:
+            if worm_id is None:
+                world.bodies.pop(cell, None)
+            else:
+                world.bodies[cell] = self.owner(worm_id)
+            pellet = world.pellet_cells.get(cell)
+            if pellet is not None and pellet.type_index != type_index:
+                world.remove_pellet(*cell)
+                pellet = None
+            if pellet is None and type_index is not None:
+                world.add_pellet(cell[0], cell[1], type_index)
+
+        worms = list(self.worms.values())
+        decide_directions(world, worms)
+
+        intents = []
+        self.moves.clear()
+        for worm in worms:
+            head_x, head_y = worm.head
+            dx, dy = worm.direction
+            new_head = (head_x + dx, head_y + dy)
+            grows = keeps_tail(world, worm, new_head)
+            self.moves[worm.worm_id] = (new_head, grows)
+            intents.append((worm.worm_id, worm.head, new_head, None if grows else worm.cells.tail))
+        return intents
+
+    def judge(self, intents):
+        """
+        Juge les intentions qui visent une case de la bande (ou un mur depuis la bande),
+        comme resolve_moves, puis met à jour les cases de la bande.
+        Retourne les verdicts (ver, cause de mort ou None, score gagné, croissance gagnée).
+        """
+        world = self.world
+        columns, rows, bodies, owns = world.columns, world.rows, world.bodies, world.owns
+        leaving = {tail for _, _, _, tail in intents if tail is not None and owns(tail)}
+        targets = Counter(new_head for _, _, new_head, _ in intents)
+        next_heads = {head: new_head for _, head, new_head, _ in intents if owns(head)}
+
+        verdicts = []
+        arrivals = []
+        for worm_id, head, new_head, _ in intents:
+            x, y = new_head
+            inside = 0 <= x < columns and 0 <= y < rows
+            if not (owns(new_head) if inside else owns(head)):
+                continue
+            if not inside:
+                cause = WALL_DEATH
+            elif new_head in bodies and new_head not in leaving:
+                cause = BODY_DEATH
+            elif targets[new_head] > 1 or next_heads.get(new_head) == head:
+                cause = HEAD_ON_DEATH
+            else:
+                cause = None
+                arrivals.append((len(verdicts), worm_id, new_head))
+            verdicts.append([worm_id, cause, 0, 0])
+
+        # Les queues libérées d'abord, puis les têtes, puis les boulettes mangées
+        for tail in leaving:
+            world.vacate(tail)
+        for _, worm_id, new_head in arrivals:
+            world.occupy(new_head, self.owner(worm_id))
+        for i, _, (gx, gy) in arrivals:
+            verdicts[i][2:] = world.eat_pellets_at(gx, gy)
+        return verdicts
+
+    def apply(self, verdicts):
+        """Applique les verdicts à nos vers. Retourne les morts (ver, cases, cases semées, cause) et les vers qui partent."""
+        world = self.world
+        deaths = []
+        leavers = []
+        for worm_id, cause, score_delta, growth_delta in verdicts:
+            worm = self.worms[worm_id]
+            new_head, grows = self.moves[worm_id]
+
+            if cause is not None:
+                worm.alive = False
+                del self.worms[worm_id]
+                cells = list(worm.cells)
+                step = max(1, len(cells) // (worm.spleen + 1))
+                deaths.append((worm_id, cells, cells[::step], cause))
+                continue
+
+            if not grows:
+                worm.cells.pop_tail()
+            worm.cells.push_head(new_head)
+            if score_delta > 0:
+                worm.score += score_delta
+                worm.growth_pending += growth_delta
+                worm.spleen += 1
+            if grows:
+                worm.growth_pending -= 1
+
+            if not world.owns(new_head):
+                # La tête a passé la frontière : le ver change de shard, ses cases restent ici
+                del self.worms[worm_id]
+                ghost = self.owner(worm_id)
+                for cell in worm.cells:
+                    if world.bodies.get(cell) is worm:
+                        world.occupy(cell, ghost)
+                worm.policy = None  # la shard d'arrivée lui donne la sienne
+                leavers.append(worm)
+        return deaths, leavers
+
+    def settle(self, payload):
+        """Libère les cases des morts et y sème leurs boulettes, adopte les vers arrivés, puis publie la frontière."""
+        deaths, arrivals = payload
+        world = self.world
+        for worm_id, cells, seeded, _ in deaths:
+            for cell in cells:
+                owner = world.bodies.get(cell)
+                if owner is not None and owner.worm_id == worm_id and world.owns(cell):
+                    world.vacate(cell)
+            # Comme World.spawn_pellets_from_death, sur les cases de la bande
+            for gx, gy in seeded:
+                if world.owns((gx, gy)) and (gx, gy) not in world.pellet_cells and (gx, gy) not in world.bodies:
+                    world.add_pellet(gx, gy, world.rng.randrange(len(PELLET_TYPES)))
+
+        for worm in arrivals:
+            worm.policy = self.policy
+            ghost = self.owner(worm.worm_id)
+            self.worms[worm.worm_id] = worm
+            for cell in worm.cells:
+                if world.bodies.get(cell) is ghost:
+                    world.occupy(cell, worm)
+        return self.border_changes()
+
+    def gather(self, _=None):
+        """Vers et boulettes de la bande, pour le coordinateur."""
+        world = self.world
+        worms = [(worm.worm_id, list(worm.cells), worm.color, worm.score) for worm in self.worms.values()]
+        pellets = [pellet for cell, pellet in world.pellet_cells.items() if world.owns(cell)]
+        return worms, pellets
+
+
+def _shard_loop(conn, *args):
+    """Processus d'une shard : exécute chaque étape demandée par le coordinateur et renvoie son résultat."""
+    shard = Shard(*args)
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        command, payload = message
+        conn.send(getattr(shard, command)(payload))
+    conn.close()
+
+
+class LocalConnection:
+    """Tient lieu de tube vers un processus quand la shard tourne dans le processus courant (tests, débogage)."""
+
+    def __init__(self, shard: Shard):
+        self.shard = shard
+        self.reply = None
+
+    def send(self, message):
+        if message is not None:
+            command, payload = message
+            self.reply = getattr(self.shard, command)(payload)
+
+    def recv(self):
+        return self.reply
+
+
+class ShardedSimulation:
+    """
+    Coordinateur d'une arène de bots découpée en bandes verticales, une shard par processus.
+    Il ne simule rien lui-même : il relaie les messages entre shards à chaque étape du tick
+    et rassemble l'état du monde pour le rendu ou l'entraînement (gather).
+    Avec processes=False, les shards tournent dans le processus courant, à l'identique.
+    """
+
+    def __init__(self, shards=4, columns=None, rows=None, num_bots=1000, pellet_count=None, seed=None,
+                 halo=SHARD_HALO, processes=True, bot_policy=None):
+        self.columns = columns or WORLD_COLUMNS
+        self.rows = rows or WORLD_ROWS
+        self.layout = StripLayout(self.columns, shards, halo)
+        pellet_count = INITIAL_PELLET_COUNT if pellet_count is None else pellet_count
+        self.seed = random.randrange(2 ** 63) if seed is None else seed
+
+        self.connections = []
+        self.processes = []
+        for index, (x0, x1) in enumerate(self.layout.bounds):
+            args = (index, self.layout, self.rows, halo, pellet_count * x1 // self.columns - pellet_count * x0 // self.columns,
+                    self.seed, bot_policy)
+            if processes:
+                parent_conn, child_conn = mp.Pipe()
+                process = mp.Process(target=_shard_loop, args=(child_conn, *args), daemon=True)
+                process.start()
+                self.connections.append(parent_conn)
+                self.processes.append(process)
+            else:
+                self.connections.append(LocalConnection(Shard(*args)))
+
+        self.ticks = 0
+        self.alive = num_bots
+        self.deaths = Counter()  # cause -> nombre de morts
+
+        # Vers de départ sur des cases distinctes, tirées par le coordinateur
+        spawn_rng = derive_rng(self.seed, "spawns")
+        cells = set()
+        while len(cells) < num_bots:
+            cells.add((spawn_rng.randrange(self.columns), spawn_rng.randrange(self.rows)))
+        spawns = [[] for _ in self.layout.bounds]
+        for worm_id, cell in enumerate(sorted(cells)):
+            spawns[self.layout.owner(cell[0])].append((worm_id, cell))
+        self.ghost_changes = self._route_borders(self._call_all("start", spawns))
+
+    def _call_all(self, command, payloads) -> list:
+        """Envoie une étape à toutes les shards (qui travaillent en parallèle), puis attend leurs réponses."""
+        for conn, payload in zip(self.connections, payloads):
+            conn.send((command, payload))
+        return [conn.recv() for conn in self.connections]
+
+    def _route_borders(self, replies) -> List[list]:
+        """Les changements de frontière de chaque shard partent vers le halo de ses voisines."""
+        routed = [[] for _ in self.connections]
+        for index, (left, right) in enumerate(replies):
+            if index > 0:
+                routed[index - 1].extend(left)
+            if index + 1 < len(routed):
+                routed[index + 1].extend(right)
+        return routed
+
+    def step(self):
+        """Avance l'arène d'un tick."""
+        layout, columns = self.layout, self.columns
+        shard_count = len(self.connections)
+
+        # 1. Intentions, envoyées à la shard de la case visée, de la tête et de la queue libérée
+        routed = [[] for _ in range(shard_count)]
+        home = {}
+        for index, intents in enumerate(self._call_all("decide", self.ghost_changes)):
+            for intent in intents:
+                worm_id, _, new_head, tail = intent
+                home[worm_id] = index
+                destinations = {index}
+                if 0 <= new_head[0] < columns:
+                    destinations.add(layout.owner(new_head[0]))
+                if tail is not None:
+                    destinations.add(layout.owner(tail[0]))
+                for destination in destinations:
+                    routed[destination].append(intent)
+
+        # 2. Verdicts, renvoyés à la shard de chaque ver
+        verdicts = [[] for _ in range(shard_count)]
+        for reply in self._call_all("judge", routed):
+            for verdict in reply:
+                verdicts[home[verdict[0]]].append(verdict)
+
+        # 3. Morts, envoyées aux shards de leurs cases, et vers qui changent de bande
+        deaths = [[] for _ in range(shard_count)]
+        arrivals = [[] for _ in range(shard_count)]
+        alive = len(home)
+        for dead, leavers in self._call_all("apply", verdicts):
+            alive -= len(dead)
+            for death in dead:
+                self.deaths[death[3]] += 1
+                for destination in {layout.owner(x) for x, _ in death[1]}:
+                    deaths[destination].append(death)
+            for worm in leavers:
+                arrivals[layout.owner(worm.head[0])].append(worm)
+        # Vivants en fin de tick : ceux qui ont décidé, moins les morts de ce tick
+        self.alive = alive
+
+        # 4. Morts et arrivées réglées ; la frontière de chacun part vers le halo des voisines
+        self.ghost_changes = self._route_borders(self._call_all("settle", list(zip(deaths, arrivals))))
+        self.ticks += 1
+
+    def gather(self):
+        """Rassemble l'état de toutes les shards : vers (identifiant, cases, couleur, score) et boulettes."""
+        worms, pellets = [], []
+        for shard_worms, shard_pellets in self._call_all("gather", [None] * len(self.connections)):
+            worms.extend(shard_worms)
+            pellets.extend(shard_pellets)
+        return worms, pellets
+
+    def close(self):
+        for conn in self.connections:
+            conn.send(None)
+        for process in self.processes:
+            process.join()
@@ -0,0 +1,204 @@
+# engine/simulation.py
+
+import random
+import time
+
+from config import (
+    NUM_BOTS,
+    SMALL_WORLD_COLUMNS,
+    SMALL_WORLD_ROWS,
+    SMALL_INITIAL_PELLET_COUNT,
+    SCORE_WINDOW,
+)
+from engine.telemetry import TIMEOUT, RollingStats
+from world.map import World
+from player.player import PlayerWorm
+from player.q_learning_player import QLearningWorm
+from player.ai_player import AIWorm
+from player.policy import decide_directions
+from world.moves import resolve_moves
+
+
+def derive_rng(episode_seed: int, stream: str) -> random.Random:
+    """Générateur indépendant et reproductible pour un flux (monde, ver i...) d'une partie."""
+    return random.Random(f"{episode_seed}:{stream}")
+
+
+class Simulation:
+    """
+    Moteur de jeu sans rendu : possède le monde, les vers et la boucle de tick.
+    N'importe pas arcade, ce qui permet de l'utiliser sur une machine sans écran.
+
+    Tout le hasard d'une partie découle de sa graine (episode_seed) : le monde et
+    chaque ver reçoivent leur propre random.Random dérivé de cette graine.
+    En mode `replay`, tous les vers sont de simples PlayerWorm dont la direction
+    est imposée à chaque tick (cf. engine/replay.py).
+
+    Les bots sont des AIWorm pilotés par `bot_policy` (GreedyPolicy par défaut) ; à chaque
+    tick, toutes les décisions d'une même politique sont prises en un appel (cf. player/policy.py).
+    `main_worm` remplace le ver principal créé d'après le mode (par exemple un QLearningWorm
+    sur une autre table Q) et sert pour toutes les parties.
+    """
+
+    def __init__(self, player_mode="PLAYER", seed=None, num_bots=NUM_BOTS, replay=False, world=None, bot_policy=None,
+                 main_worm=None):
+        self.player_mode = player_mode
+        self.provided_main_worm = main_worm
+        self.num_bots = num_bots
+        self.bot_policy = bot_policy
+        self.replay = replay
+        self.seed_rng = random.Random(seed)
+        self.episode_seed = None
+        self.recorder = None
+        self.metrics = None  # engine/metrics.Metrics, pour chronométrer les ticks
+        self.telemetry = None  # engine/telemetry.TelemetrySink, une ligne par partie terminée
+
+        if world is not None:
+            self.world = world
+        elif self.player_mode == "Q-LEARNING-SOLO":
+            self.world = World(
+                columns=SMALL_WORLD_COLUMNS,
+                rows=SMALL_WORLD_ROWS,
+                initial_pellet_count=SMALL_INITIAL_PELLET_COUNT,
+            )
+        else:
+            self.world = World()
+
+        self.worms = []
+        self.game_number = 0
+        self.score_history = RollingStats(SCORE_WINDOW)
+        self.episode_ticks = 0
+        self.main_death_cause = None
+        self.episode_started = time.perf_counter()
+
+        self.reset()
+
+    @property
+    def main_worm(self):
+        return self.worms[0]
+
+    @property
+    def is_over(self) -> bool:
+        """La partie est finie quand le ver principal est mort."""
+        return not self.worms[0].alive
+
+    def create_main_worm(self):
+        if self.replay:
+            return PlayerWorm()
+        if self.provided_main_worm is not None:
+            return self.provided_main_worm
+        # Le ver Q-learning est conservé d'une partie à l'autre : sa table Q
+        # reste en mémoire au lieu d'être rechargée depuis le disque.
+        if "Q-LEARNING" in self.player_mode and self.worms and isinstance(self.worms[0], QLearningWorm):
+            return self.worms[0]
+        if self.player_mode == "AI":
+            return AIWorm()
+        if "Q-LEARNING" in self.player_mode:
+            return QLearningWorm()
+        return PlayerWorm()
+
+    def reset(self, episode_seed=None):
+        """
+        Termine la partie en cours (si elle a commencé) et en démarre une nouvelle.
+        Sans episode_seed, la graine de la partie est tirée du générateur de la simulation.
+        """
+        if self.worms and self.episode_ticks > 0:
+            self.game_number += 1
+            if "Q-LEARNING" in self.player_mode:
+                self.score_history.append(self.worms[0].score)
+            if self.telemetry is not None:
+                self.record_episode()
+
+        main_worm = self.create_main_worm()
+        self.worms.clear()
+        self.worms.append(main_worm)
+
+        if self.player_mode != "Q-LEARNING-SOLO":
+            for _ in range(self.num_bots):
+                self.worms.append(PlayerWorm() if self.replay else AIWorm(policy=self.bot_policy))
+
+        if episode_seed is None:
+            episode_seed = self.seed_rng.getrandbits(63)
+        self.episode_seed = episode_seed
+        self.world.rng = derive_rng(episode_seed, "world")
+        for i, worm in enumerate(self.worms):
+            worm.rng = derive_rng(episode_seed, f"worm-{i}")
+
+        self.world.clear_bodies()
+        for worm in self.worms:
+            worm.reset(self.world)
+
+        self.world.reset()
+        self.episode_ticks = 0
+        self.main_death_cause = None
+        self.episode_started = time.perf_counter()
+
+        if self.recorder is not None:
+            self.recorder.start(self)
+
+    def step(self, directions=None):
+        """
+        Avance la simulation d'un tick : chaque ver vivant fait un pas.
+        `directions` (une par ver) impose les mouvements, pour rejouer une partie enregistrée.
+
+        Toutes les décisions sont prises sur l'état de début de tick, puis tous les pas sont
+        résolus ensemble (cf. world/moves.py) : l'ordre des vers n'influe pas sur les collisions.
+        """
+        if directions is not None:
+            for worm, direction in zip(self.worms, directions):
+                worm.direction = direction
+
+        metrics = self.metrics
+        if metrics is not None:
+            start = metrics.clock()
+
+        alive = [worm for worm in self.worms if worm.alive]
+        # Décisions par lots pour les vers pilotés par une politique, une à une pour les autres
+        decide_directions(self.world, [worm for worm in alive if worm.policy is not None])
+        for worm in alive:
+            if worm.policy is None:
+                worm.choose_direction(self.world, self.worms)
+        if metrics is not None:
+            decided = metrics.clock()
+            metrics.add_phase("decide", decided - start)
+
+        for worm, cause in resolve_moves(self.world, alive, metrics):
+            if worm is self.worms[0]:
+                self.main_death_cause = cause
+        if metrics is not None:
+            moved = metrics.clock()
+        for worm in alive:
+            worm.after_move(self.world, self.worms)
+        self.episode_ticks += 1
+
+        if metrics is not None:
+            end = metrics.clock()
+            metrics.add_phase("q_update", end - moved)
+            metrics.tick_finished(end - start)
+            if isinstance(self.worms[0], QLearningWorm):
+                metrics.q_table = self.worms[0].q_table
+
+        if self.recorder is not None:
+            self.recorder.record(self.worms)
+
+    def record_episode(self):
+        """Envoie la partie qui se termine (ver principal) à self.telemetry."""
+        worm = self.worms[0]
+        elapsed = time.perf_counter() - self.episode_started
+        self.telemetry.record(
+            worm.score,
+            len(worm.cells),
+            self.episode_ticks,
+            self.main_death_cause or TIMEOUT,
+            epsilon=getattr(worm, "epsilon", None),
+            q_table=getattr(worm, "q_table", None),
+            steps_per_second=self.episode_ticks / elapsed if elapsed > 0 else None,
+        )
+
+    def run_episode(self, max_ticks=None) -> int:
+        """Joue une partie jusqu'à la mort du ver principal (ou max_ticks). Retourne le nombre de ticks."""
+        while not self.is_over:
+            if max_ticks is not None and self.episode_ticks >= max_ticks:
+                break
+            self.step()
+        return self.episode_ticks
@@ -0,0 +1,361 @@
+# engine/snapshot.py
+
+import argparse
+import math
+import random
+import struct
+from dataclasses import dataclass
+
+import numpy as np
+
+from config import SCORE_WINDOW
+from engine.telemetry import RollingStats
+from player.ai_player import AIWorm
+from player.body import WormBody
+from player.player import PlayerWorm
+from player.q_learning_player import QLearningWorm
+from player.q_table import ACTIONS, ACTION_INDEX
+from world.free_cells import FreeCells
+from world.map import World
+
+# Format binaire de l'état complet d'une Simulation (little-endian), chaque section
+# commençant sur un multiple de 8 octets pour être lue sans copie (np.frombuffer) :
+#   en-tête     : magic "MWSN", version u8, longueur du mode u8, colonnes u16, lignes u16,
+#                 boulettes initiales u32, graine de la partie u64, ticks u32, numéro de partie u32,
+#                 longueur de score_history u32, boulettes u32, vers u32,
+#                 cases libres u32 (0xFFFFFFFF si World.free_cells n'est pas construit),
+#                 segments de corps u32 (somme des longueurs - 1)
+#   mode        : texte ASCII (player_mode)
+#   scores      : score_history, i64 chacun
+#   boulettes   : x u16..., y u16..., type u8... dans l'ordre de World.pellet_cells
+#   vers        : un enregistrement WORM_RECORD par ver
+#   générateurs : états de random.Random (624 mots + indice, u32) de seed_rng, du monde
+#                 puis de chaque ver ; puis leur gauss_next (f64, NaN si None)
+#   cases libres: indices x * rows + y u32, dans l'ordre de tirage de FreeCells
+#   corps       : pour chaque ver, de la tête vers la queue, la direction de chaque case
+#                 vers la suivante sur 2 bits (indice dans ACTIONS), 4 segments par octet
+#                 (comme dans engine/replay.py) ; les corps se suivent sans séparation
+MAGIC = b"MWSN"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHHIQIIIIIII")
+NO_FREE_CELLS = 0xFFFFFFFF
+RNG_WORDS = 625
+
+PLAYER, AI, Q_LEARNING = 0, 1, 2
+WORM_RECORD = np.dtype([
+    ("kind", "u1"),
+    ("alive", "u1"),
+    ("direction", "u1"),
+    ("color", "u1", 3),
+    ("head_x", "<u2"),
+    ("head_y", "<u2"),
+    ("length", "<u4"),
+    ("growth_pending", "<u4"),
+    ("score", "<u4"),
+    ("spleen", "<u4"),
+    ("epsilon", "<f8"),
+])
+
+ACTION_DELTAS = np.array(ACTIONS, dtype=np.int32)
+# (dx + 1) * 3 + (dy + 1) -> indice dans ACTIONS, -1 si les cases ne se touchent pas
+DELTA_CODES = np.full(9, -1, dtype=np.int8)
+for _index, (_dx, _dy) in enumerate(ACTIONS):
+    DELTA_CODES[(_dx + 1) * 3 + _dy + 1] = _index
+SHIFTS = np.array([0, 2, 4, 6], dtype=np.uint8)
+
+
+def padding(size: int) -> int:
+    return -size % 8
+
+
+def worm_kind(worm) -> int:
+    if isinstance(worm, QLearningWorm):
+        return Q_LEARNING
+    if isinstance(worm, AIWorm):
+        return AI
+    return PLAYER
+
+
+def encode_rng(rng: random.Random):
+    _, words, gauss_next = rng.getstate()
+    return words, math.nan if gauss_next is None else gauss_next
+
+
+def decode_rng(words: np.ndarray, gauss_next: float) -> random.Random:
+    rng = random.Random()
+    rng.setstate((3, tuple(words.tolist()), None if math.isnan(gauss_next) else float(gauss_next)))
+    return rng
+
+
+def pack_bodies(worms) -> bytes:
+    """Directions successives de tous les corps, 2 bits chacune (cf. le format ci-dessus)."""
+    lengths = np.array([len(worm.cells) for worm in worms], dtype=np.int64)
+    cells = np.array([cell for worm in worms for cell in worm.cells], dtype=np.int32).reshape(-1, 2)
+    steps = cells[1:] - cells[:-1]
+    # Le pas entre la queue d'un ver et la tête du suivant n'est pas un segment
+    inside = np.ones(len(steps), dtype=bool)
+    inside[np.cumsum(lengths)[:-1] - 1] = False
+    steps = steps[inside]
+    if (np.abs(steps) > 1).any():
+        raise ValueError("corps de ver non contigu : impossible de l'encoder")
+    codes = DELTA_CODES[(steps[:, 0] + 1) * 3 + steps[:, 1] + 1]
+    if (codes < 0).any():
+        raise ValueError("corps de ver non contigu : impossible de l'encoder")
+
+    codes = np.concatenate([codes.astype(np.uint8), np.zeros(-len(codes) % 4, dtype=np.uint8)])
+    return (codes.reshape(-1, 4) << SHIFTS).sum(axis=1, dtype=np.uint8).tobytes()
+
+
+def unpack_bodies(packed: np.ndarray, heads: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Cases (x, y) de tous les corps, de la tête à la queue, ver après ver."""
+    total = int(lengths.sum())
+    segments = total - len(lengths)
+    codes = ((packed[:, None] >> SHIFTS) & 3).reshape(-1)[:segments]
+
+    starts = np.cumsum(lengths) - lengths
+    is_start = np.zeros(total, dtype=bool)
+    is_start[starts] = True
+    steps = np.empty((total, 2), dtype=np.int64)
+    steps[is_start] = heads
+    steps[~is_start] = ACTION_DELTAS[codes]
+    # Somme cumulée par ver : on retranche ce qu'ont accumulé les vers précédents
+    positions = np.cumsum(steps, axis=0)
+    before = np.zeros((len(lengths), 2), dtype=np.int64)
+    before[1:] = positions[starts[1:] - 1]
+    return positions - np.repeat(before, lengths, axis=0)
+
+
+@dataclass
+class WorldSnapshot:
+    """Vue décodée d'un snapshot : les tableaux pointent dans le tampon d'origine, sans copie."""
+    player_mode: str
+    columns: int
+    rows: int
+    initial_pellet_count: int
+    episode_seed: int
+    episode_ticks: int
+    game_number: int
+    score_history: np.ndarray
+    pellet_x: np.ndarray
+    pellet_y: np.ndarray
+    pellet_types: np.ndarray
+    worms: np.ndarray  # enregistrements WORM_RECORD
+    rng_words: np.ndarray  # (2 + vers, RNG_WORDS) : seed_rng, monde, puis chaque ver
+    rng_gauss: np.ndarray
+    free_cells: np.ndarray  # None si World.free_cells n'était pas construit
+    packed_bodies: np.ndarray
+
+    def bodies(self) -> np.ndarray:
+        """Cases (x, y) de tous les corps, ver après ver ; découpe selon worms["length"]."""
+        heads = np.stack([self.worms["head_x"], self.worms["head_y"]], axis=1)
+        return unpack_bodies(self.packed_bodies, heads, self.worms["length"].astype(np.int64))
+
+
+def snapshot_bytes(simulation) -> bytes:
+    """Encode l'état complet de la simulation (monde, vers, générateurs)."""
+    world = simulation.world
+    worms = simulation.worms
+    mode = simulation.player_mode.encode("ascii")
+    free_cells = world.free_cells.indices if world.free_cells is not None else None
+    segments = sum(len(worm.cells) - 1 for worm in worms)
+
+    out = bytearray(HEADER.pack(
+        MAGIC, VERSION, len(mode), world.columns, world.rows, world.initial_pellet_count,
+        simulation.episode_seed, simulation.episode_ticks, simulation.game_number,
+        len(simulation.score_history), len(world.pellet_cells), len(worms),
+        NO_FREE_CELLS if free_cells is None else len(free_cells), segments,
+    ))
+
+    def section(data: bytes):
+        out.extend(data)
+        out.extend(bytes(padding(len(out))))
+
+    section(b"")
+    section(mode)
+    section(np.array(simulation.score_history.tolist(), dtype="<i8").tobytes())
+
+    pellets = np.array(
+        [(pellet.x, pellet.y, pellet.type_index) for pellet in world.pellet_cells.values()], dtype=np.int64
+    ).reshape(-1, 3)
+    section(pellets[:, 0].astype("<u2").tobytes() + pellets[:, 1].astype("<u2").tobytes()
+            + pellets[:, 2].astype("u1").tobytes())
+
+    records = np.zeros(len(worms), dtype=WORM_RECORD)
+    records["kind"] = [worm_kind(worm) for worm in worms]
+    records["alive"] = [worm.alive for worm in worms]
+    records["direction"] = [ACTION_INDEX[worm.direction] for worm in worms]
+    records["color"] = [worm.color for worm in worms]
+    records["head_x"] = [worm.head[0] for worm in worms]
+    records["head_y"] = [worm.head[1] for worm in worms]
+    records["length"] = [len(worm.cells) for worm in worms]
+    records["growth_pending"] = [worm.growth_pending for worm in worms]
+    records["score"] = [worm.score for worm in worms]
+    records["spleen"] = [worm.spleen for worm in worms]
+    records["epsilon"] = [getattr(worm, "epsilon", 0.0) for worm in worms]
+    section(records.tobytes())
+
+    states = [encode_rng(rng) for rng in [simulation.seed_rng, world.rng] + [worm.rng for worm in worms]]
+    section(np.array([words for words, _ in states], dtype="<u4").tobytes()
+            + np.array([gauss for _, gauss in states], dtype="<f8").tobytes())
+
+    if free_cells is not None:
+        section(np.array(free_cells, dtype="<u4").tobytes())
+    section(pack_bodies(worms) if worms else b"")
+    return bytes(out)
+
+
+def read_snapshot(data) -> WorldSnapshot:
+    """Décode un snapshot sans copier ses tableaux (bytes, bytearray, mmap ou memoryview)."""
+    buffer = memoryview(data)
+    (magic, version, mode_length, columns, rows, initial_pellet_count, episode_seed, episode_ticks,
+     game_number, history_length, num_pellets, num_worms, num_free_cells, segments) = HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("fichier de snapshot invalide ou de version inconnue")
+
+    offset = HEADER.size + padding(HEADER.size)
+
+    def take(dtype, count, shape=None):
+        nonlocal offset
+        array = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+        offset += array.nbytes
+        return array if shape is None else array.reshape(shape)
+
+    def align():
+        nonlocal offset
+        offset += padding(offset)
+
+    player_mode = bytes(buffer[offset:offset + mode_length]).decode("ascii")
+    offset += mode_length
+    align()
+    score_history = take("<i8", history_length)
+    align()
+    pellet_x = take("<u2", num_pellets)
+    pellet_y = take("<u2", num_pellets)
+    pellet_types = take("u1", num_pellets)
+    align()
+    worms = take(WORM_RECORD, num_worms)
+    align()
+    rng_words = take("<u4", (num_worms + 2) * RNG_WORDS, (num_worms + 2, RNG_WORDS))
+    rng_gauss = take("<f8", num_worms + 2)
+    align()
+    free_cells = None
+    if num_free_cells != NO_FREE_CELLS:
+        free_cells = take("<u4", num_free_cells)
+        align()
+    packed_bodies = take("u1", (segments + 3) // 4)
+
+    return WorldSnapshot(
+        player_mode, columns, rows, initial_pellet_count, episode_seed, episode_ticks, game_number,
+        score_history, pellet_x, pellet_y, pellet_types, worms, rng_words, rng_gauss, free_cells, packed_bodies,
+    )
+
+
+def restore_snapshot(simulation, data):
+    """
+    Remplace l'état de `simulation` par celui du snapshot : la suite de la partie est
+    identique, tick pour tick, à celle de la simulation sauvegardée.
+    Le ver Q-learning de la simulation est réutilisé (sa table Q n'est pas dans le snapshot),
+    les bots reçoivent simulation.bot_policy.
+    """
+    snapshot = read_snapshot(data)
+    world = simulation.world
+    if (world.columns, world.rows) != (snapshot.columns, snapshot.rows):
+        world = simulation.world = World(snapshot.columns, snapshot.rows, snapshot.initial_pellet_count)
+    world.initial_pellet_count = snapshot.initial_pellet_count
+
+    simulation.player_mode = snapshot.player_mode
+    simulation.episode_seed = snapshot.episode_seed
+    simulation.episode_ticks = snapshot.episode_ticks
+    simulation.game_number = snapshot.game_number
+    simulation.score_history = RollingStats(SCORE_WINDOW, snapshot.score_history.tolist())
+    simulation.seed_rng = decode_rng(snapshot.rng_words[0], snapshot.rng_gauss[0])
+    world.rng = decode_rng(snapshot.rng_words[1], snapshot.rng_gauss[1])
+
+    previous = simulation.worms[0] if simulation.worms else None
+    bodies = snapshot.bodies()
+    cells = list(zip(bodies[:, 0].tolist(), bodies[:, 1].tolist()))
+    starts = np.cumsum(snapshot.worms["length"], dtype=np.int64) - snapshot.worms["length"]
+    worms = []
+    for i, (record, start) in enumerate(zip(snapshot.worms, starts.tolist())):
+        kind = int(record["kind"])
+        if kind == Q_LEARNING:
+            worm = previous if i == 0 and isinstance(previous, QLearningWorm) else QLearningWorm()
+            worm.epsilon = float(record["epsilon"])
+            worm.last_state = None
+            worm.last_action = None
+            worm.last_score = int(record["score"])
+        elif kind == AI:
+            worm = AIWorm() if i == 0 else AIWorm(policy=simulation.bot_policy)
+        else:
+            worm = PlayerWorm()
+        worm.rng = decode_rng(snapshot.rng_words[i + 2], snapshot.rng_gauss[i + 2])
+        worm.cells = WormBody(cells[start:start + int(record["length"])])
+        worm.alive = bool(record["alive"])
+        worm.direction = ACTIONS[record["direction"]]
+        worm.color = tuple(record["color"].tolist())
+        worm.growth_pending = int(record["growth_pending"])
+        worm.score = int(record["score"])
+        worm.spleen = int(record["spleen"])
+        worms.append(worm)
+    simulation.worms[:] = worms
+
+    # clear_bodies abandonne World.free_cells : l'index des corps se remplit sans occupy
+    world.clear_bodies()
+    for worm in worms:
+        if worm.alive:
+            world.bodies.update(dict.fromkeys(worm.cells, worm))
+
+    # Réinsérées dans leur ordre d'origine, les boulettes retrouvent le même ordre dans
+    # chaque index du monde (départage des égalités de pellet_grid et pellet_positions)
+    world.clear_pellets()
+    for x, y, type_index in zip(snapshot.pellet_x.tolist(), snapshot.pellet_y.tolist(), snapshot.pellet_types.tolist()):
+        world.add_pellet(x, y, type_index)
+    if snapshot.free_cells is not None:
+        world.free_cells = FreeCells.from_indices(world.columns, world.rows, snapshot.free_cells.tolist())
+
+    if simulation.recorder is not None:
+        simulation.recorder.start(simulation)
+
+
+def save_snapshot(simulation, path: str):
+    with open(path, "wb") as f:
+        f.write(snapshot_bytes(simulation))
+
+
+def load_snapshot(path: str, bot_policy=None):
+    """Nouvelle Simulation reprenant l'état sauvegardé dans `path`."""
+    # Import local : engine.simulation n'a pas besoin de ce module
+    from engine.simulation import Simulation
+
+    with open(path, "rb") as f:
+        data = f.read()
+    snapshot = read_snapshot(data)
+    world = World(snapshot.columns, snapshot.rows, snapshot.initial_pellet_count)
+    simulation = Simulation(
+        snapshot.player_mode, num_bots=max(0, len(snapshot.worms) - 1), world=world, bot_policy=bot_policy
+    )
+    restore_snapshot(simulation, data)
+    return simulation
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Affiche le contenu d'un snapshot de partie.")
+    parser.add_argument("path")
+    args = parser.parse_args()
+
+    with open(args.path, "rb") as f:
+        data = f.read()
+    snapshot = read_snapshot(data)
+    lengths = snapshot.worms["length"]
+    print(
+        f"{snapshot.player_mode} | carte {snapshot.columns}x{snapshot.rows} | tick {snapshot.episode_ticks} "
+        f"de la partie {snapshot.game_number} (graine {snapshot.episode_seed})"
+    )
+    print(
+        f"{len(snapshot.pellet_x)} boulettes | {len(lengths)} vers dont {int(snapshot.worms['alive'].sum())} vivants | "
+        f"longueur max {int(lengths.max()) if len(lengths) else 0} | {len(data)} octets"
+    )
+
+
+if __name__ == "__main__":
+    main()
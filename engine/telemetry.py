@@ -0,0 +1,240 @@
+# engine/telemetry.py
+#
+# Télémétrie des parties : une ligne par partie dans un CSV ouvert en ajout seul, et
+# moyennes glissantes en O(1). Tracé des courbes d'apprentissage, hors ligne :
+#   python -m engine.telemetry run.csv --window 100 --output courbes.png
+
+import argparse
+import csv
+import math
+import os
+import time
+
+import numpy as np
+
+from config import SCORE_WINDOW, TELEMETRY_FLUSH_SECONDS, TELEMETRY_Q_TABLE_EVERY_SECONDS
+from world.moves import BODY_DEATH, HEAD_ON_DEATH, WALL_DEATH
+
+# Colonnes du fichier, dans l'ordre. death_cause vaut TIMEOUT quand la partie a été arrêtée
+# (max_ticks) avec le ver encore vivant ; epsilon et q_table_size restent vides sans Q-learning.
+EPISODE_COLUMNS = ("episode", "score", "length", "steps", "death_cause", "epsilon", "q_table_size", "steps_per_second")
+TIMEOUT = "timeout"
+END_CAUSES = (WALL_DEATH, BODY_DEATH, HEAD_ON_DEATH, TIMEOUT)
+
+
+class RollingStats:
+    """
+    Moyenne et écart-type des `size` dernières valeurs, en O(1) par ajout : tampon circulaire
+    et sommes courantes. Les sommes sont recalculées à chaque tour du tampon (coût amorti
+    constant), pour que les erreurs d'arrondi ne s'accumulent pas sur un long entraînement.
+    """
+
+    def __init__(self, size: int = SCORE_WINDOW, values=()):
+        self.size = size
+        self.buffer = [0] * size
+        self.count = 0  # valeurs ajoutées depuis la création
+        self.total = 0
+        self.total_squares = 0
+        self.extend(values)
+
+    def append(self, value):
+        index = self.count % self.size
+        if self.count >= self.size:
+            old = self.buffer[index]
+            self.total -= old
+            self.total_squares -= old * old
+        self.buffer[index] = value
+        self.total += value
+        self.total_squares += value * value
+        self.count += 1
+        if index == self.size - 1:
+            self.total = sum(self.buffer)
+            self.total_squares = sum(v * v for v in self.buffer)
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    def __len__(self) -> int:
+        return min(self.count, self.size)
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    @property
+    def mean(self) -> float:
+        return self.total / len(self) if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        if not self.count:
+            return 0.0
+        mean = self.mean
+        return math.sqrt(max(0.0, self.total_squares / len(self) - mean * mean))
+
+    def tolist(self) -> list:
+        """Les valeurs de la fenêtre, de la plus ancienne à la plus récente."""
+        if self.count < self.size:
+            return self.buffer[:self.count]
+        index = self.count % self.size
+        return self.buffer[index:] + self.buffer[:index]
+
+
+def _last_episode(path: str) -> int:
+    """Numéro de la dernière partie d'un fichier existant, lu à la fin du fichier seulement."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - 4096))
+        lines = f.read().splitlines()
+    for line in reversed(lines):
+        field = line.split(b",", 1)[0]
+        if field.isdigit():
+            return int(field)
+    return 0
+
+
+class TelemetrySink:
+    """
+    Écrit une ligne (EPISODE_COLUMNS) par partie terminée dans un CSV jamais réécrit :
+    relancer un entraînement sur le même fichier prolonge les courbes, numéros de partie compris.
+    Les lignes passent par le tampon du fichier et sont écrites au plus tard
+    TELEMETRY_FLUSH_SECONDS après ; la taille de la table Q (un parcours de toute la table
+    quand elle est dense) n'est relevée qu'une fois par TELEMETRY_Q_TABLE_EVERY_SECONDS.
+    S'attache à Simulation.telemetry (None par défaut).
+    """
+
+    def __init__(self, path: str, flush_every: float = TELEMETRY_FLUSH_SECONDS,
+                 q_table_every: float = TELEMETRY_Q_TABLE_EVERY_SECONDS):
+        self.path = path
+        self.flush_every = flush_every
+        self.q_table_every = q_table_every
+        self.episodes = 0
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, newline="") as f:
+                header = next(csv.reader(f), [])
+            if tuple(header) != EPISODE_COLUMNS:
+                raise ValueError(f"{path} n'est pas un fichier de télémétrie (colonnes {header})")
+            self.episodes = _last_episode(path)
+            self.file = open(path, "a", newline="")
+            self.writer = csv.writer(self.file)
+        else:
+            self.file = open(path, "w", newline="")
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(EPISODE_COLUMNS)
+        self.last_flush = time.perf_counter()
+        self.q_table_size = 0
+        self.q_table_counted = -math.inf
+
+    def record(self, score, length, steps, death_cause, epsilon=None, q_table=None, steps_per_second=None):
+        now = time.perf_counter()
+        if q_table is not None and now - self.q_table_counted >= self.q_table_every:
+            self.q_table_size = q_table.size
+            self.q_table_counted = now
+        self.episodes += 1
+        self.writer.writerow((
+            self.episodes,
+            score,
+            length,
+            steps,
+            death_cause,
+            "" if epsilon is None else f"{epsilon:.6g}",
+            "" if q_table is None else self.q_table_size,
+            "" if steps_per_second is None else f"{steps_per_second:.1f}",
+        ))
+        if now - self.last_flush >= self.flush_every:
+            self.file.flush()
+            self.last_flush = now
+
+    def close(self):
+        self.file.close()
+
+
+def read_telemetry(path: str) -> dict:
+    """Les colonnes du fichier : tableaux float (NaN là où la case est vide), death_cause en str."""
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        if tuple(header) != EPISODE_COLUMNS:
+            raise ValueError(f"{path} n'est pas un fichier de télémétrie (colonnes {header})")
+        rows = list(reader)
+    columns = list(zip(*rows)) if rows else [()] * len(EPISODE_COLUMNS)
+    data = {}
+    for name, values in zip(EPISODE_COLUMNS, columns):
+        if name == "death_cause":
+            data[name] = np.array(values, dtype=str)
+        else:
+            data[name] = np.array([float(v) if v else np.nan for v in values], dtype=np.float64)
+    return data
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Moyenne des `window` dernières valeurs à chaque rang (des premières seulement au début)."""
+    sums = np.cumsum(values)
+    sums[window:] = sums[window:] - sums[:-window]
+    return sums / np.minimum(np.arange(1, len(values) + 1), window)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Résume et trace les courbes d'apprentissage d'un fichier de télémétrie.")
+    parser.add_argument("path")
+    parser.add_argument("--window", type=int, default=SCORE_WINDOW, help="parties de la moyenne glissante")
+    parser.add_argument("--output", help="image des courbes (sinon, fenêtre matplotlib)")
+    parser.add_argument("--no-plot", action="store_true", help="résumé texte seulement")
+    args = parser.parse_args()
+
+    data = read_telemetry(args.path)
+    episodes = data["episode"]
+    if not len(episodes):
+        raise SystemExit(f"{args.path} : aucune partie")
+    recent = slice(-args.window, None)
+    causes = data["death_cause"]
+    print(
+        f"{len(episodes)} parties | score moyen (dernières {args.window}) {np.mean(data['score'][recent]):.2f} | "
+        f"meilleur score {np.max(data['score']):.0f} | survie moyenne {np.mean(data['steps'][recent]):.1f} ticks"
+    )
+    print("Fins de partie (dernières {}) : ".format(args.window) + ", ".join(
+        f"{cause} {np.mean(causes[recent] == cause):.0%}" for cause in END_CAUSES
+    ))
+    if args.no_plot:
+        return
+
+    try:
+        import matplotlib
+        if args.output:
+            matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        raise SystemExit("matplotlib est nécessaire pour tracer les courbes (ou --no-plot)")
+
+    figure, axes = plt.subplots(3, 2, figsize=(12, 10), sharex=True)
+    for ax, name, label in (
+        (axes[0, 0], "score", "Score"),
+        (axes[0, 1], "steps", "Ticks survécus"),
+        (axes[2, 1], "steps_per_second", "Ticks/s"),
+    ):
+        values = data[name]
+        ax.plot(episodes, values, alpha=0.25, linewidth=0.5)
+        ax.plot(episodes, rolling_mean(np.nan_to_num(values), args.window), linewidth=1.5)
+        ax.set_ylabel(label)
+    axes[1, 0].stackplot(
+        episodes, [rolling_mean((causes == cause).astype(np.float64), args.window) for cause in END_CAUSES],
+        labels=END_CAUSES,
+    )
+    axes[1, 0].set_ylabel("Fins de partie")
+    axes[1, 0].legend(loc="upper right", fontsize="small")
+    axes[1, 1].plot(episodes, data["epsilon"])
+    axes[1, 1].set_ylabel("Epsilon")
+    axes[2, 0].plot(episodes, data["q_table_size"])
+    axes[2, 0].set_ylabel("États de la table Q")
+    for ax in axes[-1]:
+        ax.set_xlabel("Partie")
+    figure.suptitle(f"{args.path} (moyenne glissante sur {args.window} parties)")
+    figure.tight_layout()
+    if args.output:
+        figure.savefig(args.output, dpi=120)
+    else:
+        plt.show()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 # game_view.py
 
+import time
+
 import arcade
 
 from config import (
@@ -7,18 +9,15 @@ from config import (
     SCREEN_HEIGHT,
     GRID_SIZE,
     MOVE_INTERVAL,
-    WORLD_WIDTH,
-    WORLD_HEIGHT,
-    PELLET_TYPES,
-    NUM_BOTS,
-    SMALL_WORLD_COLUMNS,
-    SMALL_WORLD_ROWS,
-    SMALL_INITIAL_PELLET_COUNT,
+    MAX_CATCH_UP_SECONDS,
+    SPEED_MULTIPLIERS,
+    UNLIMITED_FRAME_BUDGET,
+    RESTART_DELAY,
 )
-from world.map import World
-from player.player import PlayerWorm
-from player.q_learning_player import QLearningWorm
-from player.ai_player import AIWorm
+from engine.metrics import Metrics
+from engine.simulation import Simulation
+from training.checkpoint import Checkpointer
+from world_renderer import WorldRenderer
 
 
 class GameView(arcade.View):
@@ -33,76 +32,87 @@ class GameView(arcade.View):
         self.world_camera.match_window()
         self.ui_camera.match_window()
 
-        if self.player_mode == "Q-LEARNING-SOLO":
-            self.world = World(
-                columns=SMALL_WORLD_COLUMNS,
-                rows=SMALL_WORLD_ROWS,
-                initial_pellet_count=SMALL_INITIAL_PELLET_COUNT,
-            )
-        else:
-            self.world = World()
-        
-        self.worms = []
+        self.simulation = Simulation(self.player_mode)
         self.time_since_last_move = 0.0
-
-        self.game_number = 0
-        self.score_history = []
         self.restart_timer = 0.0
-        
-        self.reset()
+        self.speed_index = 0  # indice dans SPEED_MULTIPLIERS
+        self.renderer = WorldRenderer(self.simulation)
+        self.show_metrics = False  # touche M : instrumentation et son affichage
 
-    def reset(self):
-        if self.worms and not self.worms[0].alive:
-            self.game_number += 1
-            if "Q-LEARNING" in self.player_mode:
-                self.score_history.append(self.worms[0].score)
-                if len(self.score_history) > 100:
-                    self.score_history.pop(0)
-
-        self.worms.clear()
-
-        # Create main player
-        if self.player_mode == "AI":
-            main_worm = AIWorm()
-        elif "Q-LEARNING" in self.player_mode:
-            main_worm = QLearningWorm()
-        else:
-            main_worm = PlayerWorm()
-        self.worms.append(main_worm)
+        # Sauvegarde de la table Q hors de la boucle de rendu
+        self.checkpointer = None
+        if "Q-LEARNING" in self.player_mode:
+            self.checkpointer = Checkpointer(self.simulation.main_worm.q_table_path)
 
-        if self.player_mode != "Q-LEARNING-SOLO":
-            for _ in range(NUM_BOTS):
-                self.worms.append(AIWorm())
+        self.update_camera()
+
+    @property
+    def world(self):
+        return self.simulation.world
 
-        all_cells = []
-        for worm in self.worms:
-            worm.reset(self.world)
-            all_cells.extend(worm.cells)
+    @property
+    def worms(self):
+        return self.simulation.worms
 
-        self.world.reset(all_cells)
+    def reset(self):
+        self.simulation.reset()
         self.time_since_last_move = 0.0
         self.restart_timer = 0.0
         self.update_camera()
 
-    def on_update(self, delta_time: float):
-        if not self.worms[0].alive:
-            if self.player_mode == "Q-LEARNING-SOLO":
-                self.restart_timer += delta_time
-                if self.restart_timer > 1.0:
-                    if "Q-LEARNING" in self.player_mode and self.worms:
-                        self.worms[0].save_q_table()
-                    self.reset()
+    def checkpoint(self, force=False):
+        if self.checkpointer is None:
             return
+        worm = self.simulation.main_worm
+        if force:
+            self.checkpointer.save(worm.q_table, worm.epsilon, self.simulation.game_number)
+        else:
+            self.checkpointer.episode_finished(worm.q_table, worm.epsilon, self.simulation.game_number)
+
+    @property
+    def speed(self):
+        """Multiplicateur de vitesse courant, None pour « illimité »."""
+        return SPEED_MULTIPLIERS[self.speed_index]
+
+    def tick(self):
+        """
+        Avance la partie d'un pas fixe de MOVE_INTERVAL.
+        Retourne False si la partie est finie et attend le joueur.
+        """
+        if self.simulation.is_over:
+            if self.player_mode != "Q-LEARNING-SOLO":
+                return False
+            self.restart_timer += MOVE_INTERVAL
+            if self.restart_timer > RESTART_DELAY or self.speed is None:
+                self.simulation.reset()
+                self.restart_timer = 0.0
+                self.checkpoint()
+            return True
+
+        self.simulation.step()
+        return True
 
-        self.time_since_last_move += delta_time
-        if self.time_since_last_move >= MOVE_INTERVAL:
+    def on_update(self, delta_time: float):
+        if self.speed is None:
+            # Aussi vite que possible pendant le budget de la frame
+            deadline = time.perf_counter() + UNLIMITED_FRAME_BUDGET
+            while time.perf_counter() < deadline and self.tick():
+                pass
             self.time_since_last_move = 0.0
-            
-            for worm in self.worms:
-                if worm.alive:
-                    worm.step(self.world, self.worms)
-            
-            self.update_camera()
+        else:
+            # Accumulateur : le temps écoulé est converti en pas fixes, le retard est rattrapé
+            # dans la limite de MAX_CATCH_UP_SECONDS
+            self.time_since_last_move = min(
+                self.time_since_last_move + delta_time * self.speed,
+                MAX_CATCH_UP_SECONDS * self.speed,
+            )
+            while self.time_since_last_move >= MOVE_INTERVAL:
+                self.time_since_last_move -= MOVE_INTERVAL
+                if not self.tick():
+                    self.time_since_last_move = 0.0
+                    break
+
+        self.update_camera()
 
     def update_camera(self):
         main_player = self.worms[0]
@@ -132,56 +142,37 @@ class GameView(arcade.View):
             y = min(max(head_y, min_y), max_y)
 
         self.world_camera.position = (x, y)
+        self.view_rect = (x - half_w, y - half_h, x + half_w, y + half_h)
 
     def on_draw(self):
         self.clear()
         self.world_camera.use()
-        self.draw_background()
-        self.draw_pellets()
-        self.draw_worms()
+        if self.speed is not None:
+            metrics = self.simulation.metrics
+            if metrics is not None:
+                start = metrics.clock()
+            self.renderer.draw(self.view_rect)
+            if metrics is not None:
+                metrics.frame_rendered(metrics.clock() - start)
         self.ui_camera.use()
         self.draw_ui()
 
-    def draw_background(self):
-        world_width = self.world.columns * GRID_SIZE
-        world_height = self.world.rows * GRID_SIZE
-        arcade.draw_lbwh_rectangle_filled(0, 0, world_width, world_height, (5, 5, 15))
-        
-        step = GRID_SIZE * 4
-        for x in range(0, int(world_width), step):
-            for y in range(0, int(world_height), step):
-                arcade.draw_circle_filled(x + GRID_SIZE // 2, y + GRID_SIZE // 2, 1.5, (35, 35, 70))
-
-    def draw_pellets(self):
-        for pellet in self.world.pellets:
-            px = pellet.x * GRID_SIZE + GRID_SIZE / 2
-            py = pellet.y * GRID_SIZE + GRID_SIZE / 2
-            spec = PELLET_TYPES[pellet.type_index]
-            radius = spec.get("radius", GRID_SIZE // 3)
-            color = spec.get("color", arcade.color.YELLOW)
-            arcade.draw_circle_filled(px, py, radius, color)
-
-    def draw_worms(self):
-        for worm in self.worms:
-            if not worm.alive:
-                continue
-            
-            for i, (gx, gy) in enumerate(worm.cells):
-                cx = gx * GRID_SIZE + GRID_SIZE / 2
-                cy = gy * GRID_SIZE + GRID_SIZE / 2
-                radius = GRID_SIZE * 0.55 if i == 0 else GRID_SIZE * 0.48
-                arcade.draw_circle_filled(cx, cy, radius, worm.color)
-
     def draw_ui(self):
         main_player = self.worms[0]
         arcade.draw_text(f"Score : {main_player.score}", 10, SCREEN_HEIGHT - 30, arcade.color.WHITE, 16)
 
         if "Q-LEARNING" in self.player_mode:
-            avg_score = sum(self.score_history) / len(self.score_history) if self.score_history else 0
-            arcade.draw_text(f"Game: {self.game_number}", 10, SCREEN_HEIGHT - 60, arcade.color.WHITE, 16)
+            avg_score = self.simulation.score_history.mean
+            arcade.draw_text(f"Game: {self.simulation.game_number}", 10, SCREEN_HEIGHT - 60, arcade.color.WHITE, 16)
             arcade.draw_text(f"Epsilon: {main_player.epsilon:.3f}", 10, SCREEN_HEIGHT - 90, arcade.color.WHITE, 16)
             arcade.draw_text(f"Q-table size: {main_player.q_table_size}", 10, SCREEN_HEIGHT - 120, arcade.color.WHITE, 16)
             arcade.draw_text(f"Avg Score (last 100): {avg_score:.2f}", 10, SCREEN_HEIGHT - 150, arcade.color.WHITE, 16)
+            speed = "max (no render)" if self.speed is None else f"x{self.speed}"
+            arcade.draw_text(f"Speed [S]: {speed}", 10, SCREEN_HEIGHT - 180, arcade.color.WHITE, 16)
+
+        if self.show_metrics:
+            for i, line in enumerate(self.simulation.metrics.overlay_lines()):
+                arcade.draw_text(line, SCREEN_WIDTH - 10, SCREEN_HEIGHT - 30 - i * 20, arcade.color.WHITE, 12, anchor_x="right")
 
         if not main_player.alive:
             # In solo mode, don't show the restart message, as it's automatic
@@ -197,14 +188,23 @@ class GameView(arcade.View):
             if symbol in (_a.key.UP, _a.key.DOWN, _a.key.LEFT, _a.key.RIGHT):
                 self.worms[0].set_direction_from_key(symbol)
         
+        if symbol == _a.key.M:
+            self.show_metrics = not self.show_metrics
+            self.simulation.metrics = Metrics() if self.show_metrics else None
+
+        if "Q-LEARNING" in self.player_mode and symbol == _a.key.S:
+            self.speed_index = (self.speed_index + 1) % len(SPEED_MULTIPLIERS)
+            self.time_since_last_move = 0.0
+
         if self.player_mode != "Q-LEARNING-SOLO":
-            if symbol == _a.key.SPACE and not self.worms[0].alive:
-                if "Q-LEARNING" in self.player_mode and self.worms:
-                    self.worms[0].save_q_table()
+            if symbol == _a.key.SPACE and self.simulation.is_over:
                 self.reset()
+                self.checkpoint()
 			
     def on_hide_view(self):
-        if "Q-LEARNING" in self.player_mode and self.worms:
-            self.worms[0].save_q_table()
+        self.renderer.close()
+        if self.checkpointer is not None:
+            self.checkpoint(force=True)
+            self.checkpointer.close()
 
 
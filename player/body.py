@@ -0,0 +1,50 @@
+from collections import deque
+from typing import Iterable, Tuple
+
+
+class WormBody:
+    """
+    Corps d'un ver, de la tête à la queue.
+    Une deque pour ajouter la tête et retirer la queue en O(1), doublée d'un
+    ensemble pour tester l'appartenance d'une case en O(1).
+    `pushed` et `popped` comptent les têtes ajoutées et les queues retirées depuis
+    la création : un observateur (le rendu) peut ainsi ne traiter que les changements.
+    """
+
+    __slots__ = ("_cells", "_cell_set", "pushed", "popped")
+
+    def __init__(self, cells: Iterable[Tuple[int, int]] = ()):
+        self._cells = deque(cells)
+        self._cell_set = set(self._cells)
+        self.pushed = 0
+        self.popped = 0
+
+    def push_head(self, cell: Tuple[int, int]):
+        self._cells.appendleft(cell)
+        self._cell_set.add(cell)
+        self.pushed += 1
+
+    def pop_tail(self) -> Tuple[int, int]:
+        cell = self._cells.pop()
+        self._cell_set.discard(cell)
+        self.popped += 1
+        return cell
+
+    @property
+    def tail(self) -> Tuple[int, int]:
+        return self._cells[-1]
+
+    def __contains__(self, cell) -> bool:
+        return cell in self._cell_set
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def __iter__(self):
+        return iter(self._cells)
+
+    def __getitem__(self, index):
+        return self._cells[index]
+
+    def __repr__(self):
+        return f"WormBody({list(self._cells)!r})"
@@ -0,0 +1,197 @@
+# player/observation.py
+
+from typing import List, Tuple
+
+from .policy import FOOD_RADAR_RADIUS, cell_dangers
+from .q_table import ACTIONS
+
+# Au-delà de 2^61 états, la clé est repliée (réduite modulo ce nombre premier) : on accepte
+# de rares collisions plutôt que des clés qui ne tiennent plus dans un entier 64 bits
+HASH_MODULUS = (1 << 61) - 1
+
+
+def sign(value: int) -> int:
+    return (value > 0) - (value < 0)
+
+
+class Feature:
+    """
+    Une partie de l'état Q-learning. `ranges` donne, pour chaque composante, sa plus petite
+    valeur et son nombre de valeurs ; values retourne les composantes pour un ver.
+    """
+
+    name = ""
+    ranges: Tuple[Tuple[int, int], ...] = ()
+
+    def values(self, world, worm, worms) -> Tuple[int, ...]:
+        raise NotImplementedError
+
+    @property
+    def spec(self) -> str:
+        return self.name
+
+
+class FoodDirection(Feature):
+    """Direction (signes x, y) de la boulette la plus proche, strictement à moins de `radius` cases."""
+
+    name = "food"
+    ranges = ((-1, 3), (-1, 3))
+
+    def __init__(self, radius: int = FOOD_RADAR_RADIUS):
+        self.radius = radius
+
+    def values(self, world, worm, worms):
+        head_x, head_y = worm.head
+        pellet = world.nearest_pellet(head_x, head_y, max_dist=self.radius - 1)
+        if pellet is None:
+            return 0, 0
+        return sign(pellet.x - head_x), sign(pellet.y - head_y)
+
+    @property
+    def spec(self):
+        return f"food:{self.radius}"
+
+
+class Dangers(Feature):
+    """Code de danger des 4 cases voisines de la tête (cf. policy.cell_dangers)."""
+
+    name = "dangers"
+    ranges = ((0, 4),) * len(ACTIONS)
+
+    def values(self, world, worm, worms):
+        return tuple(cell_dangers(world, worm))
+
+
+class LocalWindow(Feature):
+    """Occupation (1 : mur ou corps) des k x k cases centrées sur la tête, la tête exceptée."""
+
+    name = "window"
+
+    def __init__(self, size: int = 5):
+        if size < 3 or size % 2 == 0:
+            raise ValueError("la fenêtre locale doit avoir un côté impair, au moins 3")
+        self.size = size
+        half = size // 2
+        self.offsets = [(dx, dy) for dy in range(-half, half + 1) for dx in range(-half, half + 1) if dx or dy]
+        self.ranges = ((0, 2),) * len(self.offsets)
+
+    def values(self, world, worm, worms):
+        head_x, head_y = worm.head
+        columns, rows, bodies = world.columns, world.rows, world.bodies
+        return tuple(
+            1 if not (0 <= x < columns and 0 <= y < rows) or (x, y) in bodies else 0
+            for x, y in ((head_x + dx, head_y + dy) for dx, dy in self.offsets)
+        )
+
+    @property
+    def spec(self):
+        return f"window:{self.size}"
+
+
+class WallDistances(Feature):
+    """Cases libres jusqu'au mur dans chaque direction de ACTIONS, plafonnées à `cap`."""
+
+    name = "walls"
+
+    def __init__(self, cap: int = 3):
+        self.cap = cap
+        self.ranges = ((0, cap + 1),) * len(ACTIONS)
+
+    def values(self, world, worm, worms):
+        x, y = worm.head
+        cap = self.cap
+        return min(world.rows - 1 - y, cap), min(y, cap), min(world.columns - 1 - x, cap), min(x, cap)
+
+    @property
+    def spec(self):
+        return f"walls:{self.cap}"
+
+
+class EnemyHead(Feature):
+    """Direction (signes x, y) de la tête ennemie la plus proche à moins de `radius` cases, et si elle est à 2 cases ou moins."""
+
+    name = "enemy"
+    ranges = ((-1, 3), (-1, 3), (0, 2))
+
+    def __init__(self, radius: int = 10):
+        self.radius = radius
+
+    def values(self, world, worm, worms):
+        head_x, head_y = worm.head
+        best, best_dist = None, self.radius
+        for other in worms or ():
+            if other is worm or not other.alive:
+                continue
+            x, y = other.head
+            dist = abs(x - head_x) + abs(y - head_y)
+            if dist < best_dist:
+                best, best_dist = (x, y), dist
+        if best is None:
+            return 0, 0, 0
+        return sign(best[0] - head_x), sign(best[1] - head_y), int(best_dist <= 2)
+
+    @property
+    def spec(self):
+        return f"enemy:{self.radius}"
+
+
+class TailDirection(Feature):
+    """Direction (signes x, y) de sa propre queue depuis la tête."""
+
+    name = "tail"
+    ranges = ((-1, 3), (-1, 3))
+
+    def values(self, world, worm, worms):
+        head_x, head_y = worm.head
+        tail_x, tail_y = worm.cells.tail
+        return sign(tail_x - head_x), sign(tail_y - head_y)
+
+
+FEATURES = {feature.name: feature for feature in (FoodDirection, Dangers, LocalWindow, WallDistances, EnemyHead, TailDirection)}
+
+
+class ObservationBuilder:
+    """
+    Construit l'état Q-learning d'un ver à partir d'une liste de Feature, et l'encode en une
+    clé entière : les composantes sont écrites en base mixte, la première de poids fort
+    (comme encode_state). `num_states` donne le nombre de clés possibles, d'où le choix
+    d'une table dense ou bornée (cf. q_table.make_table).
+    """
+
+    def __init__(self, features: List[Feature]):
+        self.features = features
+        self.ranges = [r for feature in features for r in feature.ranges]
+        self.num_states = 1
+        for _, size in self.ranges:
+            self.num_states *= size
+        self.hashed = self.num_states > HASH_MODULUS
+
+    @classmethod
+    def from_spec(cls, spec: str) -> "ObservationBuilder":
+        """Par exemple "food:10,dangers,window:5,walls:3,enemy:10,tail"."""
+        features = []
+        for item in spec.split(","):
+            name, _, argument = item.strip().partition(":")
+            if name not in FEATURES:
+                raise ValueError(f"composante d'observation inconnue : {name!r} (parmi {', '.join(FEATURES)})")
+            features.append(FEATURES[name](int(argument)) if argument else FEATURES[name]())
+        return cls(features)
+
+    @property
+    def spec(self) -> str:
+        return ",".join(feature.spec for feature in self.features)
+
+    def state(self, world, worm, worms) -> tuple:
+        values = ()
+        for feature in self.features:
+            values += feature.values(world, worm, worms)
+        return values
+
+    def encode(self, state) -> int:
+        key = 0
+        for value, (low, size) in zip(state, self.ranges):
+            key = key * size + value - low
+        return key % HASH_MODULUS if self.hashed else key
+
+
+DEFAULT_OBSERVATION = ObservationBuilder([FoodDirection(), Dangers()])
@@ -0,0 +1,284 @@
+# player/policy.py
+
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+from config import LOOKAHEAD_RADIUS
+from world.grids import GRID_PAD, TickMaps
+
+from .q_table import ACTIONS, ACTION_INDEX, QTable, encode_states
+
+# Rayon du radar à nourriture de l'état Q-learning : boulettes à moins de FOOD_RADAR_RADIUS cases
+FOOD_RADAR_RADIUS = 10
+
+# Codes de danger des 4 cases voisines de la tête, dans l'ordre de ACTIONS
+NO_DANGER, WALL, OWN_BODY, OTHER_WORM = 0, 1, 2, 3
+
+REVERSE_ACTION = np.array([1, 0, 3, 2], dtype=np.int64)
+# Ordre dans lequel l'heuristique gloutonne énumère ses coups : droite, gauche, haut, bas
+GREEDY_MOVE_ORDER = (2, 3, 0, 1)
+
+
+def cell_dangers(world, worm) -> List[int]:
+    """Code de danger de chacune des 4 cases voisines de la tête du ver, dans l'ordre de ACTIONS."""
+    head_x, head_y = worm.head
+    columns, rows, bodies = world.columns, world.rows, world.bodies
+    dangers = []
+    for dx, dy in ACTIONS:
+        x, y = head_x + dx, head_y + dy
+        if not (0 <= x < columns and 0 <= y < rows):
+            dangers.append(WALL)
+        else:
+            owner = bodies.get((x, y))
+            if owner is None:
+                dangers.append(NO_DANGER)
+            else:
+                dangers.append(OWN_BODY if owner is worm else OTHER_WORM)
+    return dangers
+
+
+@dataclass
+class Observations:
+    """Ce que voit chaque ver d'un lot en début de tick, une ligne par ver."""
+
+    worms: list
+    heads: np.ndarray  # (N, 2)
+    directions: np.ndarray  # (N,) indice dans ACTIONS
+    lengths: np.ndarray  # (N,)
+    dangers: np.ndarray  # (N, 4) codes de danger, dans l'ordre de ACTIONS
+    food: np.ndarray  # (N, 2) boulette la plus proche, (-1, -1) s'il n'y en a aucune
+    food_dist: np.ndarray  # (N,) distance de Manhattan de cette boulette, -1 s'il n'y en a aucune
+    maps: TickMaps = None  # grilles du tick, construites à la demande et partagées par tout le lot
+
+    def take(self, indices: np.ndarray) -> "Observations":
+        return Observations(
+            [self.worms[i] for i in indices.tolist()],
+            self.heads[indices],
+            self.directions[indices],
+            self.lengths[indices],
+            self.dangers[indices],
+            self.food[indices],
+            self.food_dist[indices],
+            self.maps,
+        )
+
+
+def observe(world, worms) -> Observations:
+    """Construit les observations d'un lot de vers vivants, en une passe sur les index du monde."""
+    heads = np.array([worm.head for worm in worms], dtype=np.int64).reshape(-1, 2)
+    directions = np.array([ACTION_INDEX.get(worm.direction, 0) for worm in worms], dtype=np.int64)
+    lengths = np.array([len(worm.cells) for worm in worms], dtype=np.int64)
+    dangers = np.array([cell_dangers(world, worm) for worm in worms], dtype=np.int8).reshape(-1, len(ACTIONS))
+    food, food_dist = world.nearest_pellets(heads)
+    return Observations(worms, heads, directions, lengths, dangers, food, food_dist, TickMaps(world))
+
+
+class Policy:
+    """
+    Décide des mouvements d'un lot de vers en un seul appel.
+    act retourne un indice dans ACTIONS par ver, ou -1 pour garder la direction courante.
+    Le hasard éventuel passe par worm.rng, pour que les parties restent reproductibles.
+    """
+
+    def act(self, obs: Observations) -> np.ndarray:
+        raise NotImplementedError
+
+
+def greedy_move(food_sign_x: int, food_sign_y: int, safe: int, direction: int) -> int:
+    """
+    Coup préféré de l'heuristique gloutonne : vers la boulette, l'axe horizontal d'abord,
+    par une case libre (bit a de `safe`) qui ne soit pas un demi-tour. -1 si aucun.
+    """
+    reverse = REVERSE_ACTION[direction]
+    for sign, forward, backward in ((food_sign_x, 2, 3), (food_sign_y, 0, 1)):
+        move = forward if sign > 0 else backward
+        if sign != 0 and move != reverse and safe >> move & 1:
+            return move
+    return -1
+
+
+# greedy_move tabulé pour toutes ses entrées : index ((sx + 1) * 3 + sy + 1) * 64 + safe * 4 + direction
+GREEDY_TABLE = np.array([
+    greedy_move(sx, sy, safe, direction)
+    for sx in (-1, 0, 1)
+    for sy in (-1, 0, 1)
+    for safe in range(16)
+    for direction in range(len(ACTIONS))
+], dtype=np.int64)
+SAFE_BITS = np.array([1, 2, 4, 8], dtype=np.int64)
+
+
+class GreedyPolicy(Policy):
+    """
+    L'heuristique d'AIWorm : se diriger vers la boulette la plus proche (l'axe horizontal
+    d'abord) par une case libre, sinon un coup libre au hasard.
+    Le coup préféré de tout le lot est lu d'un coup dans GREEDY_TABLE.
+    """
+
+    def act(self, obs: Observations) -> np.ndarray:
+        food_sign = np.where(obs.food_dist[:, None] >= 0, np.sign(obs.food - obs.heads), 0)
+        safe = (obs.dangers == NO_DANGER) @ SAFE_BITS
+        index = ((food_sign[:, 0] + 1) * 3 + food_sign[:, 1] + 1) * 64 + safe * 4 + obs.directions
+        actions = GREEDY_TABLE[index]
+
+        # Repli au hasard, ver par ver (peu de vers sont concernés à chaque tick)
+        for i in np.flatnonzero(actions < 0).tolist():
+            current = int(obs.directions[i])
+            reverse = REVERSE_ACTION[current]
+            moves = [a for a in GREEDY_MOVE_ORDER if safe[i] >> a & 1 and a != reverse]
+            if not moves:
+                continue
+            rng = obs.worms[i].rng
+            if current in moves:
+                if len(moves) > 1 and rng.random() < 0.2:
+                    moves.remove(current)
+                    actions[i] = rng.choice(moves)
+                else:
+                    actions[i] = current
+            else:
+                actions[i] = rng.choice(moves)
+        return actions
+
+
+class QTablePolicy(Policy):
+    """
+    Lecture d'une table Q pour tout le lot : encodage vectorisé des états de QLearningWorm,
+    puis argmax parmi les actions autorisées. Exploration epsilon-greedy optionnelle.
+    """
+
+    def __init__(self, q_table: QTable, epsilon: float = 0.0):
+        self.q_table = q_table
+        self.epsilon = epsilon
+
+    def states(self, obs: Observations) -> np.ndarray:
+        in_radar = (obs.food_dist >= 0) & (obs.food_dist < FOOD_RADAR_RADIUS)
+        food_dir = np.where(in_radar[:, None], np.sign(obs.food - obs.heads), 0)
+        return encode_states(np.column_stack([food_dir, obs.dangers]))
+
+    def act(self, obs: Observations) -> np.ndarray:
+        n = len(obs.worms)
+        allowed = np.ones((n, len(ACTIONS)), dtype=bool)
+        has_body = np.flatnonzero(obs.lengths > 1)
+        allowed[has_body, REVERSE_ACTION[obs.directions[has_body]]] = False
+
+        actions = self.q_table.best_actions(self.states(obs), allowed)
+        if self.epsilon > 0:
+            for i, worm in enumerate(obs.worms):
+                if worm.rng.uniform(0, 1) < self.epsilon:
+                    actions[i] = worm.rng.choice(np.flatnonzero(allowed[i]).tolist())
+        return actions
+
+
+# Coûts d'un coup pour DistanceFieldPolicy, du meilleur au pire : distance à la boulette,
+# boulette hors d'atteinte du champ de distances, impasse (lookahead), case bloquée
+UNREACHED_COST = 1 << 20
+TRAPPED_COST = 1 << 21
+BLOCKED_COST = 1 << 22
+# Fenêtre du lookahead, centrée sur la tête
+LOOKAHEAD_SIZE = 2 * LOOKAHEAD_RADIUS + 1
+LOOKAHEAD_OFFSETS = np.array([(LOOKAHEAD_RADIUS + dx, LOOKAHEAD_RADIUS + dy) for dx, dy in ACTIONS], dtype=np.int64)
+
+
+def reachable_areas(blocked: np.ndarray, heads: np.ndarray) -> np.ndarray:
+    """
+    (N, 4) : nombre de cases libres atteignables depuis chaque case voisine de chaque tête,
+    sans sortir d'une fenêtre de LOOKAHEAD_SIZE cases de côté (0 si la voisine est bloquée).
+    Les zones libres de toutes les fenêtres sont étiquetées ensemble, par propagation de la
+    plus petite étiquette voisine ; une zone trop sinueuse pour converger à temps est sous-estimée.
+    """
+    n = len(heads)
+    windows = np.lib.stride_tricks.sliding_window_view(blocked, (LOOKAHEAD_SIZE, LOOKAHEAD_SIZE))
+    corner = heads + GRID_PAD - LOOKAHEAD_RADIUS
+    free = ~windows[corner[:, 0], corner[:, 1]]  # (N, S, S)
+
+    # Étiquette de départ : indice global de la case ; une case bloquée reste à `outside`
+    outside = n * LOOKAHEAD_SIZE * LOOKAHEAD_SIZE
+    labels = np.where(free, np.arange(outside).reshape(free.shape), outside)
+    for _ in range(2 * LOOKAHEAD_SIZE):
+        smallest = labels.copy()
+        np.minimum(smallest[:, 1:, :], labels[:, :-1, :], out=smallest[:, 1:, :])
+        np.minimum(smallest[:, :-1, :], labels[:, 1:, :], out=smallest[:, :-1, :])
+        np.minimum(smallest[:, :, 1:], labels[:, :, :-1], out=smallest[:, :, 1:])
+        np.minimum(smallest[:, :, :-1], labels[:, :, 1:], out=smallest[:, :, :-1])
+        smallest[~free] = outside
+        if np.array_equal(smallest, labels):
+            break
+        labels = smallest
+
+    sizes = np.bincount(labels.ravel(), minlength=outside + 1)
+    sizes[outside] = 0
+    start = labels[:, LOOKAHEAD_OFFSETS[:, 0], LOOKAHEAD_OFFSETS[:, 1]]  # (N, 4)
+    return sizes[start]
+
+
+class DistanceFieldPolicy(Policy):
+    """
+    Glouton sur les cartes du tick (world/grids.py) : parmi les cases voisines libres, celle
+    la plus proche d'une boulette en nombre de pas réels (les corps font obstacle), lue dans
+    le champ de distances commun à tous les bots. L'heuristique de GreedyPolicy (sans hasard)
+    départage les coups quand aucune boulette n'est à portée du champ.
+
+    Avec `lookahead`, un coup qui mène dans une zone plus petite que le ver (dans la limite
+    d'une demi-fenêtre de LOOKAHEAD_SIZE cases de côté) est évité : si tous le sont, le ver
+    prend celui qui laisse le plus de place.
+    """
+
+    def __init__(self, lookahead: bool = False):
+        self.lookahead = lookahead
+
+    def act(self, obs: Observations) -> np.ndarray:
+        maps = obs.maps
+        n = len(obs.worms)
+        targets = maps.flat(obs.heads)[:, None] + maps.steps  # (N, 4)
+        blocked = maps.blocked.ravel()[targets]
+        distance = maps.pellet_distance[targets]
+
+        cost = np.where(distance >= 0, distance, UNREACHED_COST)
+        if self.lookahead:
+            areas = reachable_areas(maps.blocked, obs.heads)
+            needed = np.minimum(obs.lengths, LOOKAHEAD_SIZE * LOOKAHEAD_SIZE // 2)
+            trapped = areas < needed[:, None]
+            cost = np.where(trapped, TRAPPED_COST + LOOKAHEAD_SIZE * LOOKAHEAD_SIZE - areas, cost)
+        cost[blocked] = BLOCKED_COST
+        has_body = np.flatnonzero(obs.lengths > 1)
+        cost[has_body, REVERSE_ACTION[obs.directions[has_body]]] = BLOCKED_COST
+
+        order = np.array(GREEDY_MOVE_ORDER)
+        actions = order[cost[:, order].argmin(axis=1)]
+        best = cost[np.arange(n), actions]
+        actions[best >= BLOCKED_COST] = -1
+
+        # Aucune boulette à portée : coup glouton vers la plus proche à vol d'oiseau, parmi les meilleurs
+        far = np.flatnonzero(best == UNREACHED_COST)
+        if far.size:
+            food_sign = np.where(obs.food_dist[far, None] >= 0, np.sign(obs.food[far] - obs.heads[far]), 0)
+            safe = (cost[far] == UNREACHED_COST) @ SAFE_BITS
+            index = ((food_sign[:, 0] + 1) * 3 + food_sign[:, 1] + 1) * 64 + safe * 4 + obs.directions[far]
+            greedy = GREEDY_TABLE[index]
+            actions[far] = np.where(greedy >= 0, greedy, actions[far])
+        return actions
+
+
+GREEDY_POLICY = GreedyPolicy()
+
+
+def decide_directions(world, worms):
+    """
+    Fixe la direction de chaque ver du lot : les observations sont construites une fois
+    pour tous, puis chaque politique est appelée une fois avec tous ses vers.
+    """
+    if not worms:
+        return
+    obs = observe(world, worms)
+
+    groups = {}
+    for i, worm in enumerate(worms):
+        groups.setdefault(id(worm.policy), (worm.policy, []))[1].append(i)
+
+    for policy, indices in groups.values():
+        batch = obs if len(indices) == len(worms) else obs.take(np.array(indices))
+        for worm, action in zip(batch.worms, policy.act(batch).tolist()):
+            if action >= 0:
+                worm.direction = ACTIONS[action]
@@ -1,99 +1,65 @@
-import numpy as np
-import random
-import os
+from .observation import DEFAULT_OBSERVATION
 from .player import PlayerWorm
+from .q_table import ACTIONS, make_table
 
 class QLearningWorm(PlayerWorm):
-    def __init__(self, q_table_path="q_table.npy"):
-        super().__init__()
-        self.q_table_path = q_table_path
-        self.q_table = self.load_q_table()
-
+    def __init__(self, q_table_path="q_table.npy", rng=None, observation=None, memmap=False):
+        super().__init__(rng)
+        # Features of the state and their integer keys (player/observation.py)
+        self.observation = observation or DEFAULT_OBSERVATION
         self.alpha = 0.1  # Learning rate
         self.gamma = 0.9  # Discount factor
-        self.epsilon = 0  # Exploration rate
+        self.epsilon = 0  # Exploration rate (remplacé par celui de la sauvegarde s'il existe)
         self.epsilon_decay = 0.995
         self.min_epsilon = 0
 
+        self.q_table_path = q_table_path
+        # memmap: the table stays in its file (player/q_table.MappedQTable) instead of being loaded
+        self.memmap = memmap
+        self.q_table = self.load_q_table()
+
         self.last_state = None
         self.last_action = None
         self.last_score = 0
+        self.min_dist_before = float('inf')
+        # training/replay_buffer.ReplayBuffer: when set, transitions are stored there and the
+        # table is updated by minibatches (ReplayLearner) instead of once per step
+        self.replay = None
 
     @property
     def q_table_size(self):
-        return len(self.q_table)
+        return self.q_table.size
 
     def load_q_table(self):
-        if os.path.exists(self.q_table_path):
-            q_table = np.load(self.q_table_path, allow_pickle=True).item()
-            # Load epsilon from q_table if it exists
-            if 'epsilon' in q_table:
-                self.epsilon = q_table['epsilon']
-                del q_table['epsilon']
-            return q_table
-        return {}
-
-    def save_q_table(self):
-        self.q_table['epsilon'] = self.epsilon
-        np.save(self.q_table_path, self.q_table)
+        q_table, metadata = make_table(self.q_table_path, self.observation.num_states, memmap=self.memmap)
+        if 'epsilon' in metadata:
+            self.epsilon = metadata['epsilon']
+        return q_table
+
+    def save_q_table(self, episodes=None):
+        self.q_table.save(self.q_table_path, {'epsilon': self.epsilon, 'episodes': episodes})
 
     def get_state(self, world, worms):
-        head_x, head_y = self.head
-        
-        # 1. Food Radar
-        target_pellet = None
-        min_dist = 10
-        for pellet in world.pellets:
-            dist = abs(head_x - pellet.x) + abs(head_y - pellet.y)
-            if dist < min_dist:
-                min_dist = dist
-                target_pellet = pellet
-        
-        food_dir_x = 0
-        food_dir_y = 0
-        if target_pellet:
-            if target_pellet.x > head_x: food_dir_x = 1
-            elif target_pellet.x < head_x: food_dir_x = -1
-            if target_pellet.y > head_y: food_dir_y = 1
-            elif target_pellet.y < head_y: food_dir_y = -1
-
-        # 2. Dangers
-        dangers = []
-        for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]: # up, down, right, left
-            x, y = head_x + dx, head_y + dy
-            
-            danger = 0 # 0: no danger
-            if not (0 <= x < world.columns and 0 <= y < world.rows):
-                danger = 1 # 1: wall
-            elif (x, y) in self.cells:
-                danger = 2 # 2: own body
-            elif worms:
-                for worm in worms:
-                    if worm is not self and worm.alive and (x, y) in worm.cells:
-                        danger = 3 # 3: other worm
-                        break
-            dangers.append(danger)
-
-        return (food_dir_x, food_dir_y, *dangers)
+        # Default: food radar (strictly closer than FOOD_RADAR_RADIUS cells), then the
+        # danger code of the 4 neighbouring cells (0 none, 1 wall, 2 own body, 3 other worm)
+        return self.observation.state(world, self, worms)
 
     def choose_direction(self, world, worms=None):
-        state = self.get_state(world, worms)
-        
-        if state not in self.q_table:
-            self.q_table[state] = {a: 0 for a in [(0, 1), (0, -1), (1, 0), (-1, 0)]}
+        # Distance à la nourriture avant le pas, pour la récompense de after_move
+        self.min_dist_before = world.nearest_pellet_distance(*self.head)
+        state = self.observation.encode(self.get_state(world, worms))
 
-        possible_actions = list(self.q_table[state].keys())
-        reverse_action = (-self.direction[0], -self.direction[1])
-        if reverse_action in possible_actions and len(self.cells) > 1:
+        possible_actions = list(range(len(ACTIONS)))
+        reverse_action = ACTIONS.index((-self.direction[0], -self.direction[1]))
+        if len(self.cells) > 1:
             possible_actions.remove(reverse_action)
 
-        if random.uniform(0, 1) < self.epsilon:
-            action = random.choice(possible_actions)
+        if self.rng.uniform(0, 1) < self.epsilon:
+            action = self.rng.choice(possible_actions)
         else:
-            q_values = {a: self.q_table[state][a] for a in possible_actions}
-            action = max(q_values, key=q_values.get)
+            action = self.q_table.best_action(state, possible_actions)
 
-        self.direction = action
+        self.direction = ACTIONS[action]
         self.last_state = state
         self.last_action = action
     
@@ -101,17 +67,11 @@ class QLearningWorm(PlayerWorm):
         if self.last_state is None or self.last_action is None:
             return
 
-        old_value = self.q_table[self.last_state][self.last_action]
-        
-        if done:
-            next_max = 0
-        else:
-            if new_state not in self.q_table:
-                self.q_table[new_state] = {a: 0 for a in [(0, 1), (0, -1), (1, 0), (-1, 0)]}
-            next_max = max(self.q_table[new_state].values())
-
-        new_value = old_value + self.alpha * (reward + self.gamma * next_max - old_value)
-        self.q_table[self.last_state][self.last_action] = new_value
+        next_state = self.observation.encode(new_state)
+        if self.replay is not None:
+            self.replay.append(self.last_state, self.last_action, reward, next_state, done)
+            return
+        self.q_table.update(self.last_state, self.last_action, reward, next_state, done, self.alpha, self.gamma)
 
     def get_reward(self, world):
         reward = 0
@@ -127,20 +87,13 @@ class QLearningWorm(PlayerWorm):
         self.last_score = self.score
         return reward
 
-    def step(self, world, worms=None):
-        target_pellet = None
-        min_dist_before = float('inf')
-        if world.pellets:
-            min_dist_before = min(abs(self.head[0] - p.x) + abs(self.head[1] - p.y) for p in world.pellets)
-
-        super().step(world, worms)
-
+    def after_move(self, world, worms=None):
         reward = self.get_reward(world)
         done = not self.alive
 
         if self.alive and world.pellets:
-            min_dist_after = min(abs(self.head[0] - p.x) + abs(self.head[1] - p.y) for p in world.pellets)
-            if min_dist_after < min_dist_before:
+            min_dist_after = world.nearest_pellet_distance(*self.head)
+            if min_dist_after < self.min_dist_before:
                 reward += 1
             else:
                 reward -= 1.5
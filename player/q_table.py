@@ -0,0 +1,383 @@
+# player/q_table.py
+
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from config import Q_TABLE_DENSE_MAX_STATES, Q_TABLE_MAX_STATES, Q_TABLE_MEMMAP_MAX_STATES
+
+# Actions dans l'ordre des colonnes de la table : up, down, right, left
+ACTIONS = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+ACTION_INDEX = {action: i for i, action in enumerate(ACTIONS)}
+
+# État = (food_dir_x, food_dir_y, d_up, d_down, d_right, d_left)
+# food_dir_* dans {-1, 0, 1}, danger dans {0, 1, 2, 3} -> 3 * 3 * 4^4 états
+NUM_STATES = 3 * 3 * 4 ** 4
+STATE_WEIGHTS = np.array([3 * 4 ** 4, 4 ** 4, 4 ** 3, 4 ** 2, 4, 1], dtype=np.int64)
+STATE_OFFSETS = np.array([1, 1, 0, 0, 0, 0], dtype=np.int64)
+
+
+def encode_state(state) -> int:
+    """Numéro de ligne de la table pour un tuple d'état de QLearningWorm.get_state."""
+    food_dir_x, food_dir_y, d_up, d_down, d_right, d_left = state
+    return ((((((food_dir_x + 1) * 3 + food_dir_y + 1) * 4 + d_up) * 4 + d_down) * 4 + d_right) * 4) + d_left
+
+
+def encode_states(states: np.ndarray) -> np.ndarray:
+    """Version vectorisée d'encode_state pour un tableau (N, 6) d'états."""
+    return (states.astype(np.int64) + STATE_OFFSETS) @ STATE_WEIGHTS
+
+
+def duplicate_counts(states: np.ndarray, actions: np.ndarray) -> np.ndarray:
+    """Pour chaque transition d'un lot, le nombre de transitions du lot sur le même (état, action)."""
+    _, inverse, counts = np.unique(states * len(ACTIONS) + actions, return_inverse=True, return_counts=True)
+    return counts[inverse]
+
+
+def metadata_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".json"
+
+
+def atomic_write(path: str, write):
+    """Écrit via write(fichier) dans un fichier temporaire voisin, puis le renomme : `path` n'est jamais à moitié écrit."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def save_table(path: str, values: np.ndarray, metadata: dict = None):
+    """
+    Sauvegarde atomique des valeurs (.npy) puis de l'en-tête (.json : epsilon, parties, horodatage).
+    L'en-tête est écrit en second : s'il manque ou est ancien, la table reste lisible.
+    """
+    atomic_write(path, lambda f: np.save(f, values, allow_pickle=False))
+    if metadata is not None:
+        save_metadata(path, metadata)
+
+
+def save_metadata(path: str, metadata: dict):
+    header = dict(metadata, timestamp=time.time())
+    atomic_write(metadata_path(path), lambda f: f.write(json.dumps(header).encode()))
+
+
+def load_metadata(path: str) -> dict:
+    if not os.path.exists(metadata_path(path)):
+        return {}
+    with open(metadata_path(path)) as f:
+        return json.load(f)
+
+
+class QTable:
+    """
+    Table Q dense : un tableau float32 (NUM_STATES, 4), indexé par encode_state
+    (ou par la clé d'un ObservationBuilder, cf. player/observation.py).
+    `visits` compte les mises à jour de chaque (état, action), pour pondérer les fusions de tables.
+    """
+
+    def __init__(self, values: np.ndarray = None, num_states: int = NUM_STATES):
+        if values is None:
+            values = np.zeros((num_states, len(ACTIONS)), dtype=np.float32)
+        self.values = values
+        self.visits = np.zeros(values.shape, dtype=np.int64)
+
+    @property
+    def size(self) -> int:
+        """Nombre d'états déjà rencontrés (lignes non nulles)."""
+        return int(np.count_nonzero(self.values.any(axis=1)))
+
+    def best_action(self, state: int, allowed) -> int:
+        """Action de plus haute valeur parmi les indices `allowed` (la première en cas d'égalité)."""
+        row = self.values[state].tolist()
+        return max(allowed, key=row.__getitem__)
+
+    def best_actions(self, states: np.ndarray, allowed_mask: np.ndarray) -> np.ndarray:
+        """Argmax vectorisé sur un lot d'états, restreint aux actions autorisées."""
+        q = np.where(allowed_mask, self.values[states], -np.inf)
+        return q.argmax(axis=1)
+
+    def update(self, state: int, action: int, reward: float, next_state: int, done: bool, alpha: float, gamma: float):
+        next_max = 0.0 if done else max(self.values[next_state].tolist())
+        old_value = self.values[state, action]
+        self.values[state, action] = old_value + alpha * (reward + gamma * next_max - old_value)
+        self.visits[state, action] += 1
+
+    def update_batch(self, states, actions, rewards, next_states, dones, alpha: float, gamma: float,
+                     weights=None, mean=False):
+        """
+        Mise à jour TD vectorisée ; les transitions d'un même (état, action) s'additionnent,
+        ou sont moyennées avec `mean` (minibatchs de rejeu, où les doublons sont nombreux).
+        `weights` pondère chaque transition (tirage prioritaire, cf. training/replay_buffer.py).
+        Retourne les erreurs TD, avant mise à jour.
+        """
+        next_max = np.where(dones, 0.0, self.values[next_states].max(axis=1))
+        old_values = self.values[states, actions]
+        td_errors = rewards + gamma * next_max - old_values
+        delta = alpha * td_errors if weights is None else alpha * weights * td_errors
+        if mean:
+            delta = delta / duplicate_counts(states, actions)
+        np.add.at(self.values, (states, actions), delta.astype(np.float32))
+        np.add.at(self.visits, (states, actions), 1)
+        return td_errors
+
+    @classmethod
+    def merge(cls, base: "QTable", tables) -> "QTable":
+        """
+        Fusionne des tables entraînées en parallèle à partir de `base` :
+        moyenne des valeurs pondérée par les visites de chaque table.
+        Les (état, action) jamais visités gardent la valeur de `base`.
+        """
+        weighted = np.zeros(base.values.shape, dtype=np.float64)
+        visits = np.zeros(base.values.shape, dtype=np.int64)
+        for table in tables:
+            weighted += table.values * table.visits
+            visits += table.visits
+
+        merged = cls(base.values.copy())
+        seen = visits > 0
+        merged.values[seen] = (weighted[seen] / visits[seen]).astype(np.float32)
+        merged.visits = base.visits + visits
+        return merged
+
+    def export(self) -> np.ndarray:
+        """Copie du contenu à sauvegarder (cf. training/checkpoint.py)."""
+        return self.values.copy()
+
+    def save(self, path: str, metadata: dict = None):
+        save_table(path, self.values, metadata)
+
+    @classmethod
+    def load(cls, path: str):
+        """Charge (table, métadonnées). Une table au format dict picklé est migrée une fois pour toutes."""
+        if not os.path.exists(path):
+            return cls(), {}
+
+        try:
+            values = np.load(path, allow_pickle=False)
+        except ValueError:
+            return migrate_legacy_q_table(path)
+        if values.dtype.names is not None:
+            raise ValueError(f"{path} est une table Q bornée (BoundedQTable), pas une table dense")
+        return cls(values.astype(np.float32, copy=False)), load_metadata(path)
+
+
+class MappedQTable(QTable):
+    """
+    Table Q dense projetée en mémoire depuis son .npy (np.lib.format.open_memmap) : même
+    disposition que QTable (une ligne par clé d'état), mais rien n'est lu au démarrage,
+    quelle que soit la taille de la table, et les pages ne sont chargées qu'à la lecture.
+    Les mises à jour vont directement dans le fichier : sauvegarder revient à vider les pages
+    modifiées (flush), sans recopier la table (cf. training/checkpoint.py).
+    Plusieurs processus peuvent ouvrir le même fichier sans copie : les lecteurs (`readonly`)
+    voient les valeurs au fil de l'apprentissage ; des écrivains concurrents se partagent la
+    table sans verrou (une mise à jour simultanée du même (état, action) peut se perdre).
+    """
+
+    def __init__(self, path: str, num_states: int = NUM_STATES, readonly: bool = False):
+        self.path = path
+        if os.path.exists(path):
+            try:
+                values = np.lib.format.open_memmap(path, mode="r" if readonly else "r+")
+            except ValueError:
+                raise ValueError(f"{path} n'est pas un .npy projetable (ancien format picklé ?) : chargez-le une fois sans --memmap")
+            if values.dtype != np.float32 or values.shape != (num_states, len(ACTIONS)):
+                raise ValueError(f"{path} n'est pas une table Q dense float32 de {num_states} états : choisissez un autre fichier")
+        elif readonly:
+            raise FileNotFoundError(f"{path} : table Q introuvable")
+        else:
+            values = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(num_states, len(ACTIONS)))
+        self.mapping = values
+        # Même mémoire, vue comme un ndarray ordinaire : les petites opérations de la boucle
+        # d'apprentissage ne paient pas le surcoût de la sous-classe np.memmap
+        super().__init__(values.view(np.ndarray))
+
+    def flush(self):
+        """Écrit sur le disque les pages modifiées depuis le dernier flush."""
+        if self.values.flags.writeable:
+            self.mapping.flush()
+
+    def export(self) -> np.memmap:
+        """La projection elle-même, sans copie : le Checkpointer n'a qu'à la vider (flush)."""
+        return self.mapping
+
+    def save(self, path: str, metadata: dict = None):
+        if os.path.abspath(path) != os.path.abspath(self.path):
+            super().save(path, metadata)
+            return
+        self.flush()
+        if metadata is not None:
+            save_metadata(path, metadata)
+
+
+# Enregistrement d'une BoundedQTable sauvegardée : clé d'état et valeurs de ses 4 actions
+BOUNDED_ROW = np.dtype([("key", "<i8"), ("values", "<f4", len(ACTIONS))])
+
+
+class BoundedQTable:
+    """
+    Table Q creuse pour les grands espaces d'états : clé d'état -> ligne d'un tableau
+    float32 préalloué de `max_states` lignes. Quand il est plein, l'état utilisé le moins
+    récemment (LRU) est oublié : la mémoire reste bornée quel que soit le nombre d'états vus.
+    Même interface que QTable, hors fusion (merge).
+    Les accès passent par un verrou : le learner de rejeu (training/replay_buffer.py) insère
+    et oublie des états sur son thread pendant que la partie lit la table et que le
+    Checkpointer l'exporte, et un export ne doit jamais associer la clé d'un état aux
+    valeurs d'un autre.
+    """
+
+    def __init__(self, max_states: int = Q_TABLE_MAX_STATES):
+        self.max_states = max_states
+        # Une ligne de plus, toujours nulle : celle des états jamais vus
+        self.values = np.zeros((max_states + 1, len(ACTIONS)), dtype=np.float32)
+        self.visits = np.zeros(self.values.shape, dtype=np.int64)
+        self.slots = OrderedDict()  # clé -> ligne, de la moins à la plus récemment utilisée
+        self.evictions = 0
+        self.lock = threading.RLock()
+
+    @property
+    def size(self) -> int:
+        return len(self.slots)
+
+    def row(self, state: int) -> int:
+        """Ligne de l'état, ou la ligne nulle s'il n'est pas dans la table."""
+        with self.lock:
+            slot = self.slots.get(state)
+            if slot is None:
+                return self.max_states
+            self.slots.move_to_end(state)
+            return slot
+
+    def insert(self, state: int) -> int:
+        """Ligne de l'état, allouée (en oubliant le moins récent si besoin) s'il n'y est pas."""
+        with self.lock:
+            return self._insert(state)
+
+    def _insert(self, state: int) -> int:
+        slot = self.slots.get(state)
+        if slot is not None:
+            self.slots.move_to_end(state)
+            return slot
+        if len(self.slots) < self.max_states:
+            slot = len(self.slots)
+        else:
+            _, slot = self.slots.popitem(last=False)
+            self.values[slot] = 0
+            self.visits[slot] = 0
+            self.evictions += 1
+        self.slots[state] = slot
+        return slot
+
+    def best_action(self, state: int, allowed) -> int:
+        with self.lock:
+            row = self.values[self.row(state)].tolist()
+        return max(allowed, key=row.__getitem__)
+
+    def best_actions(self, states: np.ndarray, allowed_mask: np.ndarray) -> np.ndarray:
+        with self.lock:
+            rows = np.array([self.row(state) for state in states.tolist()], dtype=np.int64)
+            q = np.where(allowed_mask, self.values[rows], -np.inf)
+        return q.argmax(axis=1)
+
+    def update(self, state: int, action: int, reward: float, next_state: int, done: bool, alpha: float, gamma: float):
+        with self.lock:
+            next_max = 0.0 if done else max(self.values[self.row(next_state)].tolist())
+            slot = self._insert(state)
+            old_value = self.values[slot, action]
+            self.values[slot, action] = old_value + alpha * (reward + gamma * next_max - old_value)
+            self.visits[slot, action] += 1
+
+    def update_batch(self, states, actions, rewards, next_states, dones, alpha: float, gamma: float,
+                     weights=None, mean=False):
+        with self.lock:
+            next_rows = np.array([self.row(state) for state in np.asarray(next_states).tolist()], dtype=np.int64)
+            next_max = np.where(dones, 0.0, self.values[next_rows].max(axis=1))
+            slots = np.array([self._insert(state) for state in np.asarray(states).tolist()], dtype=np.int64)
+            old_values = self.values[slots, actions]
+            td_errors = rewards + gamma * next_max - old_values
+            delta = alpha * td_errors if weights is None else alpha * weights * td_errors
+            if mean:
+                delta = delta / duplicate_counts(slots, actions)
+            np.add.at(self.values, (slots, actions), delta.astype(np.float32))
+            np.add.at(self.visits, (slots, actions), 1)
+        return td_errors
+
+    def export(self) -> np.ndarray:
+        """États et valeurs, du moins au plus récemment utilisé."""
+        with self.lock:
+            items = list(self.slots.items())
+            rows = np.zeros(len(items), dtype=BOUNDED_ROW)
+            rows["key"] = [key for key, _ in items]
+            rows["values"] = self.values[[slot for _, slot in items]]
+        return rows
+
+    def save(self, path: str, metadata: dict = None):
+        save_table(path, self.export(), metadata)
+
+    @classmethod
+    def from_rows(cls, rows: np.ndarray, max_states: int = Q_TABLE_MAX_STATES) -> "BoundedQTable":
+        table = cls(max_states)
+        rows = rows[-max_states:]
+        for key, values in zip(rows["key"].tolist(), rows["values"]):
+            table.values[table.insert(key)] = values
+        return table
+
+
+def make_table(path: str, num_states: int, max_states: int = Q_TABLE_MAX_STATES, memmap: bool = False):
+    """
+    Charge (table, métadonnées) pour un espace de `num_states` états : une QTable dense
+    jusqu'à Q_TABLE_DENSE_MAX_STATES états, une BoundedQTable au-delà.
+    Avec `memmap`, une MappedQTable (dense, jusqu'à Q_TABLE_MEMMAP_MAX_STATES états) ouverte
+    sur le fichier, créé au besoin.
+    """
+    if memmap:
+        if num_states > Q_TABLE_MEMMAP_MAX_STATES:
+            raise ValueError(
+                f"{num_states} états : trop pour une table projetée en mémoire (au plus {Q_TABLE_MEMMAP_MAX_STATES})"
+            )
+        return MappedQTable(path, num_states), load_metadata(path)
+
+    if num_states <= Q_TABLE_DENSE_MAX_STATES:
+        if not os.path.exists(path):
+            return QTable(num_states=num_states), {}
+        table, metadata = QTable.load(path)
+        if table.values.shape[0] != num_states:
+            raise ValueError(f"{path} n'est pas une table Q dense de {num_states} états : choisissez un autre fichier")
+        return table, metadata
+
+    if not os.path.exists(path):
+        return BoundedQTable(max_states), {}
+    rows = np.load(path, allow_pickle=False)
+    if rows.dtype != BOUNDED_ROW:
+        raise ValueError(f"{path} n'est pas une table Q bornée : choisissez un autre fichier")
+    return BoundedQTable.from_rows(rows, max_states), load_metadata(path)
+
+
+def migrate_legacy_q_table(path: str):
+    """Convertit un q_table.npy au format {état: {action: valeur}, 'epsilon': e} vers le format dense."""
+    legacy = np.load(path, allow_pickle=True).item()
+
+    metadata = {}
+    if "epsilon" in legacy:
+        metadata["epsilon"] = float(legacy.pop("epsilon"))
+
+    table = QTable()
+    for state, action_values in legacy.items():
+        row = encode_state(state)
+        for action, value in action_values.items():
+            table.values[row, ACTION_INDEX[action]] = value
+
+    table.save(path, metadata)
+    return table, metadata
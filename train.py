@@ -0,0 +1,246 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from config import REPLAY_BATCH_SIZE, REPLAY_RATIO, SCORE_WINDOW
+from engine.metrics import Metrics, MetricsExporter
+from engine.replay import EpisodeRecorder
+from engine.telemetry import TIMEOUT, RollingStats, TelemetrySink
+from engine.simulation import Simulation
+from player.observation import ObservationBuilder
+from player.q_learning_player import QLearningWorm
+from player.q_table import encode_states
+from training.checkpoint import Checkpointer
+from training.parallel import ParallelTrainer
+from training.replay_buffer import ReplayBuffer, ReplayLearner, replay_minibatch
+from training.vector_env import VectorEnv
+from world.moves import BODY_DEATH, WALL_DEATH
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Entraînement Q-learning sans fenêtre (headless).")
+    parser.add_argument("--episodes", type=int, default=1000, help="nombre de parties à jouer")
+    parser.add_argument("--mode", default="Q-LEARNING-SOLO", choices=["Q-LEARNING-SOLO", "Q-LEARNING"])
+    parser.add_argument("--max-ticks", type=int, default=10000, help="durée maximale d'une partie, en ticks")
+    parser.add_argument("--save-every", type=int, default=100, help="sauvegarde la table Q toutes les N parties")
+    parser.add_argument("--save-seconds", type=float, default=300.0, help="... ou toutes les T secondes")
+    parser.add_argument("--log-every", type=int, default=100, help="affiche les statistiques toutes les N parties")
+    parser.add_argument("--envs", type=int, default=0, help="entraîne sur N mondes solo vectorisés (VectorEnv)")
+    parser.add_argument("--workers", type=int, default=0, help="entraîne sur K processus dont les tables sont fusionnées")
+    parser.add_argument("--episodes-per-round", type=int, default=20, help="parties jouées par worker entre deux fusions")
+    parser.add_argument("--checkpoint-every", type=int, default=5, help="sauvegarde la table maître toutes les N fusions")
+    parser.add_argument("--seed", type=int, default=None, help="graine de l'entraînement (workers : seed + i)")
+    parser.add_argument("--record", metavar="DIR", help="enregistre chaque partie dans DIR/episode_<n>.mwr")
+    parser.add_argument(
+        "--observation", metavar="SPEC",
+        help="état Q-learning enrichi, ex. food:10,dangers,window:5,walls:3,enemy:10,tail (cf. player/observation.py)",
+    )
+    parser.add_argument("--q-table", default="q_table.npy", help="fichier de la table Q (un par observation)")
+    parser.add_argument("--memmap", action="store_true", help="table Q projetée en mémoire depuis son fichier, sauvegardes incrémentales")
+    parser.add_argument("--replay", type=int, default=0, metavar="N", help="apprend par minibatchs tirés d'un tampon de N transitions")
+    parser.add_argument("--batch-size", type=int, default=REPLAY_BATCH_SIZE, help="taille des minibatchs de --replay")
+    parser.add_argument("--replay-ratio", type=float, default=REPLAY_RATIO, help="fois où chaque transition est rejouée, en moyenne")
+    parser.add_argument("--prioritized", action="store_true", help="tirage prioritaire (erreur TD) dans le tampon")
+    parser.add_argument("--metrics", metavar="FILE", help="exporte l'instrumentation des ticks dans FILE (.csv ou .jsonl)")
+    parser.add_argument("--metrics-every", type=float, default=10.0, help="... toutes les T secondes")
+    parser.add_argument("--telemetry", metavar="FILE", help="ajoute une ligne CSV par partie à FILE (cf. engine/telemetry.py)")
+    return parser.parse_args()
+
+
+def log_progress(episode, episodes, worm, score_history, total_ticks, start):
+    avg_score = score_history.mean
+    elapsed = time.perf_counter() - start
+    print(
+        f"Game {episode}/{episodes} | Avg Score (last 100): {avg_score:.2f} | "
+        f"Epsilon: {worm.epsilon:.3f} | Q-table size: {worm.q_table_size} | "
+        f"{total_ticks / elapsed:.0f} ticks/s"
+    )
+
+
+def train(args):
+    main_worm = None
+    if args.observation or args.q_table != "q_table.npy" or args.memmap:
+        # Seule la table demandée est chargée ; le ver sert pour toutes les parties
+        observation = ObservationBuilder.from_spec(args.observation) if args.observation else None
+        main_worm = QLearningWorm(args.q_table, observation=observation, memmap=args.memmap)
+    simulation = Simulation(args.mode, seed=args.seed, main_worm=main_worm)
+    worm = simulation.main_worm
+    if args.record:
+        os.makedirs(args.record, exist_ok=True)
+        simulation.recorder = EpisodeRecorder()
+        simulation.reset()
+    checkpointer = Checkpointer(worm.q_table_path, args.save_every, args.save_seconds)
+    learner = None
+    if args.replay:
+        # Le ver ne fait qu'ajouter ses transitions ; la table est apprise sur un thread à part
+        worm.replay = ReplayBuffer(args.replay, args.prioritized, seed=args.seed)
+        learner = ReplayLearner(worm.replay, worm.q_table, worm.alpha, worm.gamma, args.batch_size, args.replay_ratio)
+    exporter = None
+    if args.metrics:
+        simulation.metrics = Metrics()
+        exporter = MetricsExporter(args.metrics, args.metrics_every)
+    if args.telemetry:
+        simulation.telemetry = TelemetrySink(args.telemetry)
+
+    total_ticks = 0
+    start = time.perf_counter()
+    for episode in range(1, args.episodes + 1):
+        total_ticks += simulation.run_episode(max_ticks=args.max_ticks)
+        if args.record:
+            simulation.recorder.log.save(os.path.join(args.record, f"episode_{episode}.mwr"))
+        simulation.reset()
+        if learner is not None:
+            learner.check()
+        checkpointer.episode_finished(worm.q_table, worm.epsilon, episode)
+        if exporter is not None:
+            exporter.maybe_export(simulation.metrics)
+
+        if episode % args.log_every == 0:
+            log_progress(episode, args.episodes, worm, simulation.score_history, total_ticks, start)
+
+    if learner is not None:
+        learner.close()
+    checkpointer.save(worm.q_table, worm.epsilon, args.episodes)
+    checkpointer.close()
+    if exporter is not None:
+        exporter.close(simulation.metrics)
+    if simulation.telemetry is not None:
+        simulation.telemetry.close()
+
+
+def train_vectorized(args):
+    """Même apprentissage que QLearningWorm, mais sur args.envs mondes avancés d'un bloc."""
+    worm = QLearningWorm(args.q_table, memmap=args.memmap)
+    checkpointer = Checkpointer(worm.q_table_path, args.save_every, args.save_seconds)
+    env = VectorEnv(args.envs, seed=args.seed)
+    rng = np.random.default_rng(args.seed)
+    buffer = ReplayBuffer(args.replay, args.prioritized, seed=args.seed) if args.replay else None
+    pending_replays = 0.0
+    metrics = exporter = None
+    if args.metrics:
+        # Un tick = un pas de tous les mondes ; "move" couvre aussi les boulettes et les morts
+        metrics = Metrics()
+        metrics.q_table = worm.q_table
+        exporter = MetricsExporter(args.metrics, args.metrics_every)
+    telemetry = TelemetrySink(args.telemetry) if args.telemetry else None
+
+    states = encode_states(env.get_states())
+    ages = np.zeros(args.envs, dtype=np.int64)
+    score_history = RollingStats(SCORE_WINDOW)
+    episode = 0
+    total_ticks = 0
+    start = time.perf_counter()
+    episode_started = np.full(args.envs, start)
+
+    while episode < args.episodes:
+        if metrics is not None:
+            tick_start = metrics.clock()
+        allowed = env.allowed_actions()
+        actions = worm.q_table.best_actions(states, allowed)
+        explore = rng.random(args.envs) < worm.epsilon
+        if explore.any():
+            random_actions = (rng.random((args.envs, allowed.shape[1])) * allowed).argmax(axis=1)
+            actions[explore] = random_actions[explore]
+        if metrics is not None:
+            decided = metrics.clock()
+
+        next_states, rewards, dones = env.step(actions)
+        next_states = encode_states(next_states)
+        if metrics is not None:
+            moved = metrics.clock()
+        if buffer is None:
+            worm.q_table.update_batch(states, actions, rewards, next_states, dones, worm.alpha, worm.gamma)
+        else:
+            buffer.append_batch(states, actions, rewards, next_states, dones)
+            pending_replays += args.envs * args.replay_ratio
+            while pending_replays >= args.batch_size and buffer.size >= args.batch_size:
+                replay_minibatch(buffer, worm.q_table, args.batch_size, worm.alpha, worm.gamma)
+                pending_replays -= args.batch_size
+        total_ticks += args.envs
+
+        if metrics is not None:
+            end = metrics.clock()
+            metrics.add_phase("decide", decided - tick_start)
+            metrics.add_phase("move", moved - decided)
+            metrics.add_phase("q_update", end - moved)
+            metrics.tick_finished(end - tick_start)
+            wall_deaths = int(env.last_wall_deaths.sum())
+            metrics.deaths[WALL_DEATH] += wall_deaths
+            metrics.deaths[BODY_DEATH] += int(dones.sum()) - wall_deaths
+            metrics.pellets_eaten += env.last_eaters.size
+            exporter.maybe_export(metrics)
+
+        ages += 1
+        truncated = (ages >= args.max_ticks) & ~dones
+        if truncated.any():
+            env.final_score[truncated] = env.score[truncated]
+            env.final_length[truncated] = env.length[truncated]
+            next_states = encode_states(env.reset(np.flatnonzero(truncated)))
+        finished = np.flatnonzero(dones | truncated)
+        if telemetry is not None and finished.size:
+            # Chaque monde avance d'un pas par tick : ses ticks/s sont ceux de la boucle pendant sa partie
+            now = time.perf_counter()
+            steps_per_second = ages[finished] / (now - episode_started[finished])
+            episode_started[finished] = now
+            causes = np.where(env.last_wall_deaths[finished], WALL_DEATH, BODY_DEATH).astype(object)
+            causes[truncated[finished]] = TIMEOUT
+        ended_ages = ages[finished]
+        ages[finished] = 0
+        states = next_states
+
+        for i, env_index in enumerate(finished.tolist()):
+            score = int(env.final_score[env_index])
+            episode += 1
+            score_history.append(score)
+            if telemetry is not None:
+                telemetry.record(
+                    score, int(env.final_length[env_index]), int(ended_ages[i]), str(causes[i]),
+                    epsilon=worm.epsilon, q_table=worm.q_table, steps_per_second=float(steps_per_second[i]),
+                )
+            worm.epsilon = max(worm.min_epsilon, worm.epsilon * worm.epsilon_decay)
+
+            checkpointer.episode_finished(worm.q_table, worm.epsilon, episode)
+            if episode % args.log_every == 0:
+                log_progress(episode, args.episodes, worm, score_history, total_ticks, start)
+
+    checkpointer.save(worm.q_table, worm.epsilon, episode)
+    checkpointer.close()
+    if exporter is not None:
+        exporter.close(metrics)
+    if telemetry is not None:
+        telemetry.close()
+
+
+def main():
+    args = parse_args()
+    if args.observation and (args.envs or args.workers):
+        raise SystemExit("--observation n'est disponible qu'avec la Simulation (ni --envs ni --workers)")
+    if args.record and (args.envs or args.workers):
+        raise SystemExit("--record n'est disponible qu'avec la Simulation (ni --envs ni --workers)")
+    if args.telemetry and args.workers:
+        raise SystemExit("--telemetry n'est pas disponible avec --workers")
+    if args.memmap and args.workers:
+        raise SystemExit("--memmap n'est pas disponible avec --workers (les tables des workers sont fusionnées)")
+    if (args.replay or args.prioritized) and args.workers:
+        raise SystemExit("--replay et --prioritized ne sont pas disponibles avec --workers (les workers apprennent à chaque pas)")
+    if args.workers:
+        trainer = ParallelTrainer(
+            args.workers,
+            mode=args.mode,
+            q_table_path=args.q_table,
+            seed=args.seed,
+            episodes_per_round=args.episodes_per_round,
+            max_ticks=args.max_ticks,
+            checkpoint_every=args.checkpoint_every,
+        )
+        trainer.train(args.episodes, log_every=args.log_every)
+    elif args.envs:
+        train_vectorized(args)
+    else:
+        train(args)
+
+
+if __name__ == "__main__":
+    main()
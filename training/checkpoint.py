@@ -0,0 +1,79 @@
+# training/checkpoint.py
+
+import os
+import queue
+import threading
+import time
+import traceback
+
+from config import CHECKPOINT_EVERY_EPISODES, CHECKPOINT_EVERY_SECONDS
+import numpy as np
+
+from player.q_table import save_metadata, save_table
+
+
+class Checkpointer:
+    """
+    Sauvegarde la table Q sur un thread d'arrière-plan.
+    L'appelant ne paie que la copie de la table ; l'écriture (atomique) se fait à côté.
+    Si une sauvegarde attend encore quand une nouvelle arrive, seule la plus récente est écrite.
+    Une table projetée sur ce même fichier (MappedQTable) n'est pas copiée : le thread vide
+    ses pages modifiées et réécrit l'en-tête seulement.
+    """
+
+    def __init__(self, path, every_episodes=CHECKPOINT_EVERY_EPISODES, every_seconds=CHECKPOINT_EVERY_SECONDS):
+        self.path = path
+        self.every_episodes = every_episodes
+        self.every_seconds = every_seconds
+
+        self._last_episode = 0
+        self._last_time = time.monotonic()
+        self._queue = queue.Queue(maxsize=1)
+        self._thread = threading.Thread(target=self._run, name="q-table-checkpoint", daemon=True)
+        self._thread.start()
+
+    def episode_finished(self, q_table, epsilon, episodes):
+        """À appeler en fin de partie : sauvegarde si l'un des intervalles est écoulé."""
+        if (
+            episodes - self._last_episode >= self.every_episodes
+            or time.monotonic() - self._last_time >= self.every_seconds
+        ):
+            self.save(q_table, epsilon, episodes)
+
+    def save(self, q_table, epsilon, episodes):
+        snapshot = (q_table.export(), {'epsilon': epsilon, 'episodes': episodes})
+        try:
+            self._queue.get_nowait()
+            self._queue.task_done()
+        except queue.Empty:
+            pass
+        self._queue.put_nowait(snapshot)
+
+        self._last_episode = episodes
+        self._last_time = time.monotonic()
+
+    def flush(self):
+        """Attend que la dernière sauvegarde demandée soit sur le disque."""
+        self._queue.join()
+
+    def close(self):
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                values, metadata = item
+                if isinstance(values, np.memmap) and values.filename == os.path.abspath(self.path):
+                    values.flush()
+                    save_metadata(self.path, metadata)
+                else:
+                    save_table(self.path, values, metadata)
+            except Exception:
+                traceback.print_exc()
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,126 @@
+# training/parallel.py
+
+import multiprocessing as mp
+import random
+import time
+
+from config import SCORE_WINDOW
+from engine.simulation import Simulation
+from engine.telemetry import RollingStats
+from player.q_learning_player import QLearningWorm
+from player.q_table import QTable
+
+
+def _worker_loop(conn, mode, seed, q_table_path):
+    """Processus d'entraînement : joue des parties sur sa propre Simulation à chaque commande reçue."""
+    # Le ver ouvre la table du maître (remplacée à chaque tour par la table envoyée), jamais celle par défaut
+    simulation = Simulation(mode, seed=seed, main_worm=QLearningWorm(q_table_path))
+    worm = simulation.main_worm
+
+    while True:
+        command = conn.recv()
+        if command is None:
+            break
+
+        values, epsilon, episodes, max_ticks = command
+        worm.q_table = QTable(values)
+        worm.epsilon = epsilon
+
+        scores = []
+        ticks = 0
+        for _ in range(episodes):
+            ticks += simulation.run_episode(max_ticks=max_ticks)
+            scores.append(worm.score)
+            simulation.reset()
+
+        conn.send((worm.q_table.values, worm.q_table.visits, scores, ticks))
+
+    conn.close()
+
+
+class ParallelTrainer:
+    """
+    Entraîne le Q-learning sur plusieurs processus. Chaque worker a son monde, son ver
+    et sa graine ; à chaque tour, tous partent de la table maître, jouent quelques parties,
+    puis leurs tables sont fusionnées dans la table maître (moyenne pondérée par les visites).
+    """
+
+    def __init__(self, workers, mode="Q-LEARNING-SOLO", q_table_path="q_table.npy", seed=None,
+                 episodes_per_round=20, max_ticks=10000, checkpoint_every=5):
+        self.mode = mode
+        self.q_table_path = q_table_path
+        self.episodes_per_round = episodes_per_round
+        self.max_ticks = max_ticks
+        self.checkpoint_every = checkpoint_every
+
+        # Hyperparamètres et table de départ : ceux d'un QLearningWorm ordinaire
+        reference = QLearningWorm(q_table_path)
+        self.master = reference.q_table
+        self.epsilon = reference.epsilon
+        self.epsilon_decay = reference.epsilon_decay
+        self.min_epsilon = reference.min_epsilon
+
+        seed = random.randrange(2 ** 32) if seed is None else seed
+        self.connections = []
+        self.processes = []
+        for index in range(workers):
+            parent_conn, child_conn = mp.Pipe()
+            process = mp.Process(target=_worker_loop, args=(child_conn, mode, seed + index, q_table_path), daemon=True)
+            process.start()
+            self.connections.append(parent_conn)
+            self.processes.append(process)
+
+        self.rounds = 0
+        self.episodes = 0
+        self.ticks = 0
+        self.score_history = RollingStats(SCORE_WINDOW)
+
+    def run_round(self):
+        for conn in self.connections:
+            conn.send((self.master.values, self.epsilon, self.episodes_per_round, self.max_ticks))
+
+        tables = []
+        for conn in self.connections:
+            values, visits, scores, ticks = conn.recv()
+            table = QTable(values)
+            table.visits = visits
+            tables.append(table)
+            self.score_history.extend(scores)
+            self.ticks += ticks
+
+        self.master = QTable.merge(self.master, tables)
+
+        played = self.episodes_per_round * len(self.connections)
+        self.episodes += played
+        self.epsilon = max(self.min_epsilon, self.epsilon * self.epsilon_decay ** played)
+        self.rounds += 1
+
+        if self.rounds % self.checkpoint_every == 0:
+            self.save()
+
+    def save(self):
+        self.master.save(self.q_table_path, {'epsilon': self.epsilon, 'episodes': self.episodes})
+
+    def close(self):
+        for conn in self.connections:
+            conn.send(None)
+        for process in self.processes:
+            process.join()
+
+    def train(self, episodes, log_every=100):
+        start = time.perf_counter()
+        next_log = log_every
+        try:
+            while self.episodes < episodes:
+                self.run_round()
+                if self.episodes >= next_log:
+                    next_log = (self.episodes // log_every + 1) * log_every
+                    avg_score = self.score_history.mean
+                    print(
+                        f"Game {self.episodes}/{episodes} | Avg Score (last 100): {avg_score:.2f} | "
+                        f"Epsilon: {self.epsilon:.3f} | Q-table size: {self.master.size} | "
+                        f"{self.ticks / (time.perf_counter() - start):.0f} ticks/s"
+                    )
+        finally:
+            self.save()
+            self.close()
@@ -0,0 +1,164 @@
+# training/replay_buffer.py
+
+import threading
+import time
+
+import numpy as np
+
+from config import (
+    REPLAY_BATCH_SIZE,
+    REPLAY_CAPACITY,
+    REPLAY_PRIORITY_ALPHA,
+    REPLAY_PRIORITY_BETA,
+    REPLAY_RATIO,
+)
+
+
+class ReplayBuffer:
+    """
+    Tampon circulaire de transitions (état, action, récompense, état suivant, fin) dans des
+    tableaux NumPy préalloués : un ajout coûte quelques écritures, quelle que soit la taille.
+    Une fois plein, les transitions les plus anciennes sont écrasées.
+
+    Avec `prioritized`, une transition est tirée avec une probabilité proportionnelle à
+    priorité^alpha, la priorité étant la dernière erreur TD mesurée sur elle (les nouvelles
+    reçoivent la plus haute vue jusque-là, pour être rejouées au moins une fois).
+
+    Toutes les méthodes passent par `lock` : la simulation ajoute ses transitions pendant que
+    le ReplayLearner tire et met à jour les priorités sur son thread.
+    """
+
+    def __init__(self, capacity=REPLAY_CAPACITY, prioritized=False, alpha=REPLAY_PRIORITY_ALPHA, seed=None):
+        self.capacity = capacity
+        self.prioritized = prioritized
+        self.alpha = alpha
+        self.rng = np.random.default_rng(seed)
+
+        self.states = np.zeros(capacity, dtype=np.int64)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros(capacity, dtype=np.int64)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.priorities = np.zeros(capacity, dtype=np.float64)
+        self.max_priority = 1.0
+
+        self.position = 0  # prochaine case écrite
+        self.size = 0
+        self.appended = 0  # transitions ajoutées depuis la création
+        self.lock = threading.RLock()
+
+    def append(self, state: int, action: int, reward: float, next_state: int, done: bool):
+        with self.lock:
+            i = self.position
+            self.states[i] = state
+            self.actions[i] = action
+            self.rewards[i] = reward
+            self.next_states[i] = next_state
+            self.dones[i] = done
+            self.priorities[i] = self.max_priority
+            self.position = (i + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+            self.appended += 1
+
+    def append_batch(self, states, actions, rewards, next_states, dones):
+        """Ajoute un lot de transitions (tableaux de même longueur, au plus `capacity`)."""
+        n = len(states)
+        with self.lock:
+            index = (self.position + np.arange(n)) % self.capacity
+            self.states[index] = states
+            self.actions[index] = actions
+            self.rewards[index] = rewards
+            self.next_states[index] = next_states
+            self.dones[index] = dones
+            self.priorities[index] = self.max_priority
+            self.position = (self.position + n) % self.capacity
+            self.size = min(self.size + n, self.capacity)
+            self.appended += n
+
+    def sample(self, batch_size: int, beta: float = REPLAY_PRIORITY_BETA):
+        """
+        Tire un minibatch : (indices, états, actions, récompenses, états suivants, fins, poids).
+        Les poids corrigent le biais du tirage prioritaire ((N * P)^-beta, normalisés à 1 au plus) ;
+        ils valent None en tirage uniforme.
+        """
+        with self.lock:
+            size = self.size
+            if self.prioritized:
+                p = self.priorities[:size] ** self.alpha
+                cumulative = np.cumsum(p)
+                index = np.searchsorted(cumulative, self.rng.random(batch_size) * cumulative[-1], side="right")
+                index = np.minimum(index, size - 1)
+                weights = (size * p[index] / cumulative[-1]) ** -beta
+                weights /= weights.max()
+            else:
+                index = self.rng.integers(0, size, batch_size)
+                weights = None
+            return (
+                index, self.states[index], self.actions[index], self.rewards[index],
+                self.next_states[index], self.dones[index], weights,
+            )
+
+    def update_priorities(self, index: np.ndarray, td_errors: np.ndarray):
+        priorities = np.abs(td_errors) + 1e-3
+        with self.lock:
+            self.priorities[index] = priorities
+            self.max_priority = max(self.max_priority, float(priorities.max()))
+
+
+def replay_minibatch(buffer: ReplayBuffer, q_table, batch_size: int, alpha: float, gamma: float):
+    """
+    Un minibatch tiré du tampon, appliqué à la table par une mise à jour TD vectorisée.
+    Le tirage, la mise à jour de la table et celle des priorités se font sous buffer.lock :
+    pendant le rejeu, la table n'est écrite qu'ici, et un ajout ne peut pas s'intercaler.
+    """
+    with buffer.lock:
+        index, states, actions, rewards, next_states, dones, weights = buffer.sample(batch_size)
+        td_errors = q_table.update_batch(states, actions, rewards, next_states, dones, alpha, gamma, weights, mean=True)
+        if buffer.prioritized:
+            buffer.update_priorities(index, td_errors)
+
+
+class ReplayLearner:
+    """
+    Applique les minibatchs du tampon à la table Q sur un thread d'arrière-plan, pendant
+    que la simulation joue et ajoute ses transitions.
+    Le learner suit le rythme des ajouts : il rejoue `ratio` fois en moyenne chaque transition
+    ajoutée, puis attend les suivantes au lieu de prendre du temps à la simulation.
+    """
+
+    def __init__(self, buffer: ReplayBuffer, q_table, alpha: float, gamma: float,
+                 batch_size=REPLAY_BATCH_SIZE, ratio=REPLAY_RATIO):
+        self.buffer = buffer
+        self.q_table = q_table
+        self.alpha = alpha
+        self.gamma = gamma
+        self.batch_size = batch_size
+        self.ratio = ratio
+        self.updates = 0  # transitions rejouées
+        self.error = None  # exception sur laquelle le thread s'est arrêté
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="q-replay-learner", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        buffer = self.buffer
+        while not self._stop.is_set():
+            if buffer.size < self.batch_size or self.updates >= self.ratio * buffer.appended:
+                time.sleep(0.001)
+                continue
+            try:
+                replay_minibatch(buffer, self.q_table, self.batch_size, self.alpha, self.gamma)
+            except Exception as error:
+                self.error = error
+                return
+            self.updates += self.batch_size
+
+    def check(self):
+        """Relève l'erreur du thread s'il s'est arrêté dessus : à appeler en fin de partie."""
+        if self.error is not None:
+            raise RuntimeError("le learner de rejeu s'est arrêté sur une erreur") from self.error
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self.check()
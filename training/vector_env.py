@@ -0,0 +1,220 @@
+# training/vector_env.py
+
+import numpy as np
+
+from config import SMALL_WORLD_COLUMNS, SMALL_WORLD_ROWS, SMALL_INITIAL_PELLET_COUNT, PELLET_TYPES
+from player.policy import FOOD_RADAR_RADIUS
+from player import q_table
+
+# Même ordre que les colonnes de la table Q : up, down, right, left
+ACTIONS = np.array(q_table.ACTIONS, dtype=np.int64)
+REVERSE_ACTION = np.array([1, 0, 3, 2], dtype=np.int64)
+
+
+class VectorEnv:
+    """
+    N parties Q-LEARNING-SOLO indépendantes (un ver par monde), avancées
+    ensemble par des opérations NumPy.
+
+    step(actions) reproduit les règles de world/moves.py (un seul ver) et les récompenses de
+    QLearningWorm.after_move ; les états renvoyés ont le format de QLearningWorm.get_state :
+    une ligne (food_dir_x, food_dir_y, d_up, d_down, d_right, d_left) par monde.
+    Les mondes terminés sont réinitialisés automatiquement.
+    """
+
+    def __init__(self, num_envs, columns=None, rows=None, pellet_count=None, seed=None):
+        self.num_envs = num_envs
+        self.columns = columns or SMALL_WORLD_COLUMNS
+        self.rows = rows or SMALL_WORLD_ROWS
+        self.pellet_count = pellet_count or SMALL_INITIAL_PELLET_COUNT
+        self.capacity = self.columns * self.rows
+        self.rng = np.random.default_rng(seed)
+
+        n = num_envs
+        # Corps des vers : buffer circulaire, la tête est à l'indice head_ptr
+        self.body = np.zeros((n, self.capacity, 2), dtype=np.int16)
+        self.head_ptr = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.direction = np.zeros(n, dtype=np.int64)  # indice dans ACTIONS
+        self.growth_pending = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.final_score = np.zeros(n, dtype=np.int64)  # score en fin de partie, valide là où done
+        self.final_length = np.zeros(n, dtype=np.int64)  # longueur en fin de partie, idem
+        self.occupied = np.zeros((n, self.columns, self.rows), dtype=bool)
+
+        self.pellet_pos = np.zeros((n, self.pellet_count, 2), dtype=np.int64)
+        self.pellet_type = np.zeros((n, self.pellet_count), dtype=np.int64)
+        self.pellet_slot = np.full((n, self.columns, self.rows), -1, dtype=np.int32)
+        # Rang d'apparition de chaque boulette : à distance égale, la première apparue l'emporte (cf. World.nearest_pellet)
+        self.pellet_rank = np.zeros((n, self.pellet_count), dtype=np.int64)
+        self.pellet_added = np.zeros(n, dtype=np.int64)
+
+        self.pellet_score = np.array([spec["score"] for spec in PELLET_TYPES], dtype=np.int64)
+        self.pellet_growth = np.array([spec["growth"] for spec in PELLET_TYPES], dtype=np.int64)
+
+        self._all = np.arange(n)
+        self.reset()
+
+    @property
+    def heads(self) -> np.ndarray:
+        return self.body[self._all, self.head_ptr].astype(np.int64)
+
+    def reset(self, envs=None):
+        """Réinitialise les mondes donnés (tous par défaut) et retourne les états de tous les mondes."""
+        envs = self._all if envs is None else np.asarray(envs)
+        if envs.size:
+            self.occupied[envs] = False
+            self.pellet_slot[envs] = -1
+
+            # Tête + boulettes sur des cases distinctes, tirées d'un coup pour tous les mondes
+            picks = np.argpartition(
+                self.rng.random((envs.size, self.capacity)), self.pellet_count, axis=1
+            )[:, : self.pellet_count + 1]
+            xs, ys = np.divmod(picks, self.rows)
+
+            self.head_ptr[envs] = 0
+            self.body[envs, 0, 0] = xs[:, 0]
+            self.body[envs, 0, 1] = ys[:, 0]
+            self.occupied[envs, xs[:, 0], ys[:, 0]] = True
+            self.length[envs] = 1
+            self.direction[envs] = 2  # droite
+            self.growth_pending[envs] = 0
+            self.score[envs] = 0
+
+            self.pellet_pos[envs, :, 0] = xs[:, 1:]
+            self.pellet_pos[envs, :, 1] = ys[:, 1:]
+            self.pellet_type[envs] = self.rng.integers(0, len(PELLET_TYPES), size=(envs.size, self.pellet_count))
+            slots = np.broadcast_to(np.arange(self.pellet_count), (envs.size, self.pellet_count))
+            self.pellet_slot[envs[:, None], xs[:, 1:], ys[:, 1:]] = slots
+            self.pellet_rank[envs] = np.arange(self.pellet_count)
+            self.pellet_added[envs] = self.pellet_count
+
+        return self.get_states()
+
+    def allowed_actions(self) -> np.ndarray:
+        """Masque (N, 4) des actions autorisées : demi-tour interdit dès que le ver a un corps."""
+        mask = np.ones((self.num_envs, len(ACTIONS)), dtype=bool)
+        has_body = self.length > 1
+        mask[self._all[has_body], REVERSE_ACTION[self.direction[has_body]]] = False
+        return mask
+
+    def _nearest_pellet_distance(self, heads):
+        dist = np.abs(self.pellet_pos - heads[:, None, :]).sum(axis=2)
+        return dist, dist.min(axis=1)
+
+    def get_states(self) -> np.ndarray:
+        heads = self.heads
+        dist, min_dist = self._nearest_pellet_distance(heads)
+
+        nearest = np.where(dist == min_dist[:, None], self.pellet_rank, np.iinfo(np.int64).max).argmin(axis=1)
+        target = self.pellet_pos[self._all, nearest]
+        food_dir = np.sign(target - heads)
+        food_dir[min_dist >= FOOD_RADAR_RADIUS] = 0
+
+        states = np.empty((self.num_envs, 6), dtype=np.int8)
+        states[:, :2] = food_dir
+        for i, (dx, dy) in enumerate(ACTIONS):
+            x = heads[:, 0] + dx
+            y = heads[:, 1] + dy
+            wall = (x < 0) | (x >= self.columns) | (y < 0) | (y >= self.rows)
+            body = self.occupied[self._all, np.clip(x, 0, self.columns - 1), np.clip(y, 0, self.rows - 1)]
+            states[:, 2 + i] = np.where(wall, 1, np.where(body, 2, 0))
+        return states
+
+    def _spawn_pellets(self, envs, slots):
+        """Replace les boulettes `slots` des mondes `envs` sur des cases libres (une par monde)."""
+        pending = np.arange(envs.size)
+        for _ in range(16):
+            if not pending.size:
+                return
+            e = envs[pending]
+            x = self.rng.integers(0, self.columns, size=e.size)
+            y = self.rng.integers(0, self.rows, size=e.size)
+            free = ~self.occupied[e, x, y] & (self.pellet_slot[e, x, y] < 0)
+            self._place_pellets(e[free], slots[pending[free]], x[free], y[free])
+            pending = pending[~free]
+
+        # Monde très encombré : on tire parmi les cases réellement libres
+        for i in pending:
+            env = envs[i]
+            free_cells = np.flatnonzero(~self.occupied[env] & (self.pellet_slot[env] < 0))
+            if free_cells.size:
+                x, y = divmod(int(self.rng.choice(free_cells)), self.rows)
+                self._place_pellets(np.array([env]), slots[i:i + 1], np.array([x]), np.array([y]))
+
+    def _place_pellets(self, envs, slots, x, y):
+        self.pellet_pos[envs, slots, 0] = x
+        self.pellet_pos[envs, slots, 1] = y
+        self.pellet_type[envs, slots] = self.rng.integers(0, len(PELLET_TYPES), size=envs.size)
+        self.pellet_slot[envs, x, y] = slots
+        # Au plus une boulette placée par monde et par appel (un ver mange au plus une boulette par pas)
+        self.pellet_rank[envs, slots] = self.pellet_added[envs]
+        self.pellet_added[envs] += 1
+
+    def step(self, actions):
+        """
+        Avance tous les mondes d'un pas avec les actions (indices dans ACTIONS).
+        Retourne (states, rewards, dones).
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        heads = self.heads
+        _, dist_before = self._nearest_pellet_distance(heads)
+
+        new_heads = heads + ACTIONS[actions]
+        nx, ny = new_heads[:, 0], new_heads[:, 1]
+        cx, cy = np.clip(nx, 0, self.columns - 1), np.clip(ny, 0, self.rows - 1)
+
+        # Le ver grandit-il pendant ce pas ? Sinon sa queue avance et libère sa case (cf. world/moves.py)
+        slot = self.pellet_slot[self._all, cx, cy]
+        eats = slot >= 0
+        grows = (self.growth_pending > 0) | (
+            eats & (self.pellet_growth[self.pellet_type[self._all, np.maximum(slot, 0)]] > 0)
+        )
+        tail_ptr = (self.head_ptr - self.length + 1) % self.capacity
+        tails = self.body[self._all, tail_ptr].astype(np.int64)
+        onto_tail = ~grows & (nx == tails[:, 0]) & (ny == tails[:, 1])
+
+        wall = (nx < 0) | (nx >= self.columns) | (ny < 0) | (ny >= self.rows)
+        body = self.occupied[self._all, cx, cy] & ~onto_tail
+        dones = wall | body
+        self.direction = actions.copy()
+        self.last_wall_deaths = wall  # pour engine/metrics.py (causes des morts)
+
+        # On avance : la queue d'abord (sa case peut être la nouvelle tête), puis la tête
+        a = self._all[~dones]
+        shrink = a[~grows[a]]
+        self.occupied[shrink, tails[shrink, 0], tails[shrink, 1]] = False
+        self.length[shrink] -= 1
+
+        ax, ay = nx[a], ny[a]
+        self.head_ptr[a] = (self.head_ptr[a] + 1) % self.capacity
+        self.body[a, self.head_ptr[a], 0] = ax
+        self.body[a, self.head_ptr[a], 1] = ay
+        self.occupied[a, ax, ay] = True
+        self.length[a] += 1
+
+        # Boulettes mangées
+        ate = eats[a]
+        eaters, eaten = a[ate], slot[a][ate]
+        types = self.pellet_type[eaters, eaten]
+        self.score[eaters] += self.pellet_score[types]
+        self.growth_pending[eaters] += self.pellet_growth[types]
+        self.pellet_slot[eaters, ax[ate], ay[ate]] = -1
+        self._spawn_pellets(eaters, eaten)
+        self.last_eaters = eaters
+
+        # Croissance
+        self.growth_pending[a[grows[a]]] -= 1
+
+        # Récompenses (cf. QLearningWorm.get_reward et after_move)
+        rewards = np.full(self.num_envs, -0.1, dtype=np.float32)
+        rewards[eaters] = 10
+        _, dist_after = self._nearest_pellet_distance(self.heads)
+        rewards += np.where(dist_after < dist_before, 1.0, -1.5).astype(np.float32)
+        rewards[dones] = -200
+
+        done_envs = self._all[dones]
+        self.final_score[done_envs] = self.score[done_envs]
+        self.final_length[done_envs] = self.length[done_envs]
+        states = self.reset(done_envs)
+        return states, rewards, dones
@@ -0,0 +1,65 @@
+# world/free_cells.py
+
+import random
+from typing import Iterable, List, Tuple
+
+
+class FreeCells:
+    """
+    Ensemble des cases libres (ni corps, ni boulette) de la carte.
+    Les cases libres sont rangées dans un tableau, et chaque case connaît sa
+    place dans ce tableau : ajout, retrait (échange avec le dernier) et tirage
+    uniforme se font en O(1), quel que soit le remplissage de la carte.
+    """
+
+    __slots__ = ("rows", "_cells", "_slots")
+
+    def __init__(self, columns: int, rows: int, occupied: Iterable[Tuple[int, int]] = ()):
+        self.rows = rows
+        area = columns * rows
+        self._cells = list(range(area))  # indices x * rows + y des cases libres
+        self._slots = list(range(area))  # place de chaque case dans _cells, -1 si occupée
+        for cell in occupied:
+            self.discard(cell)
+
+    @classmethod
+    def from_indices(cls, columns: int, rows: int, indices: Iterable[int]) -> "FreeCells":
+        """Reconstruit l'ensemble à partir de `indices`, dans cet ordre (cf. engine/snapshot.py)."""
+        free_cells = cls.__new__(cls)
+        free_cells.rows = rows
+        free_cells._cells = list(indices)
+        free_cells._slots = [-1] * (columns * rows)
+        for slot, index in enumerate(free_cells._cells):
+            free_cells._slots[index] = slot
+        return free_cells
+
+    @property
+    def indices(self) -> List[int]:
+        """Indices x * rows + y des cases libres, dans l'ordre utilisé par sample."""
+        return self._cells
+
+    def add(self, cell: Tuple[int, int]):
+        index = cell[0] * self.rows + cell[1]
+        if self._slots[index] < 0:
+            self._slots[index] = len(self._cells)
+            self._cells.append(index)
+
+    def discard(self, cell: Tuple[int, int]):
+        index = cell[0] * self.rows + cell[1]
+        slot = self._slots[index]
+        if slot >= 0:
+            last = self._cells.pop()
+            if last != index:
+                self._cells[slot] = last
+                self._slots[last] = slot
+            self._slots[index] = -1
+
+    def sample(self, rng: random.Random) -> Tuple[int, int]:
+        """Case libre tirée uniformément. L'ensemble ne doit pas être vide."""
+        return divmod(self._cells[rng.randrange(len(self._cells))], self.rows)
+
+    def __contains__(self, cell) -> bool:
+        return self._slots[cell[0] * self.rows + cell[1]] >= 0
+
+    def __len__(self) -> int:
+        return len(self._cells)
@@ -0,0 +1,73 @@
+# world/grids.py
+
+import numpy as np
+
+from config import LOOKAHEAD_RADIUS, PELLET_FIELD_MAX_DISTANCE
+
+# Les grilles ont une bordure de murs de GRID_PAD cases : une fenêtre de LOOKAHEAD_RADIUS
+# cases autour de n'importe quelle tête y tient, et les voisins d'une case intérieure
+# existent toujours (pas de test de bord dans le parcours en largeur).
+GRID_PAD = LOOKAHEAD_RADIUS + 1
+
+
+class TickMaps:
+    """
+    Cartes du monde calculées au plus une fois par tick, à la demande, et partagées par
+    toutes les politiques du tick (cf. player/policy.observe).
+    Les grilles sont indexées [x + GRID_PAD, y + GRID_PAD] ; `flat` donne l'indice
+    d'une case dans leur version aplatie.
+    """
+
+    def __init__(self, world, max_distance=PELLET_FIELD_MAX_DISTANCE):
+        self.world = world
+        self.max_distance = max_distance
+        self.height = world.rows + 2 * GRID_PAD
+        # Décalage de l'indice aplati pour chaque direction de ACTIONS : up, down, right, left
+        self.steps = np.array([1, -1, self.height, -self.height], dtype=np.int64)
+        self._blocked = None
+        self._pellet_distance = None
+
+    def flat(self, cells: np.ndarray) -> np.ndarray:
+        return (cells[..., 0] + GRID_PAD) * self.height + cells[..., 1] + GRID_PAD
+
+    @property
+    def blocked(self) -> np.ndarray:
+        """Grille de danger : vrai sur les murs (la bordure) et sur tous les corps."""
+        if self._blocked is None:
+            world = self.world
+            blocked = np.ones((world.columns + 2 * GRID_PAD, self.height), dtype=bool)
+            blocked[GRID_PAD:-GRID_PAD, GRID_PAD:-GRID_PAD] = False
+            if world.bodies:
+                cells = np.array(list(world.bodies), dtype=np.int64)
+                blocked[cells[:, 0] + GRID_PAD, cells[:, 1] + GRID_PAD] = True
+            self._blocked = blocked
+        return self._blocked
+
+    @property
+    def pellet_distance(self) -> np.ndarray:
+        """
+        Distance (en pas, sans traverser de corps) de chaque case à la boulette la plus proche,
+        aplatie comme `flat` ; -1 au-delà de max_distance ou si aucune boulette n'est atteignable.
+        Parcours en largeur partant de toutes les boulettes à la fois, qui ne traite que le
+        front courant : son coût suit le nombre de cases atteintes, pas la taille de la carte.
+        """
+        if self._pellet_distance is None:
+            blocked = self.blocked.ravel()
+            distance = np.full(blocked.size, -1, dtype=np.int32)
+            pellets = self.world.pellet_cells
+            if pellets:
+                frontier = self.flat(np.array(list(pellets), dtype=np.int64))
+                distance[frontier] = 0
+                # Dédoublonnage du front en O(taille du front) : chaque case garde le dernier rang écrit
+                rank = np.empty(blocked.size, dtype=np.int64)
+                for d in range(1, self.max_distance + 1):
+                    neighbours = (frontier[:, None] + self.steps).ravel()
+                    neighbours = neighbours[(distance[neighbours] < 0) & ~blocked[neighbours]]
+                    if not neighbours.size:
+                        break
+                    order = np.arange(neighbours.size)
+                    rank[neighbours] = order
+                    frontier = neighbours[rank[neighbours] == order]
+                    distance[frontier] = d
+            self._pellet_distance = distance
+        return self._pellet_distance
@@ -1,10 +1,22 @@
 # world/map.py
 
+import math
 import random
-from dataclasses import dataclass
-from typing import List, Tuple
+from itertools import chain, islice
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
 
 from config import WORLD_COLUMNS, WORLD_ROWS, INITIAL_PELLET_COUNT, PELLET_TYPES
+from .free_cells import FreeCells
+from .pellet_index import PelletGrid, PelletPositions
+
+LINEAR_SCAN_MAX_PELLETS = 32
+# Tirages au hasard tentés avant de passer à l'ensemble exact des cases libres
+SPAWN_ATTEMPTS = 16
+# nearest_pellets calcule toutes les distances têtes x boulettes d'un coup jusqu'à ce nombre de paires
+BATCH_NEAREST_MAX_PAIRS = 1 << 18
 
 
 @dataclass
@@ -12,58 +24,183 @@ class Pellet:
     x: int
     y: int
     type_index: int  # index dans PELLET_TYPES
+    rank: int = field(default=0, compare=False)  # rang d'apparition, pour départager les égalités de distance
 
 
 class World:
-    def __init__(self, columns=None, rows=None, initial_pellet_count=None):
+    def __init__(self, columns=None, rows=None, initial_pellet_count=None, rng=None):
+        self.rng = rng or random.Random()
         self.columns = columns or WORLD_COLUMNS
         self.rows = rows or WORLD_ROWS
         self.initial_pellet_count = initial_pellet_count or INITIAL_PELLET_COUNT
-        self.pellets: List[Pellet] = []
 
-    def reset(self, snake_cells: List[Tuple[int, int]]):
+        # Index d'occupation partagé par tous les vers : case -> ver / boulette.
+        # Tenu à jour à chaque déplacement, croissance et mort.
+        # pellet_cells est aussi le magasin des boulettes (dans l'ordre d'apparition).
+        self.bodies: Dict[Tuple[int, int], object] = {}
+        self.pellet_cells: Dict[Tuple[int, int], Pellet] = {}
+        # Cases ni corps ni boulette. Construit seulement quand la carte est encombrée
+        # (cf. spawn_pellet), puis tenu à jour jusqu'à la fin de la partie.
+        self.free_cells: Optional[FreeCells] = None
+        # Seaux dimensionnés pour contenir en moyenne une boulette ou deux
+        bucket_size = max(4, math.isqrt(self.columns * self.rows // self.initial_pellet_count))
+        self.pellet_grid = PelletGrid(self.columns, self.rows, bucket_size)
+        self.pellet_positions = PelletPositions(self.initial_pellet_count)
+
+        # Observateurs des boulettes (rendu...) : pellet_added(p), pellet_removed(p), pellets_cleared()
+        self.pellet_listeners = []
+
+    @property
+    def pellets(self) -> Iterable[Pellet]:
+        """Les boulettes présentes, dans l'ordre d'apparition."""
+        return self.pellet_cells.values()
+
+    def reset(self):
         """Réinitialise le monde et génère le champ de boulettes."""
-        self.pellets.clear()
+        self.clear_pellets()
         for _ in range(self.initial_pellet_count):
-            self.spawn_pellet(snake_cells)
-
-    def spawn_pellet(self, forbidden_cells: List[Tuple[int, int]]):
-        """Place une nouvelle boulette sur une case libre."""
-        while True:
-            gx = random.randrange(self.columns)
-            gy = random.randrange(self.rows)
-
-            if (gx, gy) in forbidden_cells:
-                continue
-            if any(p.x == gx and p.y == gy for p in self.pellets):
-                continue
-
-            type_index = random.randrange(len(PELLET_TYPES))
-            self.pellets.append(Pellet(gx, gy, type_index))
-            break
-
-    def eat_pellets_at(self, gx: int, gy: int, snake_cells: List[Tuple[int, int]]):
-        """Le ver mange les boulettes sur la case (gx, gy). Retourne (score_delta, growth_delta)."""
-        eaten = [p for p in self.pellets if p.x == gx and p.y == gy]
-        if not eaten:
+            self.spawn_pellet()
+
+    def clear_pellets(self):
+        for listener in self.pellet_listeners:
+            listener.pellets_cleared()
+        self.pellet_cells.clear()
+        self.free_cells = None
+        self.pellet_grid.clear()
+        self.pellet_positions.clear()
+
+    def clear_bodies(self):
+        self.bodies.clear()
+        self.free_cells = None
+
+    def occupy(self, cell: Tuple[int, int], worm):
+        self.bodies[cell] = worm
+        if self.free_cells is not None:
+            self.free_cells.discard(cell)
+
+    def vacate(self, cell: Tuple[int, int]):
+        if self.bodies.pop(cell, None) is not None and self.free_cells is not None and cell not in self.pellet_cells:
+            self.free_cells.add(cell)
+
+    def worm_at(self, cell: Tuple[int, int]):
+        """Retourne le ver dont le corps occupe la case, ou None."""
+        return self.bodies.get(cell)
+
+    def nearest_pellet(self, gx: int, gy: int, max_dist: Optional[int] = None) -> Optional[Pellet]:
+        """Boulette la plus proche de (gx, gy) en distance de Manhattan, dans un rayon max_dist (inclus) si donné."""
+        if len(self.pellet_cells) > LINEAR_SCAN_MAX_PELLETS:
+            return self.pellet_grid.nearest(gx, gy, max_dist)
+
+        # Peu de boulettes : un simple parcours coûte moins cher que l'index
+        target_cell = None
+        min_dist = float('inf') if max_dist is None else max_dist + 1
+        for cell in self.pellet_cells:
+            px, py = cell
+            dist = abs(gx - px) + abs(gy - py)
+            if dist < min_dist:
+                min_dist = dist
+                target_cell = cell
+        return None if target_cell is None else self.pellet_cells[target_cell]
+
+    def nearest_pellets(self, heads: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Version par lots de nearest_pellet pour des positions (N, 2).
+        Retourne les positions (N, 2) des boulettes les plus proches et leurs distances (N,),
+        (-1, -1) et -1 quand il n'y a aucune boulette.
+        """
+        n = len(heads)
+        if self.pellet_cells and n * len(self.pellet_cells) <= BATCH_NEAREST_MAX_PAIRS:
+            # Toutes les distances d'un coup ; à distance égale, la boulette apparue
+            # la première l'emporte, comme dans nearest_pellet
+            positions = self.pellet_positions
+            pellets = positions.array
+            keys = np.abs(heads[:, 0:1] - pellets[:, 0])
+            keys += np.abs(heads[:, 1:2] - pellets[:, 1])
+            keys *= positions.added
+            keys += positions.order
+            best = keys.argmin(axis=1)
+            return pellets[best], keys[np.arange(n), best] // positions.added
+
+        food = np.full((n, 2), -1, dtype=np.int64)
+        food_dist = np.full(n, -1, dtype=np.int64)
+        if not self.pellet_cells:
+            return food, food_dist
+
+        # Beaucoup de têtes et de boulettes : l'index spatial, tête par tête
+        for i, (gx, gy) in enumerate(heads.tolist()):
+            pellet = self.nearest_pellet(gx, gy)
+            food[i] = pellet.x, pellet.y
+            food_dist[i] = abs(pellet.x - gx) + abs(pellet.y - gy)
+        return food, food_dist
+
+    def nearest_pellet_distance(self, gx: int, gy: int) -> float:
+        pellet = self.nearest_pellet(gx, gy)
+        if pellet is None:
+            return float('inf')
+        return abs(gx - pellet.x) + abs(gy - pellet.y)
+
+    def add_pellet(self, gx: int, gy: int, type_index: int) -> Pellet:
+        pellet = Pellet(gx, gy, type_index, self.pellet_positions.added)
+        self.pellet_cells[(gx, gy)] = pellet
+        if self.free_cells is not None:
+            self.free_cells.discard((gx, gy))
+        self.pellet_grid.add(pellet)
+        self.pellet_positions.add(gx, gy)
+        for listener in self.pellet_listeners:
+            listener.pellet_added(pellet)
+        return pellet
+
+    def spawn_pellet(self) -> Optional[Pellet]:
+        """
+        Place une nouvelle boulette sur une case libre (ni corps, ni boulette), tirée uniformément.
+        Retourne None, sans rien faire, si la carte est pleine.
+        """
+        if self.free_cells is None:
+            # Carte peu remplie : quelques tirages au hasard suffisent presque toujours
+            for _ in range(SPAWN_ATTEMPTS):
+                cell = (self.rng.randrange(self.columns), self.rng.randrange(self.rows))
+                if cell not in self.bodies and cell not in self.pellet_cells:
+                    break
+            else:
+                # Carte encombrée : on passe à l'ensemble des cases libres, tiré en O(1)
+                self.free_cells = FreeCells(self.columns, self.rows, chain(self.bodies, self.pellet_cells))
+
+        if self.free_cells is not None:
+            if not self.free_cells:
+                return None
+            cell = self.free_cells.sample(self.rng)
+
+        gx, gy = cell
+        type_index = self.rng.randrange(len(PELLET_TYPES))
+        return self.add_pellet(gx, gy, type_index)
+
+    def remove_pellet(self, gx: int, gy: int) -> Optional[Pellet]:
+        """Retire la boulette de la case (gx, gy), sans la remplacer. Retourne la boulette retirée, ou None."""
+        pellet = self.pellet_cells.pop((gx, gy), None)
+        if pellet is None:
+            return None
+
+        if self.free_cells is not None and (gx, gy) not in self.bodies:
+            self.free_cells.add((gx, gy))
+        self.pellet_grid.remove(pellet)
+        self.pellet_positions.remove(gx, gy)
+        for listener in self.pellet_listeners:
+            listener.pellet_removed(pellet)
+        return pellet
+
+    def eat_pellets_at(self, gx: int, gy: int):
+        """Le ver mange la boulette sur la case (gx, gy). Retourne (score_delta, growth_delta)."""
+        pellet = self.remove_pellet(gx, gy)
+        if pellet is None:
             return 0, 0
+        spec = PELLET_TYPES[pellet.type_index]
 
-        score_delta = 0
-        growth_delta = 0
-
-        for pellet in eaten:
-            spec = PELLET_TYPES[pellet.type_index]
-            score_delta += spec["score"]
-            growth_delta += spec["growth"]
-            self.pellets.remove(pellet)
-
-        # On respawn le même nombre de boulettes ailleurs
-        for _ in eaten:
-            self.spawn_pellet(snake_cells)
+        # On respawn une boulette ailleurs
+        self.spawn_pellet()
 
-        return score_delta, growth_delta
+        return spec["score"], spec["growth"]
 
-    def spawn_pellets_from_death(self, dead_snake_cells: List[Tuple[int, int]], spleen: int):
+    def spawn_pellets_from_death(self, dead_snake_cells: Iterable[Tuple[int, int]], spleen: int):
         """Fait apparaître des boulettes sur le corps d'un serpent mort."""
         if not dead_snake_cells:
             return
@@ -71,10 +208,9 @@ class World:
         # Spawn a pellet for every N cells, where N is based on the spleen
         step = max(1, len(dead_snake_cells) // (spleen + 1))
         
-        for i in range(0, len(dead_snake_cells), step):
-            gx, gy = dead_snake_cells[i]
-            if any(p.x == gx and p.y == gy for p in self.pellets):
+        for gx, gy in islice(dead_snake_cells, 0, None, step):
+            if (gx, gy) in self.pellet_cells or (gx, gy) in self.bodies:
                 continue
             
-            type_index = random.randrange(len(PELLET_TYPES))
-            self.pellets.append(Pellet(gx, gy, type_index))
+            type_index = self.rng.randrange(len(PELLET_TYPES))
+            self.add_pellet(gx, gy, type_index)
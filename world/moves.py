@@ -0,0 +1,108 @@
+# world/moves.py
+
+from typing import List, Tuple
+
+from config import PELLET_TYPES
+
+# Causes de mort d'un ver pendant la résolution d'un tick
+WALL_DEATH = "wall"
+BODY_DEATH = "body"
+HEAD_ON_DEATH = "head-on"
+
+
+def keeps_tail(world, worm, new_head: Tuple[int, int]) -> bool:
+    """Vrai si le ver grandit pendant ce pas : croissance en attente, ou boulette qui fait grandir sur new_head."""
+    if worm.growth_pending > 0:
+        return True
+    pellet = world.pellet_cells.get(new_head)
+    if pellet is None:
+        return False
+    spec = PELLET_TYPES[pellet.type_index]
+    return spec["score"] > 0 and spec["growth"] > 0
+
+
+def resolve_moves(world, worms, metrics=None) -> List[Tuple[object, str]]:
+    """
+    Fait faire un pas simultané à tous les vers vivants de `worms`, dans leur direction courante.
+
+    Toutes les têtes visées sont calculées d'abord, puis les collisions sont jugées d'un coup
+    sur l'index d'occupation du monde (world.bodies) :
+    - une tête hors de la carte meurt (mur) ;
+    - une tête sur un corps meurt, sauf sur une queue qui avance pendant ce tick ;
+    - deux têtes sur la même case, ou qui se croisent, meurent toutes les deux.
+    Les survivants avancent, mangent et grandissent ; les morts laissent leurs boulettes.
+    L'issue ne dépend pas de l'ordre des vers, et le coût est proportionnel au nombre de vers.
+
+    Retourne les vers morts pendant ce pas, avec la cause de leur mort.
+    Avec `metrics` (engine/metrics.py), chronomètre les phases move, eat et death_pellets.
+    """
+    if metrics is not None:
+        start = metrics.clock()
+
+    # Intentions : (ver, nouvelle tête, garde sa queue)
+    moves = []
+    targets = {}  # case visée -> nombre de têtes
+    for worm in worms:
+        if not worm.alive:
+            continue
+        head_x, head_y = worm.head
+        dx, dy = worm.direction
+        new_head = (head_x + dx, head_y + dy)
+        moves.append((worm, new_head, keeps_tail(world, worm, new_head)))
+        targets[new_head] = targets.get(new_head, 0) + 1
+
+    leaving = {worm.cells.tail for worm, _, grows in moves if not grows}  # queues qui avancent
+    next_heads = {worm.head: new_head for worm, new_head, _ in moves}
+
+    # Collisions, toutes jugées avant le moindre déplacement
+    columns, rows, bodies = world.columns, world.rows, world.bodies
+    survivors = []
+    deaths = []
+    for move in moves:
+        worm, new_head, _ = move
+        x, y = new_head
+        if not (0 <= x < columns and 0 <= y < rows):
+            deaths.append((worm, WALL_DEATH))
+        elif new_head in bodies and new_head not in leaving:
+            deaths.append((worm, BODY_DEATH))
+        elif targets[new_head] > 1 or next_heads.get(new_head) == worm.head:
+            deaths.append((worm, HEAD_ON_DEATH))
+        else:
+            survivors.append(move)
+
+    # Les survivants avancent : toutes les queues libérées d'abord, puis toutes les têtes
+    for worm, _, grows in survivors:
+        if not grows:
+            world.vacate(worm.cells.pop_tail())
+    for worm, new_head, _ in survivors:
+        worm.cells.push_head(new_head)
+        world.occupy(new_head, worm)
+
+    if metrics is not None:
+        moved = metrics.clock()
+        metrics.add_phase("move", moved - start)
+
+    # Boulettes mangées et croissance
+    pellets_eaten = 0
+    for worm, (gx, gy), grows in survivors:
+        score_delta, growth_delta = world.eat_pellets_at(gx, gy)
+        if score_delta > 0:
+            worm.score += score_delta
+            worm.growth_pending += growth_delta
+            worm.spleen += 1
+            pellets_eaten += 1
+        if grows:
+            worm.growth_pending -= 1
+
+    if metrics is not None:
+        eaten = metrics.clock()
+        metrics.add_phase("eat", eaten - moved)
+        metrics.pellets_eaten += pellets_eaten
+
+    for worm, _ in deaths:
+        worm.die(world)
+
+    if metrics is not None:
+        metrics.add_phase("death_pellets", metrics.clock() - eaten)
+        metrics.deaths.update(cause for _, cause in deaths)
+    return deaths
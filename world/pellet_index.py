@@ -0,0 +1,122 @@
+# world/pellet_index.py
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class PelletGrid:
+    """
+    Index spatial des boulettes : la carte est découpée en seaux de
+    bucket_size x bucket_size cases. La recherche de la boulette la plus proche
+    (distance de Manhattan) parcourt les seaux en anneaux autour du point
+    et s'arrête dès qu'aucun anneau plus lointain ne peut faire mieux.
+    À distance égale, la boulette apparue la première (Pellet.rank) l'emporte, comme dans
+    le parcours linéaire de World.nearest_pellet et le calcul par lots de World.nearest_pellets.
+    """
+
+    def __init__(self, columns: int, rows: int, bucket_size: int = 8):
+        self.columns = columns
+        self.rows = rows
+        self.bucket_size = bucket_size
+        self.bucket_columns = (columns + bucket_size - 1) // bucket_size
+        self.bucket_rows = (rows + bucket_size - 1) // bucket_size
+        self.buckets: List[list] = [[] for _ in range(self.bucket_columns * self.bucket_rows)]
+
+    def _bucket(self, gx: int, gy: int) -> list:
+        b = self.bucket_size
+        return self.buckets[(gx // b) * self.bucket_rows + gy // b]
+
+    def clear(self):
+        for bucket in self.buckets:
+            bucket.clear()
+
+    def add(self, pellet):
+        self._bucket(pellet.x, pellet.y).append(pellet)
+
+    def remove(self, pellet):
+        self._bucket(pellet.x, pellet.y).remove(pellet)
+
+    def nearest(self, x: int, y: int, max_dist: Optional[int] = None):
+        """Retourne la boulette la plus proche de (x, y), ou None si aucune n'est à moins de max_dist (inclus)."""
+        b = self.bucket_size
+        cbx = min(max(x // b, 0), self.bucket_columns - 1)
+        cby = min(max(y // b, 0), self.bucket_rows - 1)
+        max_ring = max(cbx, self.bucket_columns - 1 - cbx, cby, self.bucket_rows - 1 - cby)
+
+        best = None
+        # Distance à ne pas dépasser : un seau plus lointain ne peut plus rien donner,
+        # mais un seau à égalité peut encore contenir une boulette apparue avant `best`
+        best_dist = float("inf") if max_dist is None else max_dist
+
+        for ring in range(max_ring + 1):
+            # Toute case d'un seau de l'anneau `ring` est à au moins (ring - 1) * b + 1 cases
+            if ring > 0 and (ring - 1) * b + 1 > best_dist:
+                break
+
+            for bx in range(cbx - ring, cbx + ring + 1):
+                if not 0 <= bx < self.bucket_columns:
+                    continue
+                gap_x = max(bx * b - x, x - (bx * b + b - 1), 0)
+                if gap_x > best_dist:
+                    continue
+                on_edge = bx == cbx - ring or bx == cbx + ring
+                by_step = 1 if on_edge else 2 * ring
+                for by in range(cby - ring, cby + ring + 1, by_step):
+                    if not 0 <= by < self.bucket_rows:
+                        continue
+                    bucket = self.buckets[bx * self.bucket_rows + by]
+                    if not bucket or gap_x + max(by * b - y, y - (by * b + b - 1), 0) > best_dist:
+                        continue
+                    for pellet in bucket:
+                        dist = abs(x - pellet.x) + abs(y - pellet.y)
+                        if dist < best_dist or (dist == best_dist and (best is None or pellet.rank < best.rank)):
+                            best_dist = dist
+                            best = pellet
+
+        return best
+
+
+class PelletPositions:
+    """
+    Positions des boulettes dans un tableau NumPy (P, 2) tenu à jour en O(1) :
+    ajout à la fin, retrait par échange avec la dernière ligne.
+    Sert aux calculs par lots (toutes les têtes contre toutes les boulettes).
+    Chaque ligne garde aussi son rang d'ajout, pour départager les égalités
+    dans l'ordre d'apparition des boulettes, comme le parcours de World.pellet_cells.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self._xy = np.empty((capacity, 3), dtype=np.int64)  # x, y, rang d'ajout
+        self._rows: Dict[Tuple[int, int], int] = {}
+        self.added = 0
+
+    def clear(self):
+        self._rows.clear()
+        self.added = 0
+
+    def add(self, x: int, y: int):
+        row = len(self._rows)
+        if row == len(self._xy):
+            self._xy = np.concatenate([self._xy, np.empty_like(self._xy)])
+        self._xy[row] = x, y, self.added
+        self._rows[(x, y)] = row
+        self.added += 1
+
+    def remove(self, x: int, y: int):
+        row = self._rows.pop((x, y))
+        last = len(self._rows)
+        if row != last:
+            moved = self._xy[last]
+            self._xy[row] = moved
+            self._rows[(int(moved[0]), int(moved[1]))] = row
+
+    @property
+    def array(self) -> np.ndarray:
+        """Vue (P, 2) sur les positions, valable jusqu'au prochain changement."""
+        return self._xy[:len(self._rows), :2]
+
+    @property
+    def order(self) -> np.ndarray:
+        """Vue (P,) sur les rangs d'ajout, alignée sur array."""
+        return self._xy[:len(self._rows), 2]
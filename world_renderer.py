@@ -0,0 +1,221 @@
+# world_renderer.py
+
+from collections import deque
+
+import arcade
+from arcade.shape_list import ShapeElementList, create_ellipse_filled, create_rectangle_filled
+
+from config import GRID_SIZE, PELLET_TYPES, RENDER_CHUNK_CELLS
+
+HEAD_RADIUS = GRID_SIZE * 0.55
+SEGMENT_RADIUS = GRID_SIZE * 0.48
+PELLET_RADIUS = GRID_SIZE // 3
+
+
+def cell_center(gx, gy):
+    return gx * GRID_SIZE + GRID_SIZE / 2, gy * GRID_SIZE + GRID_SIZE / 2
+
+
+class Chunk:
+    """Un carré de chunk_cells x chunk_cells cases, avec ses propres listes de dessin."""
+
+    def __init__(self, gx0, gy0, gx1, gy1):
+        self.bounds = (gx0, gy0, gx1, gy1)  # cases [gx0, gx1) x [gy0, gy1)
+        self.background = None  # construit à la première apparition à l'écran
+        self.pellets = arcade.SpriteList()
+        self.worms = arcade.SpriteList()
+
+    def build_background(self):
+        gx0, gy0, gx1, gy1 = self.bounds
+        left, bottom = gx0 * GRID_SIZE, gy0 * GRID_SIZE
+        width, height = (gx1 - gx0) * GRID_SIZE, (gy1 - gy0) * GRID_SIZE
+        shapes = ShapeElementList()
+        shapes.append(create_rectangle_filled(left + width / 2, bottom + height / 2, width, height, (5, 5, 15)))
+
+        # Un point toutes les 4 cases, aux mêmes positions que sur le monde entier
+        for gx in range(gx0 + (-gx0) % 4, gx1, 4):
+            for gy in range(gy0 + (-gy0) % 4, gy1, 4):
+                x, y = gx * GRID_SIZE + GRID_SIZE // 2, gy * GRID_SIZE + GRID_SIZE // 2
+                shapes.append(create_ellipse_filled(x, y, 3, 3, (35, 35, 70), num_segments=8))
+        return shapes
+
+
+class WormSprites:
+    """Sprites d'un ver, alignés sur worm.cells (tête en premier), chacun avec son chunk."""
+
+    def __init__(self, texture):
+        self.body = None
+        self.pushed = 0
+        self.popped = 0
+        self.texture = texture
+        self.sprites = deque()  # (sprite, chunk)
+
+
+class WorldRenderer:
+    """
+    Rendu du monde par lots : quelques appels de dessin GPU par frame au lieu
+    d'un appel par case.
+    - le monde est découpé en chunks ; seuls ceux qui coupent le rectangle de la caméra
+      sont dessinés, le coût d'une frame dépend donc de la taille de l'écran et non du monde ;
+    - le fond d'un chunk est construit une seule fois (ShapeElementList) ;
+    - les sprites des boulettes suivent les évènements du monde (pellet_added / pellet_removed) ;
+    - les sprites des vers suivent les compteurs pushed/popped de WormBody : à chaque frame,
+      seules les nouvelles têtes et les queues retirées sont traitées.
+    """
+
+    def __init__(self, simulation, chunk_cells=RENDER_CHUNK_CELLS):
+        self.simulation = simulation
+        world = simulation.world
+
+        self.chunk_cells = chunk_cells
+        self.chunk_columns = -(-world.columns // chunk_cells)
+        self.chunk_rows = -(-world.rows // chunk_cells)
+        self.chunks = [
+            Chunk(
+                cx * chunk_cells,
+                cy * chunk_cells,
+                min((cx + 1) * chunk_cells, world.columns),
+                min((cy + 1) * chunk_cells, world.rows),
+            )
+            for cx in range(self.chunk_columns)
+            for cy in range(self.chunk_rows)
+        ]
+
+        self.pellet_textures = [arcade.load_texture(spec["texture"]) for spec in PELLET_TYPES]
+        self.pellet_sprites = {}
+        for pellet in world.pellets:
+            self.pellet_added(pellet)
+        world.pellet_listeners.append(self)
+
+        self.worm_sprites = {}
+        self.worm_textures = {}
+
+    def chunk_at(self, gx, gy):
+        return self.chunks[(gx // self.chunk_cells) * self.chunk_rows + gy // self.chunk_cells]
+
+    def visible_chunks(self, view_rect):
+        """Chunks qui coupent view_rect = (gauche, bas, droite, haut) en pixels monde."""
+        chunk_size = self.chunk_cells * GRID_SIZE
+        left, bottom, right, top = view_rect
+        cx0 = max(0, int(left // chunk_size))
+        cy0 = max(0, int(bottom // chunk_size))
+        cx1 = min(self.chunk_columns - 1, int(right // chunk_size))
+        cy1 = min(self.chunk_rows - 1, int(top // chunk_size))
+        return [
+            self.chunks[cx * self.chunk_rows + cy]
+            for cx in range(cx0, cx1 + 1)
+            for cy in range(cy0, cy1 + 1)
+        ]
+
+    def close(self):
+        listeners = self.simulation.world.pellet_listeners
+        if self in listeners:
+            listeners.remove(self)
+
+    # --- Boulettes (appelé par World) ---
+
+    def pellet_added(self, pellet):
+        spec = PELLET_TYPES[pellet.type_index]
+        texture = self.pellet_textures[pellet.type_index]
+        radius = spec.get("radius", PELLET_RADIUS)
+        sprite = arcade.Sprite(texture, scale=2 * radius / texture.width)
+        sprite.position = cell_center(pellet.x, pellet.y)
+        self.chunk_at(pellet.x, pellet.y).pellets.append(sprite)
+        self.pellet_sprites[(pellet.x, pellet.y)] = sprite
+
+    def pellet_removed(self, pellet):
+        sprite = self.pellet_sprites.pop((pellet.x, pellet.y), None)
+        if sprite is not None:
+            self.chunk_at(pellet.x, pellet.y).pellets.remove(sprite)
+
+    def pellets_cleared(self):
+        for chunk in self.chunks:
+            chunk.pellets.clear()
+        self.pellet_sprites.clear()
+
+    # --- Vers ---
+
+    def worm_texture(self, color):
+        texture = self.worm_textures.get(color)
+        if texture is None:
+            texture = arcade.make_circle_texture(int(2 * HEAD_RADIUS), color)
+            self.worm_textures[color] = texture
+        return texture
+
+    def place_segment(self, sprite, old_chunk, cell, radius):
+        """Place le sprite sur la case, en le changeant de chunk si besoin. Retourne son chunk."""
+        chunk = self.chunk_at(*cell)
+        if chunk is not old_chunk:
+            if old_chunk is not None:
+                old_chunk.worms.remove(sprite)
+            chunk.worms.append(sprite)
+        sprite.position = cell_center(*cell)
+        sprite.scale = radius / HEAD_RADIUS
+        return chunk
+
+    def remove_worm_sprites(self, state):
+        for sprite, chunk in state.sprites:
+            chunk.worms.remove(sprite)
+        state.sprites.clear()
+
+    def sync_worm(self, worm, state):
+        body = worm.cells
+        new_heads = body.pushed - state.pushed
+        new_tails = body.popped - state.popped
+
+        if state.body is not body or new_heads >= len(body) or new_tails > len(state.sprites):
+            # Nouveau corps (reset) ou trop de changements : on reconstruit
+            self.remove_worm_sprites(state)
+            for i, cell in enumerate(body):
+                sprite = arcade.Sprite(state.texture)
+                chunk = self.place_segment(sprite, None, cell, HEAD_RADIUS if i == 0 else SEGMENT_RADIUS)
+                state.sprites.append((sprite, chunk))
+        else:
+            # Les queues retirées sont recyclées en nouvelles têtes
+            recycled = [state.sprites.pop() for _ in range(new_tails)]
+            if new_heads and state.sprites:
+                state.sprites[0][0].scale = SEGMENT_RADIUS / HEAD_RADIUS
+            for i in range(new_heads - 1, -1, -1):
+                radius = HEAD_RADIUS if i == 0 else SEGMENT_RADIUS
+                sprite, chunk = recycled.pop() if recycled else (arcade.Sprite(state.texture), None)
+                chunk = self.place_segment(sprite, chunk, body[i], radius)
+                state.sprites.appendleft((sprite, chunk))
+            for sprite, chunk in recycled:
+                chunk.worms.remove(sprite)
+
+        state.body = body
+        state.pushed = body.pushed
+        state.popped = body.popped
+
+    def sync_worms(self):
+        worms = self.simulation.worms
+        for worm in list(self.worm_sprites):
+            if worm not in worms:
+                self.remove_worm_sprites(self.worm_sprites.pop(worm))
+
+        for worm in worms:
+            state = self.worm_sprites.get(worm)
+            if state is None:
+                state = self.worm_sprites[worm] = WormSprites(self.worm_texture(worm.color))
+            state.texture = self.worm_texture(worm.color)
+
+            if worm.alive:
+                self.sync_worm(worm, state)
+            elif state.sprites:
+                self.remove_worm_sprites(state)
+                state.body = None
+
+    def draw(self, view_rect):
+        """Dessine la partie du monde visible dans view_rect = (gauche, bas, droite, haut)."""
+        self.sync_worms()
+        chunks = self.visible_chunks(view_rect)
+
+        # Trois passes pour qu'un ver à cheval sur deux chunks ne soit pas recouvert par un fond
+        for chunk in chunks:
+            if chunk.background is None:
+                chunk.background = chunk.build_background()
+            chunk.background.draw()
+        for chunk in chunks:
+            chunk.pellets.draw()
+        for chunk in chunks:
+            chunk.worms.draw()